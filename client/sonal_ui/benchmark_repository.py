@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: list-backed vs index-backed reminder repository.
+
+ListReminderRepository is the old MockReminderRepository (a plain list:
+linear scans for lookup/update, a full rebuild per delete, a copy + sort
+to show rows in time order). InMemoryReminderRepository keeps a dict by
+id plus time-sorted keys.
+
+    python benchmark_repository.py              # 100000 reminders
+    python benchmark_repository.py --size 10000 --ops 500
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from repository import InMemoryReminderRepository, Reminder
+
+BASE_TIME = datetime(2030, 1, 1, 9, 0)  # fixed so runs are comparable
+
+
+class ListReminderRepository:
+    """The previous list-based mock, kept here as the baseline."""
+
+    def __init__(self, reminders=()):
+        self._reminders: List[Reminder] = list(reminders)
+
+    def get_reminders(self) -> List[Reminder]:
+        return list(self._reminders)
+
+    def get_reminder(self, reminder_id: int) -> Optional[Reminder]:
+        # what HomeScreen did per click: copy, then scan
+        return next((r for r in self.get_reminders() if r.id == reminder_id), None)
+
+    def delete_reminder(self, reminder_id: int) -> None:
+        self._reminders = [r for r in self._reminders if r.id != reminder_id]
+
+    def update_reminder(self, reminder: Reminder) -> None:
+        for i, r in enumerate(self._reminders):
+            if r.id == reminder.id:
+                self._reminders[i] = reminder
+                break
+
+    def first_rows(self, n: int) -> List[Reminder]:
+        return sorted(self._reminders, key=lambda r: (r.time, r.id))[:n]
+
+
+def make_reminders(n: int, seed: int = 1) -> List[Reminder]:
+    rng = random.Random(seed)
+    return [
+        Reminder(i, f"task {i}", BASE_TIME + timedelta(minutes=rng.randrange(60 * 24 * 30)))
+        for i in range(1, n + 1)
+    ]
+
+
+def per_op_us(fn, ids) -> float:
+    start = time.perf_counter()
+    for i in ids:
+        fn(i)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def bench(repo_cls, first_rows, size: int, ops: int, seed: int = 1) -> dict:
+    reminders = make_reminders(size, seed)
+    rng = random.Random(seed + 1)
+
+    start = time.perf_counter()
+    repo = repo_cls(reminders)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    ids = [rng.randrange(1, size + 1) for _ in range(ops)]
+
+    def update(i):
+        r = repo.get_reminder(i)
+        repo.update_reminder(Reminder(r.id, r.task, r.time + timedelta(minutes=5), r.repeat, r.status))
+
+    return {
+        "build_ms": build_ms,
+        "get_us": per_op_us(repo.get_reminder, ids),
+        "update_us": per_op_us(update, ids),
+        "window_us": per_op_us(lambda _: first_rows(repo, 50), ids[:max(1, ops // 10)]),
+        "delete_us": per_op_us(repo.delete_reminder, list(dict.fromkeys(ids))),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=200, help="operations timed per measurement")
+    args = parser.parse_args(argv)
+
+    rows = [
+        ("list", bench(ListReminderRepository, lambda repo, n: repo.first_rows(n), args.size, args.ops)),
+        ("index", bench(InMemoryReminderRepository,
+                        lambda repo, n: [r for _, r in zip(range(n), repo)], args.size, args.ops)),
+    ]
+
+    print(f"{args.size} reminders, {args.ops} ops per measurement")
+    print(f"{'repo':<8}{'build ms':>10}{'get µs':>12}{'update µs':>12}{'window µs':>12}{'delete µs':>12}")
+    for name, r in rows:
+        print(f"{name:<8}{r['build_ms']:>10.1f}{r['get_us']:>12.1f}{r['update_us']:>12.1f}"
+              f"{r['window_us']:>12.1f}{r['delete_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import http.client
+import json
+import queue
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from reminder_index import ReminderIndex
+from repository import Reminder
+from view_model import ReminderStats
+
+
+# ===================== Background worker =====================
+
+class UIWorker:
+    """
+    One background thread for network I/O. Results are handed back to the
+    Tk thread through a queue drained with root.after, so callbacks always
+    run on the UI thread and Tk is never touched from the worker.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root):
+        self.root = root
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ui-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._drain)
+
+    def submit(self, fn: Callable, on_done: Optional[Callable] = None, on_error: Optional[Callable] = None):
+        self._jobs.put((fn, on_done, on_error))
+
+    def _run(self):
+        while True:
+            fn, on_done, on_error = self._jobs.get()
+            try:
+                result, error = fn(), None
+            except Exception as e:
+                result, error = None, e
+            self._results.put((on_done, on_error, result, error))
+
+    def _drain(self):
+        try:
+            while True:
+                on_done, on_error, result, error = self._results.get_nowait()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        print("[UI WORKER ERROR]", error)
+                elif on_done:
+                    on_done(result)
+        except queue.Empty:
+            pass
+        self.root.after(self.POLL_MS, self._drain)
+
+
+# ===================== HTTP repository =====================
+
+def to_reminder(d: dict) -> Reminder:
+    when = datetime.fromisoformat(d["time_iso"])
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)  # UI shows local wall time
+    return Reminder(d["id"], d["task"], when, d.get("repeat"), d.get("status", "scheduled"))
+
+
+def to_iso(when: datetime) -> str:
+    # send an explicit offset so the server doesn't guess the UI's timezone
+    return when.astimezone().isoformat(timespec="minutes")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, body):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class HttpReminderRepository:
+    """
+    ReminderRepository backed by the reminder API.
+
+    Reads never block the Tk loop: get_reminders / get_reminder answer from
+    an id-indexed local replica (`index`), which is kept fresh by delta sync
+    (GET /reminders/changes) on the worker thread. Writes are applied to
+    the cache immediately and sent in the background; `on_change` fires on
+    the UI thread whenever the cache changed.
+
+    With paged=True nothing is mirrored: the table pages through
+    GET /reminders/?limit=&offset= instead (for very large accounts), and
+    only the rows of pages that were loaded end up in `index`, so any row
+    the table has shown can still be looked up without a request.
+    """
+
+    def __init__(self, base_url: str, root, on_change: Optional[Callable] = None,
+                 on_error: Optional[Callable] = None, poll_ms: int = 15000, paged: bool = False,
+                 timeout: float = 10.0, user_id: Optional[str] = None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.user_id = user_id  # X-User-Id: the server only shows this user's reminders
+        self.root = root
+        self.on_change = on_change
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self.paged = paged
+
+        self.index = ReminderIndex()
+        self.stats = ReminderStats()  # paged mode only: server-side counts
+        self.sync_token = 0
+        self._next_temp_id = -1       # optimistic creates until the server assigns an id
+        self._conn = None             # worker-thread only
+        self.worker = UIWorker(root)
+        self.sync()
+
+    # ---------- HTTP (worker thread only) ----------
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def _base_headers(self):
+        headers = {"Accept": "application/json"}
+        if self.user_id:
+            headers["X-User-Id"] = self.user_id
+        return headers
+
+    def _request(self, method: str, path: str, body=None, params=None, headers=None):
+        """One keep-alive request; reconnects once if the server dropped the connection."""
+        url = self.prefix + path + (f"?{urlencode(params)}" if params else "")
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {**self._base_headers(), **(headers or {})}
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+        parsed = json.loads(data) if data else None
+        if response.status >= 400:
+            raise ApiError(response.status, parsed)
+        return parsed, response
+
+    # ---------- sync ----------
+
+    def sync(self):
+        """Pull changes since the last sync in the background, then reschedule."""
+        if self.paged:
+            self.worker.submit(self._fetch_stats, self._apply_stats, self._failed)
+        else:
+            self.worker.submit(self._fetch_changes, self._apply_changes, self._failed)
+        self.root.after(self.poll_ms, self.sync)
+
+    def _fetch_changes(self):
+        token = self.sync_token
+        upserts, tombstones = [], []
+        while True:
+            page, _ = self._request("GET", "/reminders/changes", params={"since": token})
+            token = page["token"]
+            upserts += page["upserts"]
+            tombstones += page["tombstones"]
+            if not page["has_more"]:
+                return token, upserts, tombstones
+
+    def _apply_changes(self, result):
+        token, upserts, tombstones = result
+        self.sync_token = token
+        if not (upserts or tombstones):
+            return
+        # ids can be reused after a delete: a reminder that is live in this sync wins
+        live = {d["id"] for d in upserts}
+        for rid in tombstones:
+            if rid not in live:
+                self.index.remove(rid)
+        for d in upserts:
+            self.index.upsert(to_reminder(d))
+        self._changed()
+
+    def _fetch_stats(self):
+        counts = []
+        for status in (None, "scheduled", "completed"):
+            params = {"limit": 1}
+            if status:
+                params["status"] = status
+            _, response = self._request("GET", "/reminders/", params=params)
+            counts.append(int(response.getheader("X-Total-Count", 0)))
+        return ReminderStats(*counts)
+
+    def _apply_stats(self, stats):
+        if stats != self.stats:
+            self.stats = stats
+            self._changed()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def _failed(self, error):
+        print("[HTTP REPO ERROR]", error)
+        if self.on_error:
+            self.on_error(error)
+
+    # ---------- ReminderRepository ----------
+
+    def get_reminders(self) -> List[Reminder]:
+        return list(self.index)
+
+    def get_reminder(self, reminder_id: int) -> Optional[Reminder]:
+        # paged mode: every row the table can show came from a page cached by submit_page
+        return self.index.get(reminder_id)
+
+    def get_stats(self) -> ReminderStats:
+        return self.stats if self.paged else self.index.stats
+
+    def submit_page(self, fn: Callable, on_done: Optional[Callable] = None, on_error: Optional[Callable] = None):
+        """
+        UIWorker.submit for PagedRowSource: also caches each loaded page's
+        rows in `index` (on the UI thread) so get_reminder never blocks.
+        """
+        def done(result):
+            for r in result[1]:
+                self.index.upsert(r)
+            if on_done:
+                on_done(result)
+
+        self.worker.submit(fn, done, on_error)
+
+    def fetch_page(self, offset: int, limit: int, status: Optional[str] = None):
+        """(total, reminders) for one page; runs on the worker via PagedRowSource."""
+        params = {"limit": limit, "offset": offset}
+        if status:
+            params["status"] = status
+        items, response = self._request("GET", "/reminders/", params=params)
+        return int(response.getheader("X-Total-Count", len(items))), [to_reminder(d) for d in items]
+
+    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder:
+        temp = Reminder(self._next_temp_id, task, time, repeat, "scheduled")
+        self._next_temp_id -= 1
+        self.index.upsert(temp)
+
+        def done(d):
+            self.index.remove(temp.id)
+            self.index.upsert(to_reminder(d))
+            self._changed()
+
+        def failed(error):
+            self.index.remove(temp.id)
+            self._changed()
+            self._failed(error)
+
+        body = {"task": task, "time_iso": to_iso(time), "repeat": repeat}
+        # the reconnect-and-resend in _request is safe: the server dedupes on the key
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        self.worker.submit(lambda: self._request("POST", "/reminders/", body, headers=headers)[0], done, failed)
+        return temp
+
+    def update_reminder(self, reminder: Reminder) -> None:
+        previous = self.index.get(reminder.id)
+        self.index.upsert(reminder)
+        body = {
+            "task": reminder.task,
+            "time_iso": to_iso(reminder.time),
+            "repeat": reminder.repeat,
+            "status": reminder.status,
+        }
+        self.worker.submit(
+            lambda: self._request("PATCH", f"/reminders/{reminder.id}", body)[0],
+            lambda d: (self.index.upsert(to_reminder(d)), self._changed()),
+            lambda e: self._rollback(reminder.id, previous, e),
+        )
+
+    def delete_reminder(self, reminder_id: int) -> None:
+        previous = self.index.get(reminder_id)
+        self.index.remove(reminder_id)
+        self.worker.submit(
+            lambda: self._request("DELETE", f"/reminders/{reminder_id}")[0],
+            lambda _: self._changed(),
+            lambda e: self._rollback(reminder_id, previous, e),
+        )
+
+    def _rollback(self, reminder_id, previous, error):
+        if previous is None:
+            self.index.remove(reminder_id)
+        else:
+            self.index.upsert(previous)
+        self._changed()
+        self._failed(error)
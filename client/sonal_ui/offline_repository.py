@@ -0,0 +1,131 @@
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Optional
+
+from http_repository import UIWorker, to_iso, to_reminder
+from repository import InMemoryReminderRepository, Reminder
+
+# the local store is shared with the voice client, which lives in server/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "server"))
+from offline_store import HttpTransport, OfflineStore  # noqa: E402
+
+
+# ===================== Offline-first repository =====================
+
+def _row_to_reminder(row: dict) -> Reminder:
+    try:
+        return to_reminder(row)
+    except ValueError:
+        # a spoken time the server hasn't normalized yet: show it as "now" until it has
+        return Reminder(row["id"], row["task"], datetime.now(), row["repeat"], row["status"])
+
+
+class OfflineReminderRepository(InMemoryReminderRepository):
+    """
+    ReminderRepository over a local SQLite replica (offline_store.py).
+
+    Every write lands in the local file first and is shown immediately;
+    the outbox is pushed to the API and server changes are pulled on the
+    worker thread, so the UI works the same with the server down and
+    nothing typed in is lost on restart. Reminder ids are the store's
+    local ids, which don't change when the server accepts a reminder.
+    """
+
+    def __init__(self, base_url: str, root, path: str = "ui_reminders.db",
+                 on_change: Optional[Callable] = None, on_error: Optional[Callable] = None,
+                 sync_ms: int = 15000, user_id: Optional[str] = None):
+        self.store = OfflineStore(path, on_reject=self._rejected)
+        super().__init__(_row_to_reminder(row) for row in self.store.list())
+        self.transport = HttpTransport(base_url, user_id=user_id)
+        self.root = root
+        self.on_change = on_change
+        self.on_error = on_error
+        self.sync_ms = sync_ms
+        self.worker = UIWorker(root)
+        self._syncing = False
+        self._sync_again = False
+        self._rejected_ids = []  # filled on the worker thread, drained on the Tk thread
+        self._periodic_sync()
+
+    # ---------- sync ----------
+
+    def _periodic_sync(self):
+        self.request_sync()
+        self.root.after(self.sync_ms, self._periodic_sync)
+
+    def request_sync(self):
+        """Flush + pull in the background; coalesces requests made while one is running."""
+        if self._syncing:
+            self._sync_again = True
+            return
+        self._syncing = True
+        self.worker.submit(lambda: self.store.sync(self.transport), self._synced, self._sync_failed)
+
+    def _synced(self, result):
+        touched, _ = result
+        self._reload(touched)
+        self._sync_done()
+
+    def _sync_failed(self, error):
+        # offline: changes stay queued in the store until the next attempt
+        print("[OFFLINE REPO] sync failed:", error)
+        self._reload([])
+        self._sync_done()
+        if self.on_error:
+            self.on_error(error)
+
+    def _reload(self, local_ids):
+        """Re-read rows the sync touched (or the server rejected) into the index."""
+        local_ids = list(local_ids)
+        while self._rejected_ids:
+            local_ids.append(self._rejected_ids.pop())
+        for local_id in local_ids:
+            row = self.store.get(local_id)
+            if row is None:
+                self.index.remove(local_id)
+            else:
+                self.index.upsert(_row_to_reminder(row))
+        if local_ids and self.on_change:
+            self.on_change()
+
+    def _sync_done(self):
+        self._syncing = False
+        if self._sync_again:
+            self._sync_again = False
+            self.request_sync()
+
+    def _rejected(self, op, row, status, body):
+        if row is not None:
+            self._rejected_ids.append(row["id"])
+
+    def pending(self) -> int:
+        return self.store.pending()
+
+    # ---------- ReminderRepository ----------
+
+    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder:
+        r = _row_to_reminder(self.store.create(task, to_iso(time), repeat))
+        self.index.upsert(r)
+        self.request_sync()
+        return r
+
+    def update_reminder(self, reminder: Reminder) -> None:
+        # only queue what changed, so an untouched time isn't re-parsed by the server
+        before = self.index.get(reminder.id)
+        fields = {}
+        for name in ("task", "repeat", "status"):
+            if before is None or getattr(before, name) != getattr(reminder, name):
+                fields[name] = getattr(reminder, name)
+        if before is None or before.time != reminder.time:
+            fields["time_iso"] = to_iso(reminder.time)
+        if not fields:
+            return
+        if self.store.update(reminder.id, fields) is not None:
+            self.index.upsert(reminder)
+            self.request_sync()
+
+    def delete_reminder(self, reminder_id: int) -> None:
+        if self.store.delete(reminder_id):
+            self.index.remove(reminder_id)
+            self.request_sync()
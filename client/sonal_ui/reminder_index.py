@@ -0,0 +1,106 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from view_model import ReminderStats, sort_key
+
+
+# ===================== Sorted reminder index =====================
+
+class ReminderIndex:
+    """
+    Reminders by id plus a (time, id) sorted key list, with one sorted
+    key list per status so a status filter is just a different list.
+
+    Updates are bisect inserts/removes, so the UI never re-sorts a Python
+    list to show a window of rows; stats are kept as rows change. Loading
+    into an empty index sorts once instead of inserting row by row.
+    """
+
+    def __init__(self, reminders: Iterable = ()):
+        self.by_id: Dict[int, object] = {}
+        self._indexed: Dict[int, tuple] = {}  # id -> (key, status) as indexed
+        self.keys: List[tuple] = []
+        self.by_status: Dict[str, List[tuple]] = {}
+        self.stats = ReminderStats()
+        self.version = 0  # bumped on every change, for caches built on the index
+        self.replace_all(reminders)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self) -> Iterator:
+        """Reminders in (time, id) order."""
+        return self.iter(None)
+
+    def iter(self, status: Optional[str] = None) -> Iterator:
+        by_id = self.by_id
+        return (by_id[key[1]] for key in self.view(status))
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self.by_id
+
+    def get(self, reminder_id) -> Optional[object]:
+        return self.by_id.get(reminder_id)
+
+    def _unlink(self, reminder_id):
+        key, status = self._indexed.pop(reminder_id)
+        for keys in (self.keys, self.by_status[status]):
+            del keys[bisect_left(keys, key)]
+        self.stats.count(status, -1)
+
+    def upsert(self, r):
+        # keys are snapshotted, so objects edited in place are re-indexed correctly
+        key = sort_key(r)
+        indexed = self._indexed.get(r.id)
+        self.by_id[r.id] = r
+        self.version += 1
+        if indexed == (key, r.status):
+            return
+        if indexed is not None:
+            self._unlink(r.id)
+        self._indexed[r.id] = (key, r.status)
+        insort(self.keys, key)
+        insort(self.by_status.setdefault(r.status, []), key)
+        self.stats.count(r.status)
+
+    def remove(self, reminder_id):
+        if self.by_id.pop(reminder_id, None) is not None:
+            self.version += 1
+            self._unlink(reminder_id)
+
+    def _build(self, reminders: Iterable):
+        # one sort per list instead of n insorts (each of which shifts the list)
+        for r in reminders:
+            key = sort_key(r)
+            self.by_id[r.id] = r
+            self._indexed[r.id] = (key, r.status)
+        for key, status in self._indexed.values():
+            self.keys.append(key)
+            self.by_status.setdefault(status, []).append(key)
+            self.stats.count(status)
+        self.keys.sort()
+        for keys in self.by_status.values():
+            keys.sort()
+        self.version += 1
+
+    def replace_all(self, reminders: Iterable):
+        """Make the index match `reminders`, touching only the ones that changed."""
+        if not self.by_id:
+            self._build(reminders)
+            return
+        seen = set()
+        for r in reminders:
+            seen.add(r.id)
+            self.upsert(r)
+        for reminder_id in [i for i in self.by_id if i not in seen]:
+            self.remove(reminder_id)
+
+    def view(self, status: Optional[str] = None) -> List[tuple]:
+        """Sorted (time, id) keys, all or for one status. Don't mutate."""
+        if status is None:
+            return self.keys
+        return self.by_status.get(status, [])
+
+    def position(self, r, status: Optional[str] = None) -> int:
+        """Row number of `r` in view(status)."""
+        return bisect_left(self.view(status), sort_key(r))
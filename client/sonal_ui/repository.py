@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Protocol
+
+from reminder_index import ReminderIndex
+
+
+# ===================== Reminder model =====================
+
+@dataclass
+class Reminder:
+    id: int
+    task: str
+    time: datetime
+    repeat: Optional[str] = None
+    status: str = "scheduled"  # "scheduled", "due", "acknowledged", "snoozed", "completed", "cancelled"
+
+
+# ===================== Repository interface & mock =====================
+
+class ReminderRepository(Protocol):
+    def get_reminders(self) -> List[Reminder]: ...
+    def get_reminder(self, reminder_id: int) -> Optional[Reminder]: ...
+    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder: ...
+    def delete_reminder(self, reminder_id: int) -> None: ...
+    def update_reminder(self, reminder: Reminder) -> None: ...
+
+
+class InMemoryReminderRepository(ReminderRepository):
+    """
+    Reminders held in a ReminderIndex (dict by id + time-sorted keys).
+
+    get/update/delete are a dict lookup plus a bisect, and iteration walks
+    the sorted keys, so nothing copies or scans the whole collection. The
+    index is exposed as `index` so views can read it without a copy.
+    """
+
+    def __init__(self, reminders: Iterable[Reminder] = ()):
+        self.index = ReminderIndex(reminders)
+        self._next_id = max(self.index.by_id, default=0) + 1
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[Reminder]:
+        return iter(self.index)
+
+    def get_reminders(self) -> List[Reminder]:
+        return list(self.index)
+
+    def get_reminder(self, reminder_id: int) -> Optional[Reminder]:
+        return self.index.get(reminder_id)
+
+    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder:
+        r = Reminder(self._next_id, task, time, repeat, "scheduled")
+        self._next_id += 1
+        self.index.upsert(r)
+        return r
+
+    def delete_reminder(self, reminder_id: int) -> None:
+        self.index.remove(reminder_id)
+
+    def update_reminder(self, reminder: Reminder) -> None:
+        if reminder.id in self.index:
+            self.index.upsert(reminder)
+
+
+class MockReminderRepository(InMemoryReminderRepository):
+    """In-memory mock, like a Flutter MockReminderRepository."""
+
+    def __init__(self):
+        now = datetime.now()
+        super().__init__([
+            Reminder(1, "Call mom", now.replace(hour=18, minute=0), None, "scheduled"),
+            Reminder(2, "Take medicine", now.replace(hour=21, minute=30), "daily", "scheduled"),
+        ])
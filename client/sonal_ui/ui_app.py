@@ -1,58 +1,14 @@
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
-from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Protocol
+from typing import Optional
 
-
-# ===================== Reminder model =====================
-
-@dataclass
-class Reminder:
-    id: int
-    task: str
-    time: datetime
-    repeat: Optional[str] = None
-    status: str = "scheduled"  # "scheduled", "completed", "cancelled"
-
-
-# ===================== Repository interface & mock =====================
-
-class ReminderRepository(Protocol):
-    def get_reminders(self) -> List[Reminder]: ...
-    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder: ...
-    def delete_reminder(self, reminder_id: int) -> None: ...
-    def update_reminder(self, reminder: Reminder) -> None: ...
-
-
-class MockReminderRepository(ReminderRepository):
-    """In-memory mock, like a Flutter MockReminderRepository."""
-
-    def __init__(self):
-        now = datetime.now()
-        self._reminders: List[Reminder] = [
-            Reminder(1, "Call mom", now.replace(hour=18, minute=0), None, "scheduled"),
-            Reminder(2, "Take medicine", now.replace(hour=21, minute=30), "daily", "scheduled"),
-        ]
-        self._next_id = 3
-
-    def get_reminders(self) -> List[Reminder]:
-        return list(self._reminders)
-
-    def create_reminder(self, task: str, time: datetime, repeat: Optional[str] = None) -> Reminder:
-        r = Reminder(self._next_id, task, time, repeat, "scheduled")
-        self._next_id += 1
-        self._reminders.append(r)
-        return r
-
-    def delete_reminder(self, reminder_id: int) -> None:
-        self._reminders = [r for r in self._reminders if r.id != reminder_id]
-
-    def update_reminder(self, reminder: Reminder) -> None:
-        for i, r in enumerate(self._reminders):
-            if r.id == reminder.id:
-                self._reminders[i] = reminder
-                break
+from http_repository import HttpReminderRepository
+from offline_repository import OfflineReminderRepository
+from reminder_index import ReminderIndex
+from repository import MockReminderRepository, Reminder, ReminderRepository
+from virtual_table import IndexRowSource, PagedRowSource, VirtualReminderTable
 
 
 # ===================== Base screen =====================
@@ -100,23 +56,37 @@ class HomeScreen(BaseScreen):
 
         ttk.Label(card, text="Reminders", style="SectionTitle.TLabel").pack(anchor="w")
 
-        columns = ("time", "task", "repeat", "status")
-        self.tree = ttk.Treeview(
-            card,
-            columns=columns,
-            show="headings",
-            height=10,
-            style="Reminders.Treeview",
+        # Filters: status + task text, applied against the sorted index
+        filters = ttk.Frame(card, style="Body.TFrame")
+        filters.pack(fill="x", pady=(4, 0))
+        ttk.Label(filters, text="Show", style="FormLabel.TLabel").pack(side="left")
+        self.filter_status_var = tk.StringVar(value="all")
+        status_filter = ttk.Combobox(
+            filters,
+            textvariable=self.filter_status_var,
+            width=12,
+            values=["all", "scheduled", "due", "acknowledged", "snoozed", "completed", "cancelled"],
+            state="readonly",
         )
-        for col, text in zip(columns, ["Time", "Task", "Repeat", "Status"]):
-            self.tree.heading(col, text=text)
-        self.tree.column("time", width=150, anchor="w")
-        self.tree.column("task", width=280, anchor="w")
-        self.tree.column("repeat", width=90, anchor="center")
-        self.tree.column("status", width=90, anchor="center")
-
-        self.tree.pack(fill="both", expand=True, pady=(4, 6))
+        status_filter.pack(side="left", padx=6)
+        status_filter.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        ttk.Label(filters, text="Search", style="FormLabel.TLabel").pack(side="left", padx=(12, 0))
+        self.filter_text_var = tk.StringVar()
+        search = ttk.Entry(filters, textvariable=self.filter_text_var, width=24)
+        search.pack(side="left", padx=6)
+        search.bind("<KeyRelease>", lambda e: self.apply_filters())
+
+        # Only the visible rows live in the Treeview; the rest stay in the index
+        # repositories that already keep a ReminderIndex share it instead of copying
+        self.index = getattr(app.repo, "index", None)
+        self.owns_index = self.index is None
+        if self.owns_index:
+            self.index = ReminderIndex()
+        self.table = VirtualReminderTable(card, height=10)
+        self.table.pack(fill="both", expand=True, pady=(4, 6))
+        self.tree = self.table.tree
         self.tree.bind("<Double-1>", lambda e: self.view_selected())
+        self.source = None
 
         # Buttons row
         btn_bar = ttk.Frame(card)
@@ -143,44 +113,50 @@ class HomeScreen(BaseScreen):
         ttk.Label(f, text=label, style="StatLabel.TLabel").pack()
         return f
 
+    def _make_source(self):
+        status = self.filter_status_var.get()
+        status = None if status == "all" else status
+        repo = self.app.repo
+        if getattr(repo, "paged", False) and not self.filter_text_var.get().strip():
+            # backend paginates (fetch_page / submit_page / get_stats / get_reminder):
+            # only the pages around the visible window are loaded, off the UI thread
+            return PagedRowSource(repo.fetch_page, status=status,
+                                  submit=repo.submit_page, on_loaded=self.table.render)
+        return IndexRowSource(self.index, status, self.filter_text_var.get())
+
+    def apply_filters(self):
+        self.source = self._make_source()
+        self.table.set_source(self.source)
+
     def refresh(self):
-        # clear table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        reminders = self.app.repo.get_reminders()
-        reminders.sort(key=lambda r: r.time)
-
-        total = len(reminders)
-        scheduled = len([r for r in reminders if r.status == "scheduled"])
-        done = len([r for r in reminders if r.status == "completed"])
-
-        self.total_var.set(str(total))
-        self.sched_var.set(str(scheduled))
-        self.done_var.set(str(done))
-
-        for r in reminders:
-            time_str = r.time.strftime("%Y-%m-%d %H:%M")
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r.id),
-                values=(time_str, r.task, r.repeat or "-", r.status),
-            )
+        if self.source is None:
+            self.source = self._make_source()
+
+        if isinstance(self.source, PagedRowSource):
+            # nothing is held locally: drop cached pages, ask the backend for counts
+            self.source.invalidate()
+            stats = self.app.repo.get_stats()
+        else:
+            # a shared index is already current; otherwise re-index only what
+            # changed. Either way the table redraws just the visible window
+            if self.owns_index:
+                self.index.replace_all(self.app.repo.get_reminders())
+            stats = self.index.stats
+        self.table.set_source(self.source, keep_position=True)
+
+        self.total_var.set(str(stats.total))
+        self.sched_var.set(str(stats.scheduled))
+        self.done_var.set(str(stats.completed))
 
         self.status_label.config(
-            text=f"{total} reminder(s). Double-click a row or use Edit."
+            text=f"{stats.total} reminder(s). Double-click a row or use Edit."
         )
 
     def _get_selected_reminder(self) -> Optional[Reminder]:
-        sel = self.tree.selection()
+        sel = self.table.selection()
         if not sel:
             return None
-        rid = int(sel[0])
-        for r in self.app.repo.get_reminders():
-            if r.id == rid:
-                return r
-        return None
+        return self.app.repo.get_reminder(int(sel[0]))
 
     def add(self):
         self.app.show_details(None)
@@ -273,7 +249,7 @@ class DetailsScreen(BaseScreen):
             form,
             textvariable=self.status_var,
             width=20,
-            values=["scheduled", "completed", "cancelled"],
+            values=["scheduled", "acknowledged", "completed", "cancelled"],
             state="readonly",
         )
         status_box.grid(row=4, column=1, sticky="w")
@@ -423,7 +399,7 @@ class ReminderUIApp:
 
         self._configure_style()
 
-        self.repo: ReminderRepository = MockReminderRepository()
+        self.repo: ReminderRepository = self._make_repository()
 
         container = ttk.Frame(root, style="Body.TFrame")
         container.pack(fill="both", expand=True)
@@ -444,6 +420,36 @@ class ReminderUIApp:
 
         self.show_screen("home")
 
+    def _make_repository(self) -> ReminderRepository:
+        # REMINDER_API_URL=http://localhost:8000 syncs a local replica (REMINDER_LOCAL_DB)
+        # with the real API; REMINDER_API_PAGED=1 pages the table from the server instead.
+        # REMINDER_USER_ID picks whose reminders these are (X-User-Id)
+        base_url = os.environ.get("REMINDER_API_URL")
+        if not base_url:
+            return MockReminderRepository()
+        user_id = os.environ.get("REMINDER_USER_ID")
+        if os.environ.get("REMINDER_API_PAGED") == "1":
+            return HttpReminderRepository(
+                base_url, self.root, on_change=self._on_repo_change, on_error=self._on_repo_error, paged=True,
+                user_id=user_id,
+            )
+        return OfflineReminderRepository(
+            base_url,
+            self.root,
+            path=os.environ.get("REMINDER_LOCAL_DB", "ui_reminders.db"),
+            on_change=self._on_repo_change,
+            on_error=self._on_repo_error,
+            user_id=user_id,
+        )
+
+    def _on_repo_change(self):
+        if hasattr(self, "home_screen"):
+            self.home_screen.refresh()
+
+    def _on_repo_error(self, error):
+        if hasattr(self, "home_screen"):
+            self.home_screen.status_label.config(text=f"Server error: {error}")
+
     def _configure_style(self):
         style = ttk.Style()
         try:
@@ -0,0 +1,139 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+
+# ===================== Stats =====================
+
+@dataclass
+class ReminderStats:
+    total: int = 0
+    scheduled: int = 0
+    completed: int = 0
+
+    def count(self, status: str, sign: int = 1):
+        self.total += sign
+        if status == "scheduled":
+            self.scheduled += sign
+        elif status == "completed":
+            self.completed += sign
+
+
+# ===================== Table view model =====================
+
+def row_values(r) -> Tuple[str, str, str, str]:
+    return (r.time.strftime("%Y-%m-%d %H:%M"), r.task, r.repeat or "-", r.status)
+
+
+def sort_key(r):
+    return (r.time, r.id)
+
+
+def _keep_in_place(old_positions: List[int]) -> List[bool]:
+    """Longest increasing subsequence of old positions: the rows that don't need to move."""
+    tails: List[int] = []
+    tail_idx: List[int] = []
+    prev = [-1] * len(old_positions)
+    for i, pos in enumerate(old_positions):
+        k = bisect_left(tails, pos)
+        if k == len(tails):
+            tails.append(pos)
+            tail_idx.append(i)
+        else:
+            tails[k] = pos
+            tail_idx[k] = i
+        prev[i] = tail_idx[k - 1] if k else -1
+    keep = [False] * len(old_positions)
+    i = tail_idx[-1] if tail_idx else -1
+    while i != -1:
+        keep[i] = True
+        i = prev[i]
+    return keep
+
+
+@dataclass
+class TableDiff:
+    deletes: List[str] = field(default_factory=list)
+    updates: List[Tuple[str, tuple]] = field(default_factory=list)
+    moves: List[Tuple[int, str]] = field(default_factory=list)    # (index, iid)
+    inserts: List[Tuple[int, str, tuple]] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.deletes or self.updates or self.moves or self.inserts)
+
+
+class ReminderTableModel:
+    """
+    Remembers what the Treeview is showing (row order + values by id) so a
+    refresh only touches rows that changed instead of rebuilding the table.
+
+    Stats are kept up to date as rows come and go, not recounted.
+    """
+
+    def __init__(self):
+        self.order: List[str] = []          # iids in display order
+        self.values: Dict[str, tuple] = {}  # iid -> row values
+        self.status: Dict[str, str] = {}    # iid -> status (for stats)
+        self.stats = ReminderStats()
+
+    def diff(self, reminders: Iterable) -> TableDiff:
+        """Work out the edits that turn the displayed rows into `reminders` (sorted by time)."""
+        new_rows = {}
+        new_status = {}
+        for r in sorted(reminders, key=sort_key):
+            iid = str(r.id)
+            new_rows[iid] = row_values(r)
+            new_status[iid] = r.status
+        new_order = list(new_rows)
+
+        d = TableDiff()
+        d.deletes = [iid for iid in self.order if iid not in new_rows]
+
+        old_pos = {iid: i for i, iid in enumerate(self.order)}
+        kept = [iid for iid in new_order if iid in old_pos]
+        stay = dict(zip(kept, _keep_in_place([old_pos[iid] for iid in kept])))
+
+        for index, iid in enumerate(new_order):
+            if iid not in old_pos:
+                d.inserts.append((index, iid, new_rows[iid]))
+                continue
+            if self.values[iid] != new_rows[iid]:
+                d.updates.append((iid, new_rows[iid]))
+            if not stay[iid]:
+                d.moves.append((index, iid))
+
+        for iid in d.deletes:
+            self.stats.count(self.status[iid], -1)
+        for iid, status in new_status.items():
+            old = self.status.get(iid)
+            if old != status:
+                if old is not None:
+                    self.stats.count(old, -1)
+                self.stats.count(status)
+
+        self.order = new_order
+        self.values = new_rows
+        self.status = new_status
+        return d
+
+    def sync(self, tree, reminders: Iterable) -> TableDiff:
+        """Diff and apply to a ttk.Treeview (or anything with the same item methods)."""
+        d = self.diff(reminders)
+        for iid in d.deletes:
+            tree.delete(iid)
+        for iid, values in d.updates:
+            tree.item(iid, values=values)
+        # rows that move are detached first; the rest are already in the right
+        # relative order, so placing movers and new rows by index in ascending
+        # order rebuilds the exact new order
+        for _, iid in d.moves:
+            tree.detach(iid)
+        placements = sorted(
+            [(i, iid, None) for i, iid in d.moves] + d.inserts, key=lambda p: p[0]
+        )
+        for index, iid, values in placements:
+            if values is None:
+                tree.move(iid, "", index)
+            else:
+                tree.insert("", index, iid=iid, values=values)
+        return d
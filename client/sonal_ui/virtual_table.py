@@ -0,0 +1,213 @@
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, List, Optional, Protocol, Tuple
+
+from reminder_index import ReminderIndex
+from view_model import ReminderTableModel
+
+
+# ===================== Row sources =====================
+
+class RowSource(Protocol):
+    def count(self) -> int: ...
+    def rows(self, offset: int, limit: int) -> List[Optional[object]]: ...
+
+
+class IndexRowSource:
+    """Rows straight from a ReminderIndex, optionally filtered by status and task text."""
+
+    def __init__(self, index: ReminderIndex, status: Optional[str] = None, text: str = ""):
+        self.index = index
+        self.status = status
+        self.text = text.strip().lower()
+        self._matches = None  # (index version, keys) cache for a text filter
+
+    def _keys(self):
+        keys = self.index.view(self.status)
+        if not self.text:
+            return keys
+        # one pass over the already-sorted keys; cached until the index changes
+        stamp = self.index.version
+        if self._matches is None or self._matches[0] != stamp:
+            by_id = self.index.by_id
+            self._matches = (stamp, [k for k in keys if self.text in by_id[k[1]].task.lower()])
+        return self._matches[1]
+
+    def invalidate(self):
+        self._matches = None
+
+    def count(self) -> int:
+        return len(self._keys())
+
+    def rows(self, offset: int, limit: int):
+        by_id = self.index.by_id
+        return [by_id[key[1]] for key in self._keys()[offset:offset + limit]]
+
+
+class PagedRowSource:
+    """
+    Rows fetched page by page from a backend that paginates
+    (`fetch(offset, limit, status) -> (total, reminders)`).
+
+    Pages are kept in a small LRU cache. Missing rows come back as None;
+    pass `submit(fn, on_done)` to load pages off the UI thread, in which
+    case `on_loaded` is called once a page arrives so the view can redraw.
+    """
+
+    def __init__(self, fetch: Callable, page_size: int = 200, max_pages: int = 20,
+                 status: Optional[str] = None, submit: Optional[Callable] = None,
+                 on_loaded: Optional[Callable] = None):
+        self.fetch = fetch
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.status = status
+        self.submit = submit
+        self.on_loaded = on_loaded
+        self.total = 0
+        self._pages: "OrderedDict[int, list]" = OrderedDict()
+        self._loading = set()
+        self._load(0)
+
+    def invalidate(self):
+        self._pages.clear()
+        self._load(0)
+
+    def _store(self, page_no, result):
+        self._loading.discard(page_no)
+        self.total, items = result
+        self._pages[page_no] = items
+        self._pages.move_to_end(page_no)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def _load(self, page_no):
+        if page_no in self._pages or page_no in self._loading:
+            return
+        offset = page_no * self.page_size
+        if self.submit is None:
+            self._store(page_no, self.fetch(offset, self.page_size, self.status))
+            return
+
+        def done(result):
+            self._store(page_no, result)
+            if self.on_loaded:
+                self.on_loaded()
+
+        self._loading.add(page_no)
+        self.submit(lambda: self.fetch(offset, self.page_size, self.status), done)
+
+    def count(self) -> int:
+        return self.total
+
+    def rows(self, offset: int, limit: int):
+        out = []
+        first, last = offset // self.page_size, (offset + limit) // self.page_size
+        for page_no in range(first, last + 2):  # one page of read-ahead
+            self._load(page_no)
+        for i in range(offset, min(offset + limit, self.total)):
+            page = self._pages.get(i // self.page_size)
+            if page is not None:
+                self._pages.move_to_end(i // self.page_size)
+            j = i % self.page_size
+            out.append(page[j] if page is not None and j < len(page) else None)
+        return out
+
+
+# ===================== Virtualized table =====================
+
+class VirtualReminderTable(ttk.Frame):
+    """
+    Treeview that only ever holds the rows currently on screen.
+
+    The scrollbar is driven by the row source's count, not by the tree,
+    so 100k reminders cost the same to display as 10. Scrolling re-renders
+    the window through ReminderTableModel, which only touches changed rows.
+    """
+
+    COLUMNS = ("time", "task", "repeat", "status")
+
+    def __init__(self, parent, height: int = 10, style: str = "Reminders.Treeview", **kwargs):
+        super().__init__(parent, **kwargs)
+        self.source: Optional[RowSource] = None
+        self.start = 0
+        self.visible = height
+        self.selected_id: Optional[int] = None
+        self.table = ReminderTableModel()
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=height,
+                                 style=style, selectmode="browse")
+        for col, text in zip(self.COLUMNS, ["Time", "Task", "Repeat", "Status"]):
+            self.tree.heading(col, text=text)
+        self.tree.column("time", width=150, anchor="w")
+        self.tree.column("task", width=280, anchor="w")
+        self.tree.column("repeat", width=90, anchor="center")
+        self.tree.column("status", width=90, anchor="center")
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units", 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units", 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units", 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, "pages"))
+
+    def set_source(self, source: RowSource, keep_position: bool = False):
+        self.source = source
+        if not keep_position:
+            self.start = 0
+        self.render()
+
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup(self.tree.cget("style"), "rowheight") or 24)
+        rows = max(1, (event.height - rowheight) // rowheight)  # minus the heading row
+        if rows != self.visible:
+            self.visible = rows
+            self.render()
+
+    def _on_select(self, _event):
+        sel = self.tree.selection()
+        if sel:
+            self.selected_id = int(sel[0])
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self._count()))
+        else:
+            self.scroll(int(amount), unit)
+
+    def _count(self) -> int:
+        return self.source.count() if self.source is not None else 0
+
+    def scroll(self, direction: int, unit: str = "units", step: int = 1):
+        delta = direction * (self.visible if unit == "pages" else step)
+        self.scroll_to(self.start + delta)
+        return "break"
+
+    def scroll_to(self, row: int):
+        row = max(0, min(row, self._count() - self.visible))
+        if row != self.start:
+            self.start = row
+            self.render()
+
+    def render(self):
+        """Redraw the visible window (cheap: only changed rows are touched)."""
+        total = self._count()
+        self.start = max(0, min(self.start, total - self.visible))
+        rows = self.source.rows(self.start, self.visible) if self.source is not None else []
+        self.table.sync(self.tree, [r for r in rows if r is not None])
+
+        if self.selected_id is not None and self.tree.exists(str(self.selected_id)):
+            if self.tree.selection() != (str(self.selected_id),):
+                self.tree.selection_set(str(self.selected_id))
+
+        if total:
+            self.scrollbar.set(self.start / total, min(1.0, (self.start + self.visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def selection(self) -> Tuple[str, ...]:
+        return (str(self.selected_id),) if self.selected_id is not None else ()
@@ -2,18 +2,45 @@
 
 from fastapi import FastAPI
 from routes.reminders import router as reminders_router
-from scheduler import start_scheduler
+from routes.events import router as events_router
+from routes.health import router as health_router
+from routes.dispatch import router as dispatch_router
+from scheduler import start_scheduler, stop_scheduler
+from event_log import event_writer
+from dispatcher import dispatcher, configure_from_env
 from contextlib import asynccontextmanager
 
-from database import engine
+import database
+from database import upgrade_schema, SessionLocal
+from search_index import search_index
 from models import Base
+import crud
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    #create database and tables if they dont exist
-    Base.metadata.create_all(bind=engine)
+    #create database and tables if they dont exist (and add any new columns/indexes)
+    upgrade_schema(Base.metadata)
+    db = SessionLocal()
+    try:
+        crud.normalize_statuses(db)
+        crud.backfill_user_ids(db)
+        crud.init_change_counter(db)
+        crud.backfill_due_at(db)
+    finally:
+        db.close()
+    search_index.setup(database.engine)
+    event_writer.start()
+    if not dispatcher.channels:
+        configure_from_env()
+    dispatcher.start()
     start_scheduler()
     yield
+    stop_scheduler()
+    dispatcher.stop()
+    event_writer.stop()
 
 app = FastAPI(lifespan=lifespan)
-app.include_router(reminders_router)
\ No newline at end of file
+app.include_router(reminders_router)
+app.include_router(events_router)
+app.include_router(health_router)
+app.include_router(dispatch_router)
@@ -0,0 +1,335 @@
+"""
+Audio capture helpers for the voice client.
+
+Recordings stay in memory: the NumPy buffer from sounddevice is encoded
+straight into WAV (or FLAC, if soundfile is installed) bytes and uploaded
+from there, so no temp files are written or left behind on a crash.
+
+Continuous mode listens on an InputStream and uses an energy-based VAD to
+cut out just the spoken command, instead of recording a fixed window.
+ArraySource feeds the same pipeline from a buffer or WAV file, so it can
+be exercised without a microphone.
+"""
+
+import io
+import queue
+import wave
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+try:
+    import soundfile
+
+    SOUNDFILE_AVAILABLE = True
+except Exception:
+    SOUNDFILE_AVAILABLE = False
+
+MIME_TYPES = {"wav": "audio/wav", "flac": "audio/flac"}
+
+
+class AudioClip(NamedTuple):
+    """Encoded recording ready to upload to /stt."""
+    data: bytes
+    filename: str
+    content_type: str
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """Convert a float [-1, 1] or int16 buffer (any shape) to int16 PCM."""
+    if audio.dtype == np.int16:
+        return audio
+    clipped = np.clip(audio, -1.0, 1.0)
+    return (clipped * 32767).astype(np.int16)
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encode a (frames,) or (frames, channels) buffer as 16-bit PCM WAV bytes."""
+    pcm = to_int16(audio)
+    channels = 1 if pcm.ndim == 1 else pcm.shape[1]
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, fmt: str = "wav") -> AudioClip:
+    """
+    Encode audio for upload.
+
+    FLAC is roughly half the size of WAV for speech; falls back to WAV
+    when FLAC was requested but soundfile isn't installed.
+    """
+    if fmt == "flac" and SOUNDFILE_AVAILABLE:
+        buf = io.BytesIO()
+        soundfile.write(buf, to_int16(audio), sample_rate, format="FLAC", subtype="PCM_16")
+        return AudioClip(buf.getvalue(), "audio.flac", MIME_TYPES["flac"])
+    return AudioClip(encode_wav(audio, sample_rate), "audio.wav", MIME_TYPES["wav"])
+
+
+def decode_wav(data: bytes) -> tuple:
+    """Inverse of encode_wav: returns (int16 array, sample_rate). Handy for tests/replay."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        frames = w.readframes(w.getnframes())
+        audio = np.frombuffer(frames, dtype=np.int16)
+        if w.getnchannels() > 1:
+            audio = audio.reshape(-1, w.getnchannels())
+        return audio, w.getframerate()
+
+
+# ----------------------------------------
+# Continuous capture with energy-based VAD
+# ----------------------------------------
+
+FRAME_MS = 30
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of int16 samples (keeps the last `capacity`)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.int16)
+        self._pos = 0
+        self._size = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        end = self._pos + n
+        if end <= self.capacity:
+            self._buf[self._pos:end] = samples
+        else:
+            split = self.capacity - self._pos
+            self._buf[self._pos:] = samples[:split]
+            self._buf[:n - split] = samples[split:]
+        self._pos = end % self.capacity
+        self._size = min(self.capacity, self._size + n)
+
+    def read_all(self) -> np.ndarray:
+        """Oldest-to-newest copy of the buffered samples."""
+        if self._size < self.capacity:
+            return self._buf[:self._size].copy()
+        return np.concatenate((self._buf[self._pos:], self._buf[:self._pos]))
+
+    def clear(self) -> None:
+        self._pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def frame_dbfs(frame: np.ndarray) -> float:
+    """RMS level of an int16 frame in dBFS (0 = full scale, silence ~ -90)."""
+    if len(frame) == 0:
+        return -120.0
+    rms = np.sqrt(np.mean(frame.astype(np.float32) ** 2)) / 32768.0
+    return 20.0 * np.log10(max(rms, 1e-6))
+
+
+class SpeechSegmenter:
+    """
+    Energy-based start/end-of-speech detector.
+
+    Feed fixed-size int16 frames; `feed` returns the speech segment
+    (with a short pre-roll so the first syllable isn't clipped) once
+    the speaker has been quiet for `end_silence_ms`.
+
+    The noise floor adapts while no one is speaking, so the threshold
+    follows the room instead of being a fixed level.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16_000,
+        frame_ms: int = FRAME_MS,
+        margin_db: float = 12.0,      # speech must be this much above the noise floor
+        min_speech_db: float = -50.0,  # ...and at least this loud
+        start_ms: int = 90,            # consecutive speech needed to start a segment
+        end_silence_ms: int = 700,     # trailing silence that ends a segment
+        pre_roll_ms: int = 300,
+        min_segment_ms: int = 300,     # shorter blips (clicks, coughs) are dropped
+        max_segment_s: float = 15.0,   # hard cap so a noisy room can't record forever
+    ):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.min_segment_frames = max(1, min_segment_ms // frame_ms)
+        self.max_segment_frames = int(max_segment_s * 1000 // frame_ms)
+        self.pre_roll = RingBuffer(sample_rate * pre_roll_ms // 1000)
+        self.noise_db = -70.0
+        self.reset()
+
+    def reset(self) -> None:
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._segment = []
+        self._onset = []
+        self.pre_roll.clear()
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        level = frame_dbfs(frame)
+        speech = level > max(self.noise_db + self.margin_db, self.min_speech_db)
+        if not speech and not self.in_speech:
+            # slow EMA so a single loud frame doesn't drag the floor up
+            self.noise_db = 0.95 * self.noise_db + 0.05 * level
+        return speech
+
+    def feed(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        frame = to_int16(frame).reshape(-1)
+        speech = self.is_speech(frame)
+
+        if not self.in_speech:
+            if speech:
+                self._speech_run += 1
+                self._onset.append(frame)
+                if self._speech_run >= self.start_frames:
+                    self.in_speech = True
+                    self._segment = [self.pre_roll.read_all()] + self._onset
+                    self._onset = []
+                    self._silence_run = 0
+            else:
+                for f in self._onset:
+                    self.pre_roll.write(f)
+                self._onset = []
+                self._speech_run = 0
+                self.pre_roll.write(frame)
+            return None
+
+        self._segment.append(frame)
+        self._silence_run = 0 if speech else self._silence_run + 1
+        spoken = len(self._segment) - self._silence_run
+        if self._silence_run >= self.end_frames or len(self._segment) >= self.max_segment_frames:
+            segment = np.concatenate(self._segment)
+            self.reset()
+            if spoken < self.min_segment_frames:
+                return None
+            return segment
+        return None
+
+    def flush(self) -> Optional[np.ndarray]:
+        """Return whatever is in progress (end of input)."""
+        if not self.in_speech:
+            return None
+        segment = np.concatenate(self._segment)
+        self.reset()
+        return segment
+
+
+class ArraySource:
+    """Frame source backed by an in-memory buffer - for tests and replays, no mic needed."""
+
+    def __init__(self, audio: np.ndarray, sample_rate: int = 16_000, frame_ms: int = FRAME_MS):
+        self.audio = to_int16(np.asarray(audio)).reshape(-1)
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+
+    @classmethod
+    def from_wav(cls, path: str, frame_ms: int = FRAME_MS) -> "ArraySource":
+        with open(path, "rb") as f:
+            audio, sample_rate = decode_wav(f.read())
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        return cls(audio, sample_rate, frame_ms)
+
+    def frames(self):
+        n = self.frame_samples
+        for start in range(0, len(self.audio) - n + 1, n):
+            yield self.audio[start:start + n]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class MicrophoneSource:
+    """
+    Live microphone frames from a sounddevice.InputStream callback.
+
+    The callback only copies each block into a bounded queue (dropping the
+    oldest block if the consumer falls behind), so the audio thread never blocks.
+    """
+
+    def __init__(self, sample_rate: int = 16_000, channels: int = 1, frame_ms: int = FRAME_MS, max_queued_s: float = 5.0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._queue = queue.Queue(maxsize=int(max_queued_s * 1000 // frame_ms))
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        block = indata[:, 0].copy()
+        try:
+            self._queue.put_nowait(block)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(block)
+
+    def __enter__(self):
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="int16",
+            blocksize=self.frame_samples,
+            callback=self._callback,
+        )
+        self._stream.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        return False
+
+    def frames(self, timeout: float = 1.0):
+        while self._stream is not None:
+            try:
+                yield self._queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+
+def iter_utterances(source, segmenter: Optional[SpeechSegmenter] = None):
+    """Yield each speech segment found in the source's frames (continuous mode)."""
+    segmenter = segmenter or SpeechSegmenter(source.sample_rate)
+    for frame in source.frames():
+        segment = segmenter.feed(frame)
+        if segment is not None:
+            yield segment
+    tail = segmenter.flush()
+    if tail is not None:
+        yield tail
+
+
+def capture_utterance(source, segmenter: Optional[SpeechSegmenter] = None, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+    """
+    Listen until one utterance has been spoken and return just that segment.
+
+    Returns None if nothing was said within `timeout` seconds (of audio).
+    """
+    segmenter = segmenter or SpeechSegmenter(source.sample_rate)
+    max_frames = None if timeout is None else int(timeout * source.sample_rate / segmenter.frame_samples)
+    for i, frame in enumerate(source.frames()):
+        segment = segmenter.feed(frame)
+        if segment is not None:
+            return segment
+        if max_frames is not None and i >= max_frames and not segmenter.in_speech:
+            return None
+    return segmenter.flush()
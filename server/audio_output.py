@@ -0,0 +1,218 @@
+"""
+Asynchronous speech + desktop notification output for the voice client.
+
+pyttsx3 engines are not thread-safe and `runAndWait()` blocks until the
+sentence has been spoken, so a single worker thread owns the engine and
+everything else just enqueues:
+
+- Priority queue: due reminders are spoken before command confirmations
+  and chatter, regardless of arrival order
+- Coalescing: a burst of due reminders becomes one notification and one
+  sentence ("You have 5 reminders due: ...") instead of five
+- Cancellation: queued items can be dropped by category (e.g. stale
+  confirmations when a new command starts)
+
+`say` / `announce_due` / `notify` return immediately.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+# ----------------------------------------
+# CONFIG
+# ----------------------------------------
+
+PRIORITY_DUE = 0        # due reminders
+PRIORITY_CONFIRM = 1    # "Reminder created for ...", errors
+PRIORITY_INFO = 2       # echoes and hints
+
+COALESCE_WINDOW = 0.25  # seconds to wait for more due reminders in a burst
+COALESCE_MIN = 3        # bursts this size or larger are summarized
+MAX_LISTED = 3          # tasks read out in a summarized burst
+
+
+class OutputItem(NamedTuple):
+    kind: str                 # "speech" | "notify" | "due"
+    text: str
+    title: str = ""
+    category: str = "feedback"
+    generation: int = 0
+
+
+class AudioOutput:
+    """
+    Background worker that owns the TTS engine and the notifier.
+
+    Args:
+        engine_factory: builds the TTS engine *on the worker thread*
+            (pyttsx3.init by default); anything with say()/runAndWait().
+        notifier: callable(title, message) for desktop notifications, or None.
+    """
+
+    def __init__(self, engine_factory: Optional[Callable] = None, notifier: Optional[Callable] = None):
+        self.engine_factory = engine_factory
+        self.notifier = notifier
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._cancelled = {}        # category -> generation below which items are dropped
+        self._generation = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = 0
+        self._engine = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- producer side (any thread) ----------
+
+    def _put(self, priority: int, item: OutputItem) -> None:
+        with self._lock:
+            self._pending += 1
+            self._idle.clear()
+            item = item._replace(generation=self._generation)
+        self._queue.put((priority, next(self._seq), item))
+
+    def say(self, text: str, priority: int = PRIORITY_CONFIRM, category: str = "feedback") -> None:
+        """Queue a sentence to be spoken."""
+        self._put(priority, OutputItem("speech", text, category=category))
+
+    def notify(self, title: str, message: str, priority: int = PRIORITY_CONFIRM) -> None:
+        """Queue a desktop notification."""
+        self._put(priority, OutputItem("notify", message, title=title, category="notify"))
+
+    def announce_due(self, task: str) -> None:
+        """Notify and speak a due reminder; bursts are merged into one announcement."""
+        self._put(PRIORITY_DUE, OutputItem("due", task, title="Reminder due", category="due"))
+
+    def cancel(self, category: Optional[str] = None) -> None:
+        """
+        Drop everything queued so far (or only `category`) and interrupt
+        the sentence being spoken where the engine supports it.
+        """
+        with self._lock:
+            self._generation += 1
+            if category is None:
+                self._cancelled = {"*": self._generation}
+            else:
+                self._cancelled[category] = self._generation
+        engine = self._engine
+        if engine is not None and hasattr(engine, "stop"):
+            try:
+                engine.stop()
+            except Exception:
+                pass
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued has been spoken (e.g. before recording or exiting)."""
+        return self._idle.wait(timeout)
+
+    # ---------- worker side ----------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="audio-output", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put((float("inf"), next(self._seq), None))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _is_cancelled(self, item: OutputItem) -> bool:
+        with self._lock:
+            cutoff = max(self._cancelled.get("*", 0), self._cancelled.get(item.category, 0))
+        return item.generation < cutoff
+
+    def _done(self, count: int = 1) -> None:
+        with self._lock:
+            self._pending -= count
+            if self._pending <= 0:
+                self._pending = 0
+                self._idle.set()
+
+    def _drain_due(self, first: OutputItem) -> List[OutputItem]:
+        """Collect the rest of a due-reminder burst; other items go back on the queue."""
+        burst = [first]
+        deadline = time.monotonic() + COALESCE_WINDOW
+        held = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                priority, seq, item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is not None and item.kind == "due":
+                burst.append(item)
+            else:
+                held.append((priority, seq, item))
+                if item is None:
+                    break
+        for entry in held:
+            self._queue.put(entry)
+        return burst
+
+    def _run(self) -> None:
+        try:
+            if self.engine_factory is None:
+                import pyttsx3
+
+                self._engine = pyttsx3.init()
+            else:
+                self._engine = self.engine_factory()
+        except Exception as e:
+            print("[TTS WARNING] Speech output unavailable:", e)
+            self._engine = None
+
+        while True:
+            _, _, item = self._queue.get()
+            if item is None:
+                return
+            items = self._drain_due(item) if item.kind == "due" else [item]
+            live = [i for i in items if not self._is_cancelled(i)]
+            try:
+                if live:
+                    self._handle(live)
+            except Exception as e:
+                print("[TTS ERROR]", e)
+            finally:
+                self._done(len(items))
+
+    def _handle(self, items: List[OutputItem]) -> None:
+        item = items[0]
+        if item.kind == "notify":
+            self._notify(item.title, item.text)
+        elif item.kind == "speech":
+            self._speak(item.text)
+        elif len(items) < COALESCE_MIN:
+            for due in items:
+                self._notify(due.title, due.text)
+                self._speak(due.text)
+        else:
+            tasks = [due.text for due in items]
+            listed = ", ".join(tasks[:MAX_LISTED])
+            more = f", and {len(tasks) - MAX_LISTED} more" if len(tasks) > MAX_LISTED else ""
+            self._notify(f"{len(tasks)} reminders due", "\n".join(tasks))
+            self._speak(f"You have {len(tasks)} reminders due: {listed}{more}.")
+
+    def _speak(self, text: str) -> None:
+        print(f"[TTS] {text}")
+        if self._engine is not None:
+            self._engine.say(text)
+            self._engine.runAndWait()
+
+    def _notify(self, title: str, message: str) -> None:
+        print(f"[NOTIFY] {title}: {message}")
+        if self.notifier is None:
+            return
+        try:
+            self.notifier(title, message)
+        except Exception:
+            print("[NOTIFY WARNING] Failed to send desktop notification.")
@@ -0,0 +1,273 @@
+"""
+Reminder API benchmark harness.
+
+Boots the FastAPI app in-process (no uvicorn, no lifespan scheduler thread) against a
+throwaway SQLite file, seeds N reminders and measures:
+
+- create / list / delete throughput through the HTTP layer at several concurrency levels
+- scheduler tick time and due-fire lag, driven by a virtual clock (no sleeping)
+
+Results are written as JSON so runs can be diffed for regressions:
+
+    python benchmark.py --sizes 1000,10000,100000 --concurrency 1,4,8 --output bench_results.json
+
+Needs httpx for fastapi's TestClient.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+import database
+from models import Base, Reminder, ChangeCounter
+import clock
+import crud
+import scheduler
+from cache import reminder_cache
+from event_log import event_writer
+from tenancy import api_limiter
+from app import app
+
+SEED_CHUNK = 10_000
+BASE_TIME = datetime(2030, 1, 1, 0, 0, 0)  # fixed so runs are comparable
+
+
+class VirtualClock(clock.SimulatedClock):
+    """Simulated clock that also counts the real time spent inside the current tick.
+
+    Time only jumps when the benchmark sets it, but fire lag still includes the actual
+    processing delay of the tick that fired the reminder.
+    """
+
+    def __init__(self, start):
+        super().__init__(start)
+        self._tick_started = None
+
+    def set(self, when):
+        super().set(when)
+        self._tick_started = time.perf_counter()
+
+    def now(self):
+        elapsed = time.perf_counter() - self._tick_started if self._tick_started else 0.0
+        return super().now() + timedelta(seconds=elapsed)
+
+
+def fresh_database(path):
+    if os.path.exists(path):
+        os.remove(path)
+    engine = database.configure_database(f"sqlite:///{path}")
+    database.upgrade_schema(Base.metadata, bind=engine)
+    db = database.SessionLocal()
+    try:
+        crud.init_change_counter(db)
+    finally:
+        db.close()
+    reminder_cache.invalidate()
+
+
+def seed(n, span_hours=24):
+    """Bulk insert n reminders spread evenly over `span_hours` from BASE_TIME."""
+    step = span_hours * 3600 / max(n, 1)
+    stamp = BASE_TIME.isoformat()
+    db = database.SessionLocal()
+    try:
+        for start in range(0, n, SEED_CHUNK):
+            rows = [
+                {
+                    "task": f"seeded reminder {i}",
+                    "time_iso": (BASE_TIME + timedelta(seconds=i * step)).isoformat(),
+                    "due_at": (BASE_TIME + timedelta(seconds=i * step)).timestamp(),
+                    "repeat": None,
+                    "status": "scheduled",
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                    "change_seq": i + 1,
+                }
+                for i in range(start, min(start + SEED_CHUNK, n))
+            ]
+            db.execute(insert(Reminder), rows)
+        db.query(ChangeCounter).filter(ChangeCounter.id == 1).update({ChangeCounter.value: n})
+        db.commit()
+    finally:
+        db.close()
+    reminder_cache.invalidate()
+
+
+def timed_calls(fn, count, concurrency):
+    """Run fn(i) count times on `concurrency` threads; return (wall seconds, latencies)."""
+    latencies = []
+
+    def one(i):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(count):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(count)))
+    return time.perf_counter() - start, latencies
+
+
+def result(size, op, concurrency, count, seconds, latencies, **extra):
+    ordered = sorted(latencies)
+    row = {
+        "size": size,
+        "op": op,
+        "concurrency": concurrency,
+        "ops": count,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(count / seconds, 2) if seconds else None,
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3) if ordered else None,
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3) if ordered else None,
+    }
+    row.update(extra)
+    print(f"  {op:<14} n={size:<8} c={concurrency:<3} {row['ops_per_sec']} ops/s  p50={row['p50_ms']}ms")
+    return row
+
+
+def bench_http(client, size, concurrency, ops, list_reps):
+    rows = []
+    created = []
+
+    def create(i):
+        r = client.post("/reminders/", json={
+            "task": f"bench {i}",
+            "time_iso": (BASE_TIME + timedelta(days=2, seconds=i)).isoformat(),
+            "repeat": None,
+        })
+        if r.status_code != 200:
+            raise RuntimeError(f"create failed: {r.status_code} {r.text}")
+        created.append(r.json()["id"])
+
+    seconds, lat = timed_calls(create, ops, concurrency)
+    rows.append(result(size, "create", concurrency, ops, seconds, lat))
+
+    def list_cold(_):
+        reminder_cache.invalidate()
+        client.get("/reminders/")
+
+    seconds, lat = timed_calls(list_cold, list_reps, concurrency)
+    rows.append(result(size, "list_cold", concurrency, list_reps, seconds, lat))
+
+    etag = client.get("/reminders/").headers.get("etag")
+
+    seconds, lat = timed_calls(lambda _: client.get("/reminders/"), list_reps, concurrency)
+    rows.append(result(size, "list_cached", concurrency, list_reps, seconds, lat))
+
+    seconds, lat = timed_calls(
+        lambda _: client.get("/reminders/", headers={"If-None-Match": etag}), ops, concurrency
+    )
+    rows.append(result(size, "list_304", concurrency, ops, seconds, lat))
+
+    seconds, lat = timed_calls(lambda i: client.delete(f"/reminders/{created[i]}"), len(created), concurrency)
+    rows.append(result(size, "delete", concurrency, len(created), seconds, lat))
+    return rows
+
+
+def bench_scheduler(size, workers, hours, tick_seconds=60):
+    """Drive the due scan over `hours` of virtual time with `workers` parallel shard owners."""
+    virtual = VirtualClock(BASE_TIME)
+    previous = clock.set_clock(virtual)
+    shard_sets = [list(range(w, scheduler.NUM_SHARDS, workers)) for w in range(workers)]
+    tick_times = []
+    lags = []
+    fired_total = 0
+
+    ticks = int(hours * 3600 / tick_seconds)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for t in range(1, ticks + 1):
+            now = BASE_TIME + timedelta(seconds=t * tick_seconds)
+            virtual.set(now)
+
+            def worker(shards):
+                db = database.SessionLocal()
+                try:
+                    due = crud.get_due_reminders(db, now.timestamp(), shards=shards, num_shards=scheduler.NUM_SHARDS)
+                    fired = 0
+                    for reminder in due:
+                        if crud.mark_due(db, reminder):
+                            fired += 1
+                            lags.append(scheduler.fire_lag_seconds(reminder, virtual.now()))
+                    return fired
+                finally:
+                    db.close()
+
+            tick_start = time.perf_counter()
+            fired_total += sum(pool.map(worker, shard_sets))
+            tick_times.append(time.perf_counter() - tick_start)
+    seconds = time.perf_counter() - start
+    clock.set_clock(previous)
+    event_writer.flush()
+
+    lags = sorted(l for l in lags if l is not None)
+    row = result(
+        size, "scheduler_tick", workers, ticks, seconds, tick_times,
+        fired=fired_total,
+        virtual_hours=hours,
+        lag_p50_s=round(lags[len(lags) // 2], 3) if lags else None,
+        lag_p99_s=round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3) if lags else None,
+        lag_max_s=round(lags[-1], 3) if lags else None,
+    )
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated seed sizes, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--concurrency", default="1,4,8", help="comma separated client thread / scheduler worker counts")
+    parser.add_argument("--ops", type=int, default=200, help="creates/deletes per run")
+    parser.add_argument("--list-reps", type=int, default=5, help="full list requests per run")
+    parser.add_argument("--sched-hours", type=float, default=2.0, help="virtual hours the scheduler is driven through")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    db_path = os.path.join(tempfile.mkdtemp(prefix="reminder_bench_"), "bench.db")
+
+    client = TestClient(app)  # not used as a context manager: no lifespan, no real scheduler thread
+    # every in-process call is the same (default) user; the per-user limit would turn
+    # most of the run into 429s and measure the limiter instead of the api
+    api_limiter.rate = None
+    results = []
+    for size in sizes:
+        print(f"size={size}")
+        for level in levels:
+            fresh_database(db_path)
+            start = time.perf_counter()
+            seed(size)
+            results.append(result(size, "seed", 1, size, time.perf_counter() - start, []))
+            results.extend(bench_http(client, size, level, args.ops, args.list_reps))
+            results.append(bench_scheduler(size, level, args.sched_hours))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "shards": scheduler.NUM_SHARDS,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
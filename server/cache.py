@@ -0,0 +1,112 @@
+#in-process read-through cache for reminder reads, invalidated by the write paths in crud
+import hashlib, threading, time
+from collections import OrderedDict
+
+#invalidation is per-process; when running several workers set this (seconds) so a worker
+#picks up writes made by the others within that window
+CACHE_TTL = None
+CACHE_MAX_USERS = 1024 #users whose full list / single lookups are kept
+
+class ReminderCache:
+    """Caches each user's reminder list and single-reminder lookups as plain dicts.
+
+    Every invalidation bumps `version`; a load only stores its result if the version is
+    unchanged, so a write racing with a read can never leave stale data cached. Lists and
+    lookups are kept for the `max_users` most recently read users; evicting a user drops both.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_users=CACHE_MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.version = 0
+        self._lock = threading.Lock()
+        self._lists = OrderedDict()  #user_id -> (etag, items, loaded_at)
+        self._by_id = OrderedDict()  #user_id -> {id: (item, loaded_at)}
+
+    def _fresh(self, loaded_at):
+        return self.ttl is None or time.monotonic() - loaded_at < self.ttl
+
+    def invalidate(self, reminder_id=None, user_id=None):
+        #user_id None means "any user" - drops every list (and every lookup if no id either)
+        with self._lock:
+            self.version += 1
+            if user_id is None:
+                self._lists.clear()
+            else:
+                self._lists.pop(user_id, None)
+            if reminder_id is None:
+                if user_id is None:
+                    self._by_id.clear()
+                else:
+                    self._by_id.pop(user_id, None)
+            elif user_id is None:
+                for items in self._by_id.values():
+                    items.pop(reminder_id, None)
+            else:
+                self._by_id.get(user_id, {}).pop(reminder_id, None)
+
+    def _cached_list(self, user_id):
+        hit = self._lists.get(user_id)
+        if hit is not None and self._fresh(hit[2]):
+            self._lists.move_to_end(user_id)
+            return hit
+        return None
+
+    def _user_items(self, user_id):
+        #the user's lookup dict, marked most recently used; evicts whole users past max_users
+        items = self._by_id.get(user_id)
+        if items is None:
+            items = self._by_id[user_id] = {}
+        self._by_id.move_to_end(user_id)
+        while len(self._by_id) > self.max_users:
+            evicted, _ = self._by_id.popitem(last=False)
+            self._lists.pop(evicted, None)
+        return items
+
+    def peek_etag(self, user_id):
+        """ETag of the user's cached list, or None if it would have to be reloaded."""
+        with self._lock:
+            hit = self._cached_list(user_id)
+            return hit[0] if hit is not None else None
+
+    def get_list(self, user_id, loader):
+        with self._lock:
+            hit = self._cached_list(user_id)
+            if hit is not None:
+                return hit[0], hit[1]
+            version = self.version
+        items = loader()
+        etag = make_etag(items)
+        now = time.monotonic()
+        with self._lock:
+            if self.version == version:
+                self._lists[user_id] = (etag, items, now)
+                while len(self._lists) > self.max_users:
+                    evicted, _ = self._lists.popitem(last=False)
+                    self._by_id.pop(evicted, None)
+                by_id = self._user_items(user_id)
+                for item in items:
+                    by_id[item["id"]] = (item, now)
+        return etag, items
+
+    def get_one(self, user_id, reminder_id, loader):
+        with self._lock:
+            hit = self._by_id.get(user_id, {}).get(reminder_id)
+            if hit is not None and self._fresh(hit[1]):
+                return hit[0]
+            version = self.version
+        item = loader()
+        if item is not None:
+            with self._lock:
+                if self.version == version:
+                    self._user_items(user_id)[reminder_id] = (item, time.monotonic())
+        return item
+
+def make_etag(items):
+    #content hash rather than the version counter so etags stay valid across restarts/workers
+    digest = hashlib.blake2b(digest_size=12)
+    for item in items:
+        digest.update(repr(sorted(item.items())).encode())
+    return f'"{digest.hexdigest()}"'
+
+reminder_cache = ReminderCache()
@@ -0,0 +1,63 @@
+#clock abstraction so scheduler/crud timestamps can run on virtual time
+import threading, time
+from datetime import datetime, timedelta
+
+class SystemClock:
+    """Wall clock - the default."""
+
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds, stop_event=None):
+        #returns True if woken early by stop_event
+        if stop_event is not None:
+            return stop_event.wait(seconds)
+        time.sleep(seconds)
+        return False
+
+class SimulatedClock:
+    """Virtual clock: time only moves when advance()/sleep() is called, and sleeping is instant."""
+
+    def __init__(self, start=None):
+        self._now = start or datetime.now()
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            return self._now
+
+    def time(self):
+        return self.now().timestamp()
+
+    def set(self, when):
+        with self._lock:
+            self._now = when
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += timedelta(seconds=seconds)
+            return self._now
+
+    def sleep(self, seconds, stop_event=None):
+        self.advance(seconds)
+        return stop_event is not None and stop_event.is_set()
+
+_clock = SystemClock()
+
+def get_clock():
+    return _clock
+
+def set_clock(clock):
+    #returns the previous clock so callers can restore it
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+def now():
+    return _clock.now()
+
+def now_iso():
+    return _clock.now().isoformat()
@@ -0,0 +1,331 @@
+"""
+Grammar-driven intent parser for voice commands (text after the safe word).
+
+All command patterns are declared once in GRAMMAR as small templates with
+slots ({task}, {time}, {repeat}, {id}, {duration}). At import they are
+compiled into ONE alternation regex, so parsing a transcript is a single
+match no matter how many rules there are; the named group of the rule
+that matched tells us the intent and which slot groups to read.
+
+Intents and slots:
+
+    list                                  "list reminders", "what are my reminders"
+    search   task                         "list reminders about mom", "find my reminders for the dentist"
+    create   task, time, repeat           "remind me to call mom at 6 pm"
+                                          "remind me at 6 to call mom"
+                                          "remind me to stretch every day at 9"
+    delete   target_id | task             "delete reminder 3", "cancel the reminder to call mom"
+    snooze   target_id?, duration?        "snooze", "snooze reminder 2 for 15 minutes"
+    complete target_id?                   "mark reminder 4 as done", "done"
+
+Benchmark the parser over a generated corpus of transcripts:
+
+    python command_grammar.py --corpus 5000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import NamedTuple, Optional
+
+# ----------------------------------------
+# Slot patterns
+# ----------------------------------------
+
+_WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+}
+_NUMBER = r"(?:\d+|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+
+_CLOCK = (
+    r"(?:(?:at\s+)?(?:noon|midnight|" + _NUMBER + r"(?::\d{2})?(?:\s*[ap]\.?\s?m\.?)?(?:\s+o'?clock)?)"
+    r"(?:\s+(?:in\s+the\s+(?:morning|afternoon|evening)|at\s+night|tonight|today|tomorrow))?)"
+)
+_DAY = r"(?:today|tonight|tomorrow|day\s+after\s+tomorrow|(?:next\s+|on\s+)?(?:" + _WEEKDAYS + r"))"
+_DURATION = (
+    r"(?:(?:half\s+an?|an?|" + _NUMBER + r"(?:\.\d+)?)(?:\s+and\s+a\s+half)?\s+"
+    r"(?:second|sec|minute|min|hour|hr|day|week)s?)"
+)
+_ISO = r"(?:\d{4}-\d{2}-\d{2}(?:[t\s]\d{2}:\d{2}(?::\d{2})?)?)"
+
+SLOTS = {
+    # a task never ends in "every"/"each", so "pay rent every monday" is a repeat, not a time
+    "task": r".+?(?<!\bevery)(?<!\beach)",
+    "time": (
+        r"(?:(?:at\s+|on\s+)?" + _ISO
+        + r"|in\s+" + _DURATION
+        + r"|" + _DAY + r"(?:\s+" + _CLOCK + r")?"
+        + r"|" + _CLOCK + r"(?:\s+(?:on\s+)?" + _DAY + r")?)"
+    ),
+    "repeat": r"(?:(?:every|each)\s*day|daily|(?:every|each)\s+(?:morning|night|weekday)|on\s+weekdays|weekdays"
+              r"|(?:every|each)\s+week|weekly|(?:every|each)\s+(?:" + _WEEKDAYS + r"))",
+    "id": r"(?:number\s+|#\s*|id\s+)?" + _NUMBER,
+    "duration": _DURATION,
+}
+
+_REMIND = r"(?:remind\s+me|reminder|remember)"
+_CREATE = r"(?:create|add|set|make|new)(?:\s+an?)?(?:\s+(?:new\s+)?reminder)?"
+_REMINDER = r"(?:(?:the|that|this|my)\s+)?reminder"
+_IT = r"(?:it|that|this|the\s+last\s+one|" + _REMINDER + r")"
+
+# (intent, template). Order matters only between rules that match the same
+# text: earlier rules win. Spaces in templates match any run of whitespace.
+GRAMMAR = [
+    ("search", r"(?:list|show|read|tell|find|search)(?: me)?(?: all)?(?: (?:my|the))?(?: reminders?)?"
+               r" (?:about|for|with|mentioning|containing|that mention) {task}"),
+    ("search", r"(?:do i have |are there |what are )?(?:any )?(?:my )?reminders? (?:about|for|mentioning) {task}"),
+    ("list", r"(?:list|show|read|tell)(?: me)?(?: all)?(?: (?:my|the))?(?: reminders?)?"),
+    ("list", r"what (?:are|is) (?:my|the) reminders?"),
+    ("list", r"what(?:'s| is) on my list"),
+    ("list", r"what do i have(?: coming up| today)?"),
+
+    ("create", _REMIND + r" to {task} {repeat} {time}"),
+    ("create", _REMIND + r" to {task} {time}(?: {repeat})?"),
+    ("create", _REMIND + r" to {task} {repeat}"),
+    ("create", _REMIND + r" {time}(?: {repeat})? to {task}"),
+    ("create", _REMIND + r" {repeat}(?: {time})? to {task}"),
+    ("create", _CREATE + r"(?: to| for)? {task} {repeat} {time}"),
+    ("create", _CREATE + r"(?: to| for)? {task} {time}(?: {repeat})?"),
+    ("create", _CREATE + r" {time} (?:to|for) {task}"),
+    ("create", r"{repeat}(?: {time})?,? " + _REMIND + r" to {task}"),
+    ("create", r"{time},? " + _REMIND + r" to {task}"),
+
+    ("delete", r"(?:delete|remove|cancel|clear|drop)(?: " + _REMINDER + r")? {id}"),
+    ("delete", r"(?:delete|remove|cancel|clear|drop) " + _REMINDER + r" (?:to|for|about|called) {task}"),
+
+    ("snooze", r"snooze(?: " + _IT + r")?(?: {id})?(?: (?:for|by) {duration})?"),
+    ("snooze", r"(?:remind me again|ask me again|again) in {duration}"),
+
+    ("complete", r"(?:complete|finish|close)(?: " + _REMINDER + r")?(?: {id})?"),
+    ("complete", r"mark(?: " + _IT + r")?(?: {id})?(?: as)? (?:done|complete|completed|finished)"),
+    ("complete", r"(?:i(?:'m| am| have|'ve)? )?(?:done|finished|completed|did it)(?: with)?(?: " + _IT + r")?(?: {id})?"),
+]
+
+
+class Command(NamedTuple):
+    intent: str                       # list | search | create | delete | snooze | complete | unknown
+    task: Optional[str] = None
+    time: Optional[str] = None
+    repeat: Optional[str] = None      # daily | weekdays | weekly
+    target_id: Optional[int] = None
+    duration: Optional[str] = None
+
+
+UNKNOWN = Command("unknown")
+
+
+# ----------------------------------------
+# Compilation
+# ----------------------------------------
+
+_SLOT_REF = re.compile(r"\{(\w+)\}")
+
+
+def compile_grammar(grammar=GRAMMAR):
+    """
+    Compile every rule into one regex.
+
+    Each rule becomes (?P<r{n}>...) and each slot (?P<{slot}_{n}>...),
+    since group names must be unique across the alternation.
+    Returns (pattern, {rule group: (intent, [(slot, group name)])}).
+    """
+    alternatives = []
+    rules = {}
+    for n, (intent, template) in enumerate(grammar):
+        slots = []
+
+        def slot_group(m, n=n, slots=slots):
+            name = m.group(1)
+            group = f"{name}_{n}"
+            slots.append((name, group))
+            return f"(?P<{group}>{SLOTS[name]})"
+
+        body = _SLOT_REF.sub(slot_group, template).replace(" ", r"\s+")
+        alternatives.append(f"(?P<r{n}>{body})")
+        rules[f"r{n}"] = (intent, slots)
+    pattern = re.compile(r"^(?:" + "|".join(alternatives) + r")$", re.IGNORECASE)
+    return pattern, rules
+
+
+_PATTERN, _RULES = compile_grammar()
+_PUNCT = re.compile(r"[\s.,!?;]+$|^[\s,]+")
+_SPACES = re.compile(r"\s+")
+
+
+def _to_int(text: str) -> Optional[int]:
+    text = re.sub(r"^(?:number|#|id)\s*", "", text.strip().lower())
+    if text.isdigit():
+        return int(text)
+    return _NUMBER_WORDS.get(text)
+
+
+_ISO_TIME = re.compile(r"^(?:(?:at|on)\s+)?(" + _ISO + r")$", re.IGNORECASE)
+_OCLOCK = re.compile(r"\s+o'?clock\b", re.IGNORECASE)
+_CLOCK_THEN_DAY = re.compile(r"^(?!in\s)(?P<clock>.+?)\s+(?:on\s+)?(?P<day>" + _DAY + r")$", re.IGNORECASE)
+_CLOCK_WORD = re.compile(r"\d|\b(?:noon|midnight|" + "|".join(_NUMBER_WORDS) + r")\b", re.IGNORECASE)
+_LEADING_ON = re.compile(r"^on\s+", re.IGNORECASE)
+
+
+def _canonical_time(text: str) -> str:
+    """
+    Rewrite a time slot into the word order the server's time parser
+    expects: "at 2030-01-01t09:00" -> "2030-01-01T09:00",
+    "6 pm tonight" -> "tonight at 6 pm", "6 o'clock" -> "6",
+    "on monday" -> "monday".
+    """
+    m = _ISO_TIME.match(text)
+    if m:
+        return m.group(1)[:10] + m.group(1)[10:].upper().replace(" ", "T")
+    text = _LEADING_ON.sub("", _OCLOCK.sub("", text.lower()))
+    m = _CLOCK_THEN_DAY.match(text)
+    # only a real time of day moves behind the day ("next monday" is all day)
+    if m and _CLOCK_WORD.search(m.group("clock")):
+        clock = re.sub(r"^at\s+", "", m.group("clock"))
+        return f"{m.group('day')} at {clock}"
+    return text
+
+
+def _normalize_repeat(text: str):
+    """('daily' | 'weekdays' | 'weekly', weekday or None) for a spoken repeat phrase."""
+    t = re.sub(r"^each\b", "every", _SPACES.sub(" ", text.lower()))
+    if "weekday" in t:
+        return "weekdays", None
+    if t in ("every week", "weekly"):
+        return "weekly", None
+    if t.startswith("every ") and t[6:] in _WEEKDAYS.split("|"):
+        return "weekly", t[6:]
+    return "daily", None
+
+
+def parse(text: str) -> Command:
+    """Parse one command (after the safe word) into a Command; UNKNOWN if nothing matches."""
+    text = _SPACES.sub(" ", _PUNCT.sub("", text))
+    m = _PATTERN.match(text)
+    if not m:
+        return UNKNOWN
+
+    intent, slots = _RULES[m.lastgroup]
+    values = {}
+    for name, group in slots:
+        value = m.group(group)
+        if value is not None:
+            values[name] = value.strip()
+
+    time_text = values.get("time")
+    repeat = None
+    if "repeat" in values:
+        repeat, weekday = _normalize_repeat(values["repeat"])
+        if weekday and not (time_text and re.search(_WEEKDAYS, time_text, re.IGNORECASE)):
+            time_text = f"{weekday} {time_text}" if time_text else weekday
+        elif repeat == "daily" and time_text is None:
+            spoken = values["repeat"].lower()
+            time_text = "9 pm" if "night" in spoken else "9 am"
+
+    return Command(
+        intent,
+        task=values.get("task"),
+        time=_canonical_time(time_text) if time_text else None,
+        repeat=repeat,
+        target_id=_to_int(values["id"]) if "id" in values else None,
+        duration=values.get("duration", "").lower() or None,
+    )
+
+
+# ----------------------------------------
+# Benchmark
+# ----------------------------------------
+
+_TASKS = [
+    "call mom", "buy milk", "take my pills", "water the plants", "look at the stars",
+    "pay the electricity bill", "send the report to Alex", "stretch", "walk the dog",
+    "book a table at Luigi's", "pick up the kids from school", "check the oven",
+]
+_TIMES = [
+    "at 6 pm", "at 7:30 am", "tomorrow at 9", "in 20 minutes", "in half an hour",
+    "at noon", "on friday at 5 pm", "tonight at 8", "2030-01-01T09:00", "at six in the evening",
+]
+_REPEATS = ["every day", "every weekday", "weekly", "every monday"]
+_TEMPLATES = [
+    "remind me to {task} {time}",
+    "remind me {time} to {task}",
+    "remind me to {task} {repeat} {time}",
+    "remind me to {task} {time} {repeat}",
+    "create reminder {task} {time}",
+    "add a reminder to {task} {time}",
+    "list reminders",
+    "what are my reminders",
+    "list reminders about {task}",
+    "delete reminder {id}",
+    "cancel the reminder to {task}",
+    "snooze",
+    "snooze reminder {id} for {duration}",
+    "mark reminder {id} as done",
+    "done",
+    "sing me a song about {task}",  # no intent: exercises the failure path
+]
+
+
+def generate_corpus(size: int, seed: int = 40):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        corpus.append(rng.choice(_TEMPLATES).format(
+            task=rng.choice(_TASKS),
+            time=rng.choice(_TIMES),
+            repeat=rng.choice(_REPEATS),
+            id=rng.randrange(1, 500),
+            duration=rng.choice(["10 minutes", "an hour", "5 minutes"]),
+        ))
+    return corpus
+
+
+def benchmark(corpus, repeats: int = 5) -> dict:
+    """Per-transcript parse cost (best of `repeats` passes) and intent coverage."""
+    best = float("inf")
+    results = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = [parse(t) for t in corpus]
+        best = min(best, time.perf_counter() - start)
+    per_item = []
+    for t in corpus[:2000]:
+        start = time.perf_counter()
+        parse(t)
+        per_item.append(time.perf_counter() - start)
+    per_item.sort()
+    intents = {}
+    for r in results:
+        intents[r.intent] = intents.get(r.intent, 0) + 1
+    return {
+        "transcripts": len(corpus),
+        "rules": len(GRAMMAR),
+        "mean_us": round(best / len(corpus) * 1e6, 2),
+        "p99_us": round(per_item[int(len(per_item) * 0.99)] * 1e6, 2),
+        "intents": intents,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, default=5000, help="number of generated transcripts")
+    parser.add_argument("--file", help="parse transcripts from a file instead (one per line)")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file) as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = generate_corpus(args.corpus)
+
+    import json
+
+    print(json.dumps(benchmark(corpus), indent=2))
+
+
+if __name__ == "__main__":
+    main()
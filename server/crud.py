@@ -1,50 +1,366 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, text, update
 from sqlalchemy.orm import Session
-from models import Reminder, EventLog
-from datetime import datetime
+from models import Reminder, EventLog, ReminderTombstone, ChangeCounter, Delivery
+from tenancy import DEFAULT_USER
+import clock
+import timeparse
+import reminder_status
+from reminder_status import ReminderStatus as S, ARMED, InvalidTransition
+from event_log import event_writer
+from cache import reminder_cache
+from search_index import search_index
 
-def create_reminder(db: Session, task, time_iso, repeat):
+def create_reminder(db: Session, task, time_iso, repeat, tz_name=None, user_id=DEFAULT_USER):
+    #normalize once here so the scheduler compares plain numbers (raises TimeParseError)
+    time_iso, due_at = timeparse.normalize_time(time_iso, tz_name)
     reminder = Reminder(
+        user_id=user_id,
         task=task,
         time_iso=time_iso,
+        due_at=due_at,
         repeat=repeat,
-        status="scheduled",
-        created_at=datetime.now().isoformat(),
-        updated_at=datetime.now().isoformat()
+        status=S.SCHEDULED,
+        created_at=clock.now_iso(),
+        updated_at=clock.now_iso(),
+        change_seq=next_change_seq(db)
     )
     db.add(reminder)
+    db.flush()
+    search_index.index(db, reminder)
     db.commit()
     db.refresh(reminder)
-    log_event(db, "CREATED", reminder.id, info=task)
+    reminder_cache.invalidate(reminder.id, user_id)
+    log_event(db, "CREATED", reminder.id, info=task, user_id=user_id)
     return reminder
 
-def list_reminders(db: Session):
-    return db.query(Reminder).all()
+def create_reminders_bulk(db: Session, items, user_id=DEFAULT_USER):
+    #one transaction for the whole batch; items whose time doesn't parse are reported
+    #back individually so one bad phrase doesn't bounce an offline client's whole outbox
+    now = clock.now_iso()
+    results = []
+    for item in items:
+        try:
+            time_iso, due_at = timeparse.normalize_time(item.time_iso, item.timezone)
+        except timeparse.TimeParseError as e:
+            results.append((item.client_id, None, {"error": "INVALID_TIME", "message": str(e)}))
+            continue
+        reminder = Reminder(
+            user_id=user_id,
+            task=item.task,
+            time_iso=time_iso,
+            due_at=due_at,
+            repeat=item.repeat,
+            status=S.SCHEDULED,
+            created_at=now,
+            updated_at=now,
+            change_seq=next_change_seq(db)
+        )
+        db.add(reminder)
+        results.append((item.client_id, reminder, None))
+    #flush for the ids and serialize before commit, which would expire every row
+    db.flush()
+    for _, reminder, _ in results:
+        if reminder is not None:
+            search_index.index(db, reminder)
+    out = [
+        {"client_id": client_id, "reminder": reminder_to_dict(r) if r is not None else None, "error": error}
+        for client_id, r, error in results
+    ]
+    db.commit()
+    for result in out:
+        if result["reminder"] is not None:
+            reminder_cache.invalidate(result["reminder"]["id"], user_id)
+            log_event(db, "CREATED", result["reminder"]["id"], info=result["reminder"]["task"], user_id=user_id)
+    return out
+
+def next_change_seq(db: Session):
+    #bump the counter inside the caller's transaction - sqlite holds the write lock
+    #from here until commit, so two writers can never get the same number
+    result = db.execute(
+        update(ChangeCounter).where(ChangeCounter.id == 1).values(value=ChangeCounter.value + 1)
+    )
+    if result.rowcount == 0:
+        init_change_counter(db)
+        return next_change_seq(db)
+    return db.query(ChangeCounter.value).filter(ChangeCounter.id == 1).scalar()
+
+def init_change_counter(db: Session):
+    #seed the counter from existing rows and give pre-existing reminders a sequence
+    if db.query(ChangeCounter).filter(ChangeCounter.id == 1).first() is None:
+        latest = max(
+            db.query(func.max(Reminder.change_seq)).scalar() or 0,
+            db.query(func.max(ReminderTombstone.change_seq)).scalar() or 0,
+        )
+        db.add(ChangeCounter(id=1, value=latest))
+        db.flush()
+    max_id = db.query(func.max(Reminder.id)).filter(Reminder.change_seq.is_(None)).scalar()
+    if max_id is not None:
+        #base + id keeps backfilled sequences distinct, so pages never split a sequence number
+        base = current_change_seq(db)
+        db.query(Reminder).filter(Reminder.change_seq.is_(None)).update(
+            {Reminder.change_seq: base + Reminder.id}, synchronize_session=False
+        )
+        db.query(ChangeCounter).filter(ChangeCounter.id == 1).update(
+            {ChangeCounter.value: base + max_id}, synchronize_session=False
+        )
+    db.commit()
 
-def delete_reminder(db: Session, reminder_id):
-    log_event(db, "DELETED", reminder_id)
-    db.query(Reminder).filter(Reminder.id == reminder_id).delete()
+def backfill_due_at(db: Session):
+    #rows written before due_at existed: parse their time_iso once (naive = server local)
+    skipped = 0
+    for reminder in db.query(Reminder).filter(Reminder.due_at.is_(None)).all():
+        try:
+            reminder.time_iso, reminder.due_at = timeparse.normalize_time(reminder.time_iso)
+        except timeparse.TimeParseError:
+            skipped += 1
     db.commit()
+    return skipped
+
+def backfill_user_ids(db: Session):
+    #rows written before tenancy belong to the default user
+    for model in (Reminder, ReminderTombstone, EventLog, Delivery):
+        db.query(model).filter(model.user_id.is_(None)).update(
+            {model.user_id: DEFAULT_USER}, synchronize_session=False
+        )
+    db.commit()
+
+def current_change_seq(db: Session):
+    return db.query(ChangeCounter.value).filter(ChangeCounter.id == 1).scalar() or 0
+
+def reminder_to_dict(reminder):
+    return {
+        "id": reminder.id,
+        "user_id": reminder.user_id,
+        "task": reminder.task,
+        "time_iso": reminder.time_iso,
+        "repeat": reminder.repeat,
+        "status": reminder_status.parse_status(reminder.status).value,
+        "created_at": reminder.created_at,
+        "updated_at": reminder.updated_at,
+        "change_seq": reminder.change_seq,
+        "due_at": reminder.due_at,
+    }
+
+def list_reminders_with_etag(db: Session, user_id=DEFAULT_USER):
+    return reminder_cache.get_list(user_id, lambda: [
+        reminder_to_dict(r) for r in
+        db.query(Reminder).filter(Reminder.user_id == user_id).all()
+    ])
 
-def get_due_reminders(db: Session, now_iso):
-    return db.query(Reminder).filter(
-        Reminder.time_iso <= now_iso,
-        Reminder.status == "scheduled"
-    ).all()
+def list_reminders(db: Session, user_id=DEFAULT_USER):
+    return list_reminders_with_etag(db, user_id)[1]
+
+def list_reminders_page(db: Session, limit, offset=0, status=None, user_id=DEFAULT_USER):
+    #one window of the list in display order, for clients that can't hold it all
+    query = db.query(Reminder).filter(Reminder.user_id == user_id)
+    if status is not None:
+        query = query.filter(Reminder.status == reminder_status.parse_status(status))
+    total = query.count()
+    rows = query.order_by(Reminder.due_at, Reminder.id).offset(offset).limit(limit).all()
+    return total, [reminder_to_dict(r) for r in rows]
+
+def _owned(db: Session, reminder_id, user_id):
+    #another user's reminder looks exactly like a missing one
+    return db.query(Reminder).filter(Reminder.id == reminder_id, Reminder.user_id == user_id)
+
+def get_reminder(db: Session, reminder_id, user_id=DEFAULT_USER):
+    def load():
+        reminder = _owned(db, reminder_id, user_id).first()
+        return reminder_to_dict(reminder) if reminder else None
+    return reminder_cache.get_one(user_id, reminder_id, load)
+
+def update_reminder(db: Session, reminder_id, tz_name=None, user_id=DEFAULT_USER, **fields):
+    if fields.get("time_iso") is not None:
+        fields["time_iso"], fields["due_at"] = timeparse.normalize_time(fields["time_iso"], tz_name)
+    reminder = _owned(db, reminder_id, user_id).first()
+    if reminder is None:
+        return None
+    if fields.get("status") is not None:
+        #same rules as the ack/snooze/complete endpoints (raises InvalidTransition)
+        fields["status"] = reminder_status.check(reminder.status, fields["status"])
+    for name, value in fields.items():
+        setattr(reminder, name, value)
+    reminder.updated_at = clock.now_iso()
+    reminder.change_seq = next_change_seq(db)
+    if "task" in fields:
+        search_index.index(db, reminder)
+    db.commit()
+    db.refresh(reminder)
+    reminder_cache.invalidate(reminder.id, user_id)
+    log_event(db, "UPDATED", reminder.id, info=reminder.task, user_id=user_id)
+    return reminder
+
+def delete_reminder(db: Session, reminder_id, user_id=DEFAULT_USER):
+    deleted = _owned(db, reminder_id, user_id).delete()
+    if deleted:
+        search_index.remove(db, reminder_id)
+        log_event(db, "DELETED", reminder_id, user_id=user_id)
+        db.merge(ReminderTombstone(
+            reminder_id=reminder_id,
+            user_id=user_id,
+            change_seq=next_change_seq(db),
+            deleted_at=clock.now_iso()
+        ))
+    db.commit()
+    reminder_cache.invalidate(reminder_id, user_id)
 
-def log_event(db, event_type, reminder_id, info=None):
-    log = EventLog(
-        event_type=event_type,
-        reminder_id=reminder_id,
-        info=info
+def search_reminders(db: Session, q, limit=20, offset=0, status=None, user_id=DEFAULT_USER):
+    """One page of the user's reminders matching `q`, best first.
+
+    Returns (items, next_offset); each item is reminder_to_dict plus its "score".
+    next_offset is None on the last page.
+    """
+    if status is not None:
+        status = reminder_status.parse_status(status)
+    hits = search_index.search(db, user_id, q, limit, offset, status)
+    next_offset = offset + limit if len(hits) > limit else None
+    hits = hits[:limit]
+    rows = {r.id: r for r in db.query(Reminder).filter(Reminder.id.in_([rid for rid, _ in hits]))} if hits else {}
+    items = [{**reminder_to_dict(rows[rid]), "score": score} for rid, score in hits if rid in rows]
+    return items, next_offset
+
+def list_changes(db: Session, since, limit=500, user_id=DEFAULT_USER):
+    """Upserts and tombstones with change_seq > since, oldest first.
+
+    Returns (token, upserts, tombstone_ids, has_more). Reading the counter first and
+    capping both queries at it means a write landing mid-request shows up next time
+    instead of being skipped.
+    """
+    latest = current_change_seq(db)
+    upserts = db.query(Reminder).filter(
+        Reminder.user_id == user_id,
+        Reminder.change_seq > since,
+        Reminder.change_seq <= latest
+    ).order_by(Reminder.change_seq).limit(limit + 1).all()
+    tombstones = db.query(ReminderTombstone).filter(
+        ReminderTombstone.user_id == user_id,
+        ReminderTombstone.change_seq > since,
+        ReminderTombstone.change_seq <= latest
+    ).order_by(ReminderTombstone.change_seq).limit(limit + 1).all()
+
+    merged = sorted(
+        [(r.change_seq, "upsert", r) for r in upserts] +
+        [(t.change_seq, "tombstone", t) for t in tombstones],
+        key=lambda entry: entry[0]
+    )
+    has_more = len(merged) > limit
+    if has_more:
+        merged = merged[:limit]
+        token = merged[-1][0]
+    else:
+        token = latest
+    return (
+        token,
+        [reminder_to_dict(r) for _, kind, r in merged if kind == "upsert"],
+        [t.reminder_id for _, kind, t in merged if kind == "tombstone"],
+        has_more,
+    )
+
+def transition(db: Session, reminder_id, target, time_iso=None, tz_name=None, user_id=DEFAULT_USER):
+    """Move a reminder to `target` (ack / snooze / complete / cancel), or None if it's gone.
+
+    Raises InvalidTransition for a move the lifecycle doesn't allow, or if the status
+    changed underneath us. Snoozing needs `time_iso` (e.g. "in 10 minutes") and re-arms
+    the reminder on the scheduler's (status, due_at) index. Acknowledging or completing
+    a repeating reminder schedules its next occurrence instead.
+    """
+    target = reminder_status.parse_status(target)
+    reminder = _owned(db, reminder_id, user_id).first()
+    if reminder is None:
+        return None
+    current = reminder_status.parse_status(reminder.status)
+    reminder_status.check(current, target)
+    if current == target and target != S.SNOOZED:
+        return reminder #retried ack/complete: nothing to do
+
+    values = {Reminder.status: target}
+    event = target.name
+    if target == S.SNOOZED:
+        new_iso, new_due = timeparse.normalize_time(time_iso, tz_name)
+        values.update({Reminder.time_iso: new_iso, Reminder.due_at: new_due})
+    elif target in (S.ACKNOWLEDGED, S.COMPLETED) and reminder.repeat:
+        next_due = reminder_status.next_occurrence(reminder.due_at, reminder.repeat, clock.get_clock().time())
+        if next_due is not None:
+            values.update({
+                Reminder.status: S.SCHEDULED,
+                Reminder.due_at: next_due,
+                Reminder.time_iso: datetime.fromtimestamp(next_due, timezone.utc).isoformat(),
+            })
+            event = "REARMED"
+    values.update({Reminder.updated_at: clock.now_iso(), Reminder.change_seq: next_change_seq(db)})
+
+    #compare-and-set on the status we validated against, like mark_due
+    changed = _owned(db, reminder_id, user_id).filter(
+        Reminder.status == current
+    ).update(values, synchronize_session=False)
+    if not changed:
+        db.rollback()
+        raise InvalidTransition(current.value, target.value)
+    db.commit()
+    db.refresh(reminder)
+    reminder_cache.invalidate(reminder_id, user_id)
+    log_event(db, event, reminder_id, info=reminder.task, user_id=user_id)
+    return reminder
+
+def normalize_statuses(db: Session):
+    #rows written before the status enum: map old spellings, anything unknown goes back to scheduled
+    for old, new in reminder_status.ALIASES.items():
+        db.execute(text("UPDATE reminders SET status = :new WHERE status = :old"), {"old": old, "new": new.value})
+    known = [s.value for s in S]
+    db.execute(
+        text(f"UPDATE reminders SET status = 'scheduled' WHERE status IS NULL OR status NOT IN ({', '.join(':k%d' % i for i in range(len(known)))})"),
+        {f"k{i}": v for i, v in enumerate(known)},
     )
-    db.add(log)
     db.commit()
 
+def get_due_reminders(db: Session, now_ts, shards=None, num_shards=None, user_id=None):
+    #scheduled and snoozed reminders are both armed: one IN over ix_reminders_status_due,
+    #or over ix_reminders_user_status_due when scanning a single user
+    query = db.query(Reminder).filter(
+        Reminder.status.in_(ARMED),
+        Reminder.due_at <= now_ts
+    )
+    if user_id is not None:
+        query = query.filter(Reminder.user_id == user_id)
+    if shards is not None:
+        query = query.filter((Reminder.id % num_shards).in_(shards))
+    return query.all()
+
+def log_event(db, event_type, reminder_id, info=None, user_id=DEFAULT_USER):
+    #buffered - the writer batches these into one insert instead of a commit per event
+    event_writer.append(event_type, reminder_id, info=info, user_id=user_id)
+
+def list_events(db: Session, reminder_id=None, event_type=None, after_id=None, limit=50, user_id=DEFAULT_USER):
+    #keyset pagination on id: the log is append-only so ids only ever grow
+    event_writer.flush()
+    query = db.query(EventLog).filter(EventLog.user_id == user_id)
+    if reminder_id is not None:
+        query = query.filter(EventLog.reminder_id == reminder_id)
+    if event_type is not None:
+        query = query.filter(EventLog.event_type == event_type)
+    if after_id is not None:
+        query = query.filter(EventLog.id > after_id)
+    return query.order_by(EventLog.id).limit(limit).all()
+
 def mark_due(db, reminder):
-    reminder.status = "due"
-    reminder.updated_at = datetime.now().isoformat()
+    #compare-and-set on status: if another scheduler already fired this reminder the
+    #update matches nothing and we skip it, so a reminder is never fired (or logged) twice
+    fired = db.query(Reminder).filter(
+        Reminder.id == reminder.id,
+        Reminder.status.in_(ARMED)
+    ).update({
+        Reminder.status: S.DUE,
+        Reminder.updated_at: clock.now_iso(),
+        Reminder.change_seq: next_change_seq(db),
+    }, synchronize_session=False)
+    if not fired:
+        db.rollback()
+        return False
     db.commit()
     db.refresh(reminder)
+    reminder_cache.invalidate(reminder.id, reminder.user_id)
 
-    log_event(db, "DUE", reminder.id, info=reminder.task)
+    log_event(db, "DUE", reminder.id, info=reminder.task, user_id=reminder.user_id)
+    return True
 
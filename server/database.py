@@ -1,10 +1,56 @@
 #SQLAlechemy setup
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./reminders.db"
+DATABASE_URL = os.environ.get("REMINDER_DB_URL", "sqlite:///./reminders.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def make_engine(url):
+    new_engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+    if new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _record):
+            #WAL lets the api keep reading while the scheduler/event writer commit, and
+            #NORMAL sync drops the per-commit fsync that dominates small writes
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    return new_engine
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+def configure_database(url):
+    #point SessionLocal (and so every module using it) at another database - benchmarks/tests
+    global engine, DATABASE_URL
+    DATABASE_URL = url
+    engine = make_engine(url)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+Base = declarative_base()
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def upgrade_schema(metadata, bind=None):
+    #create_all only creates missing tables, so add new columns/indexes to existing ones here
+    bind = bind or engine
+    metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'))
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
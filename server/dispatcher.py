@@ -0,0 +1,503 @@
+#fan-out of due reminders to notification channels, run after the scheduler marks them due
+import asyncio, heapq, itertools, json, logging, os, queue, threading, time, uuid
+import urllib.request
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from sqlalchemy import insert, update
+import clock
+from database import SessionLocal
+from metrics import metrics
+from models import Delivery
+
+logger = logging.getLogger("dispatcher")
+
+PRIORITY_ON_TIME = 0        #fired within LATE_AFTER of its due time
+PRIORITY_LATE = 1           #catch-up after downtime: don't let it delay on-time ones
+LATE_AFTER = 5 * 60         #seconds
+
+INTAKE_INTERVAL = 0.2       #how often submitted events are recorded and fanned out
+RETRY_BASE = 2.0            #seconds; doubles per attempt
+RETRY_MAX = 300.0
+MAX_ATTEMPTS = 6
+
+DELIVERY_RETENTION_DAYS = 7     #finished deliveries older than this are deleted
+PRUNE_INTERVAL = 60 * 60        #how often the scheduler runs the retention sweep (seconds)
+FINISHED = ("sent", "dropped", "dead")
+
+class Channel(ABC):
+    """A delivery target. Subclasses implement send_batch(events), raising on failure.
+
+    send_batch may also return one bool per event, False for an event nobody was there
+    to receive; those are recorded as "dropped" instead of "sent".
+
+    Each channel gets its own priority queue and `workers` threads, sends up to
+    `batch_size` events per call and is smoothed to `rate` events/second (burst
+    `burst`), so a 09:00 spike is spread out instead of hammering the target.
+    """
+
+    name = "channel"
+
+    def __init__(self, workers=2, batch_size=50, batch_wait=0.05, rate=None, burst=None,
+                 max_queue=10_000, max_attempts=MAX_ATTEMPTS):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_attempts = max_attempts
+        self.limiter = RateLimiter(rate, burst or batch_size) if rate else None
+        self.queue = queue.PriorityQueue(max_queue)
+
+    @abstractmethod
+    def send_batch(self, events):
+        """Deliver one batch of event dicts; raise to have the whole batch retried."""
+
+class WebhookChannel(Channel):
+    """POSTs {"events": [...]} to a url, e.g. a local home-automation hook."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.timeout = timeout
+
+    def send_batch(self, events):
+        body = json.dumps({"events": events}).encode()
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        #non-2xx raises HTTPError, which counts as a failed attempt
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+class FileSink(Channel):
+    """Appends one json line per event: a local stand-in for a queue, and handy in tests."""
+
+    name = "file"
+
+    def __init__(self, path, **kwargs):
+        kwargs.setdefault("workers", 1) #one writer keeps lines in order
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, events):
+        lines = "".join(json.dumps(e) + "\n" for e in events)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+class SSEChannel(Channel):
+    """Pushes events to every connected GET /dispatch/stream client.
+
+    Each subscriber is a small bounded asyncio.Queue on the event loop that serves it, fed
+    from the worker threads with call_soon_threadsafe, so an open stream costs no thread.
+    A client that stops reading loses its oldest events rather than holding up delivery
+    to everyone else. A subscriber for a user only gets that user's events (None gets
+    everyone's).
+    """
+
+    name = "sse"
+
+    def __init__(self, subscriber_queue=256, **kwargs):
+        super().__init__(**kwargs)
+        self.subscriber_queue = subscriber_queue
+        self._subscribers = {} #queue -> (loop, user_id or None)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id=None):
+        #called on the event loop that will read the queue
+        q = asyncio.Queue(self.subscriber_queue)
+        with self._lock:
+            self._subscribers[q] = (asyncio.get_running_loop(), user_id)
+        metrics.set_gauge("dispatch_sse_subscribers", len(self._subscribers))
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.pop(q, None)
+        metrics.set_gauge("dispatch_sse_subscribers", len(self._subscribers))
+
+    def send_batch(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        delivered = [False] * len(events)
+        for q, (loop, user_id) in subscribers:
+            mine = [i for i, e in enumerate(events) if user_id is None or e.get("user_id") == user_id]
+            if not mine:
+                continue
+            try:
+                loop.call_soon_threadsafe(self._offer, q, [events[i] for i in mine])
+            except RuntimeError:
+                #loop closed under a stream that never got to unsubscribe
+                self.unsubscribe(q)
+                continue
+            for i in mine:
+                delivered[i] = True
+        return delivered
+
+    @staticmethod
+    def _offer(q, events):
+        #runs on the subscriber's loop
+        for event in events:
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(event)
+
+class RateLimiter:
+    """Token bucket shared by a channel's workers."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n, stop):
+        #blocks until n tokens are available (or stop is set); n is capped at the burst size
+        n = min(n, self.capacity)
+        while not stop.is_set():
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            stop.wait(wait)
+
+def event_for(reminder, fired_at=None):
+    fired_at = fired_at if fired_at is not None else clock.get_clock().time()
+    late = reminder.due_at is not None and fired_at - reminder.due_at > LATE_AFTER
+    return {
+        "reminder_id": reminder.id,
+        "user_id": reminder.user_id,
+        "task": reminder.task,
+        "time_iso": reminder.time_iso,
+        "repeat": reminder.repeat,
+        "due_at": reminder.due_at,
+        "fired_at": fired_at,
+        "priority": PRIORITY_LATE if late else PRIORITY_ON_TIME,
+    }
+
+class Dispatcher:
+    """Routes due events to channels without ever blocking the scheduler.
+
+    submit() only appends to an in-memory list. An intake thread records a pending
+    Delivery row per (event, channel) in one insert per batch and queues them on the
+    channels; each channel's workers send in batches, and every attempt's outcome is
+    written back in one update per batch. Failures are retried with exponential
+    backoff up to the channel's max_attempts, then marked dead. Deliveries still
+    pending or retrying when the process stopped are picked up again by start().
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.channels = {}
+        self._intake = []
+        self._delayed = []              #heap of (ready_at, seq, channel name, delivery)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_prune = None
+
+    def add_channel(self, channel):
+        self.channels[channel.name] = channel
+        return channel
+
+    def is_running(self):
+        return bool(self._threads)
+
+    # ---------- producer side (scheduler thread) ----------
+
+    def submit(self, event):
+        if not self._threads or not self.channels:
+            return
+        with self._lock:
+            self._intake.append(event)
+        metrics.inc("dispatch_submitted_total")
+
+    # ---------- intake ----------
+
+    def _intake_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(INTAKE_INTERVAL)
+            self._wake.clear()
+            try:
+                self._take_in()
+                self._release_delayed()
+            except Exception:
+                metrics.inc("dispatch_errors_total")
+                logger.exception("Dispatcher intake error")
+
+    def _take_in(self):
+        with self._lock:
+            events, self._intake = self._intake, []
+        if not events:
+            return
+        now_iso = clock.now_iso()
+        deliveries = []
+        for event in events:
+            for name in self.channels:
+                deliveries.append({
+                    "id": uuid.uuid4().hex,
+                    "channel": name,
+                    "event": event,
+                    "priority": event["priority"],
+                    "attempts": 0,
+                })
+        try:
+            self._insert_pending(deliveries, now_iso)
+        except Exception:
+            #put the events back in front so the next intake pass retries them in order
+            with self._lock:
+                self._intake[:0] = events
+            metrics.inc("dispatch_intake_retries_total")
+            raise
+        for d in deliveries:
+            self._enqueue(d)
+
+    def _insert_pending(self, deliveries, now_iso):
+        db = self.session_factory()
+        try:
+            db.execute(insert(Delivery), [{
+                "id": d["id"],
+                "user_id": d["event"].get("user_id"),
+                "reminder_id": d["event"]["reminder_id"],
+                "channel": d["channel"],
+                "status": "pending",
+                "priority": d["priority"],
+                "attempts": 0,
+                "payload": json.dumps(d["event"]),
+                "created_at": now_iso,
+                "updated_at": now_iso,
+            } for d in deliveries])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _enqueue(self, delivery):
+        channel = self.channels.get(delivery["channel"])
+        if channel is None:
+            return
+        try:
+            channel.queue.put_nowait((delivery["priority"], next(self._seq), delivery))
+        except queue.Full:
+            #keep the row pending and try again shortly rather than blocking intake
+            metrics.inc("dispatch_queue_full_total")
+            self._delay(delivery, 1.0)
+        metrics.set_gauge(f"dispatch_{channel.name}_queue", channel.queue.qsize())
+
+    def _delay(self, delivery, seconds):
+        #on the installed clock, like the scheduler, so simulated time drives the backoff too
+        with self._lock:
+            heapq.heappush(self._delayed, (clock.get_clock().time() + seconds, next(self._seq), delivery))
+
+    def _release_delayed(self):
+        now = clock.get_clock().time()
+        ready = []
+        with self._lock:
+            while self._delayed and self._delayed[0][0] <= now:
+                ready.append(heapq.heappop(self._delayed)[2])
+        for d in ready:
+            self._enqueue(d)
+
+    # ---------- channel workers ----------
+
+    def _next_batch(self, channel):
+        try:
+            first = channel.queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first[2]]
+        deadline = time.monotonic() + channel.batch_wait
+        while len(batch) < channel.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = channel.queue.get(timeout=remaining) if remaining > 0 else channel.queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item[2])
+        return batch
+
+    def _worker_loop(self, channel):
+        while not self._stop.is_set():
+            try:
+                self._send_next(channel)
+            except Exception:
+                metrics.inc("dispatch_errors_total")
+                logger.exception("Dispatcher %s worker error", channel.name)
+
+    def _send_next(self, channel):
+        #one batch off the channel's queue: send it, then record the outcome
+        batch = self._next_batch(channel)
+        if not batch:
+            return 0
+        if channel.limiter is not None:
+            channel.limiter.acquire(len(batch), self._stop)
+        started = time.perf_counter()
+        delivered = None
+        try:
+            delivered = channel.send_batch([d["event"] for d in batch])
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        metrics.observe(f"dispatch_{channel.name}_send_seconds", time.perf_counter() - started)
+        self._record(channel, batch, error, delivered)
+        return len(batch)
+
+    def _record(self, channel, batch, error, delivered=None):
+        now_iso = clock.now_iso()
+        now_ts = clock.get_clock().time()
+        sent, dropped, retry, dead = [], [], [], []
+        for i, d in enumerate(batch):
+            d["attempts"] += 1
+            if error is None:
+                (sent if delivered is None or delivered[i] else dropped).append(d)
+            elif d["attempts"] >= channel.max_attempts:
+                dead.append(d)
+            else:
+                retry.append(d)
+
+        #retries are scheduled even if the bookkeeping below fails: the rows then keep their
+        #old status until the next attempt is recorded, rather than waiting for a restart
+        for d in retry:
+            self._delay(d, min(RETRY_MAX, RETRY_BASE * 2 ** (d["attempts"] - 1)))
+        groups = (("sent", sent), ("dropped", dropped), ("retry", retry), ("dead", dead))
+        try:
+            self._write_outcomes(now_iso, error, groups)
+        except Exception:
+            metrics.inc("dispatch_errors_total")
+            logger.exception("Dispatcher could not record %d %s deliveries", len(batch), channel.name)
+
+        metrics.inc(f"dispatch_{channel.name}_sent_total", len(sent))
+        if dropped:
+            metrics.inc(f"dispatch_{channel.name}_dropped_total", len(dropped))
+        if sent:
+            for d in sent:
+                metrics.observe("dispatch_latency_seconds", now_ts - d["event"]["fired_at"])
+        if retry:
+            metrics.inc(f"dispatch_{channel.name}_retries_total", len(retry))
+        if dead:
+            metrics.inc(f"dispatch_{channel.name}_dead_total", len(dead))
+            logger.warning("Dropping %d %s deliveries after %d attempts: %s",
+                           len(dead), channel.name, channel.max_attempts, error)
+
+    def _write_outcomes(self, now_iso, error, groups):
+        db = self.session_factory()
+        try:
+            for status, group in groups:
+                #attempt counts differ within a batch only after a restart; group by count
+                by_attempts = {}
+                for d in group:
+                    by_attempts.setdefault(d["attempts"], []).append(d["id"])
+                for attempts, ids in by_attempts.items():
+                    db.execute(update(Delivery).where(Delivery.id.in_(ids)).values(
+                        status=status, attempts=attempts, last_error=error, updated_at=now_iso
+                    ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ---------- lifecycle ----------
+
+    def recover(self):
+        #re-queue deliveries a previous run recorded but never finished
+        db = self.session_factory()
+        try:
+            rows = db.query(Delivery).filter(
+                Delivery.status.in_(("pending", "retry")),
+                Delivery.channel.in_(list(self.channels)),
+            ).order_by(Delivery.created_at).all()
+            pending = [{
+                "id": r.id,
+                "channel": r.channel,
+                "event": json.loads(r.payload),
+                "priority": r.priority or 0,
+                "attempts": r.attempts or 0,
+            } for r in rows]
+        finally:
+            db.close()
+        for d in pending:
+            self._enqueue(d)
+        return len(pending)
+
+    def prune(self, older_than, batch_size=5000):
+        """Delete finished deliveries created before `older_than`; pending/retry rows are kept."""
+        cutoff = older_than.isoformat()
+        deleted = 0
+        db = self.session_factory()
+        try:
+            while True:
+                ids = [row.id for row in db.query(Delivery.id).filter(
+                    Delivery.status.in_(FINISHED),
+                    Delivery.created_at < cutoff,
+                ).limit(batch_size)]
+                if not ids:
+                    break
+                db.query(Delivery).filter(Delivery.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                deleted += len(ids)
+        finally:
+            db.close()
+        if deleted:
+            metrics.inc("dispatch_pruned_total", deleted)
+        return deleted
+
+    def maybe_prune(self, now=None):
+        """Rolling retention for the deliveries table, at most once per PRUNE_INTERVAL."""
+        now = now or clock.now()
+        if self._last_prune is not None and (now - self._last_prune).total_seconds() < PRUNE_INTERVAL:
+            return 0
+        self._last_prune = now
+        return self.prune(now - timedelta(days=DELIVERY_RETENTION_DAYS))
+
+    def start(self):
+        if self._threads or not self.channels:
+            return
+        self._stop.clear()
+        self.recover()
+        self._threads.append(threading.Thread(target=self._intake_loop, daemon=True, name="dispatch-intake"))
+        for channel in self.channels.values():
+            for i in range(channel.workers):
+                self._threads.append(threading.Thread(
+                    target=self._worker_loop, args=(channel,), daemon=True, name=f"dispatch-{channel.name}-{i}"
+                ))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        if not self._threads:
+            return
+        try:
+            self._take_in() #record whatever was submitted last so start() can resume it
+        except Exception:
+            logger.exception("Dispatcher could not record %d submitted events on stop", len(self._intake))
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+def configure_from_env(target=None):
+    #DISPATCH_SSE=0 turns the stream off; DISPATCH_WEBHOOK_URL / DISPATCH_FILE add channels
+    target = target or dispatcher
+    if os.environ.get("DISPATCH_SSE", "1") != "0":
+        target.add_channel(SSEChannel())
+    url = os.environ.get("DISPATCH_WEBHOOK_URL")
+    if url:
+        rate = os.environ.get("DISPATCH_WEBHOOK_RATE")
+        target.add_channel(WebhookChannel(url, rate=float(rate) if rate else 20.0))
+    path = os.environ.get("DISPATCH_FILE")
+    if path:
+        target.add_channel(FileSink(path))
+    return target
+
+dispatcher = Dispatcher()
@@ -0,0 +1,188 @@
+#buffered, append-only writer for the event_log table + retention/compaction
+import gzip, json, logging, os, threading
+from datetime import timedelta
+import clock
+from sqlalchemy import insert, func
+from database import SessionLocal
+from metrics import metrics
+from models import EventLog
+from tenancy import DEFAULT_USER
+
+logger = logging.getLogger("event_log")
+
+EVENT_BATCH_SIZE = 200          #flush once this many events are buffered
+EVENT_FLUSH_INTERVAL = 2.0      #...or after this many seconds
+EVENT_BUFFER_MAX = 50_000       #while the database is failing, the oldest events past this are dropped
+EVENT_RETENTION_DAYS = 30       #events older than this get archived...
+EVENT_KEEP_PER_REMINDER = 5     #...except each reminder's newest few, so old reminders keep some history
+COMPACTION_INTERVAL = 60 * 60   #how often the scheduler runs compaction (seconds)
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "event_archive")
+
+class EventLogWriter:
+    """Collects events in memory and writes them in one multi-row insert per flush.
+
+    A failed flush keeps its rows for the next one, but the buffer never grows past
+    `max_buffer`: the oldest events go first and are counted in event_log_dropped_total.
+    """
+
+    def __init__(self, session_factory, batch_size=EVENT_BATCH_SIZE, flush_interval=EVENT_FLUSH_INTERVAL,
+                 max_buffer=EVENT_BUFFER_MAX):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()        #guards _buffer
+        self._flush_lock = threading.Lock()  #one flush at a time so rows stay in order
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def append(self, event_type, reminder_id, info=None, user_id=DEFAULT_USER):
+        row = {
+            "user_id": user_id,
+            "event_type": event_type,
+            "reminder_id": reminder_id,
+            "timestamp": clock.now_iso(),
+            "info": info,
+        }
+        with self._lock:
+            self._buffer.append(row)
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                #no background thread (scripts, shell) so flush inline
+                self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            db = None
+            try:
+                db = self.session_factory()
+                db.execute(insert(EventLog), rows)
+                db.commit()
+            except Exception:
+                if db is not None:
+                    db.rollback()
+                #put them back in front so nothing is lost or reordered
+                with self._lock:
+                    self._buffer[:0] = rows
+                    self._trim()
+                raise
+            finally:
+                if db is not None:
+                    db.close()
+            return len(rows)
+
+    def _trim(self):
+        #caller holds _lock
+        excess = len(self._buffer) - self.max_buffer
+        if excess > 0:
+            del self._buffer[:excess]
+            metrics.inc("event_log_dropped_total", excess)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                metrics.inc("event_log_flush_errors_total")
+                logger.exception("Event log flush error")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+event_writer = EventLogWriter(SessionLocal)
+
+def compact_events(db, older_than, archive_dir=ARCHIVE_DIR, batch_size=5000,
+                   keep_per_reminder=EVENT_KEEP_PER_REMINDER):
+    """Move events older than `older_than` into per-day gzipped JSONL files and delete them.
+
+    The newest `keep_per_reminder` events of each reminder stay in the table however old
+    they are. Each batch is written (and the file closed) before its rows are deleted, so
+    a crash can at worst leave an event both archived and in the table, never in neither.
+    """
+    cutoff = older_than.isoformat()
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    last_id = 0
+    #sqlite reuses ids once the top row is gone, so always leave the newest event in place
+    #to keep ids (and the /events cursor) monotonic
+    max_id = db.query(func.max(EventLog.id)).scalar() or 0
+    query = db.query(EventLog).filter(EventLog.timestamp < cutoff, EventLog.id < max_id)
+    if keep_per_reminder:
+        ranked = db.query(EventLog.id, func.row_number().over(
+            partition_by=EventLog.reminder_id, order_by=EventLog.id.desc()
+        ).label("rank")).subquery()
+        query = query.filter(EventLog.id.notin_(
+            db.query(ranked.c.id).filter(ranked.c.rank <= keep_per_reminder)
+        ))
+    while True:
+        rows = query.filter(EventLog.id > last_id).order_by(EventLog.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        by_day = {}
+        for row in rows:
+            day = (row.timestamp or "unknown")[:10]
+            by_day.setdefault(day, []).append({
+                "id": row.id,
+                "user_id": row.user_id,
+                "event_type": row.event_type,
+                "reminder_id": row.reminder_id,
+                "timestamp": row.timestamp,
+                "info": row.info,
+            })
+        for day, events in by_day.items():
+            #gzip supports appending members, so one file per day keeps growing across runs
+            path = os.path.join(archive_dir, f"events-{day}.jsonl.gz")
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+
+        ids = [row.id for row in rows]
+        db.query(EventLog).filter(EventLog.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        archived += len(ids)
+        last_id = ids[-1]
+    return archived
+
+_last_compaction = None
+
+def maybe_compact(now=None):
+    """Rolling retention: archive events past EVENT_RETENTION_DAYS at most once per interval."""
+    global _last_compaction
+    now = now or clock.now()
+    if _last_compaction is not None and (now - _last_compaction).total_seconds() < COMPACTION_INTERVAL:
+        return 0
+    _last_compaction = now
+    db = SessionLocal()
+    try:
+        return compact_events(db, now - timedelta(days=EVENT_RETENTION_DAYS))
+    finally:
+        db.close()
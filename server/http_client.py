@@ -0,0 +1,123 @@
+"""
+Shared HTTP client layer for the voice client.
+
+One pooled requests.Session per service, so repeated calls reuse
+keep-alive connections instead of opening a new TCP connection each time.
+
+Features:
+- Connection pooling + keep-alive (requests.Session / urllib3 pool)
+- Per-endpoint (connect, read) timeouts
+- Retry with exponential backoff and full jitter on connection errors,
+  timeouts and 502/503/504 responses
+"""
+
+import random
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+Timeout = Union[float, Tuple[float, float]]
+
+# ----------------------------------------
+# CONFIG
+# ----------------------------------------
+
+DEFAULT_TIMEOUT: Timeout = (3.05, 10)   # (connect, read) seconds
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class ServiceClient:
+    """
+    Pooled, retrying HTTP client for one backend service.
+
+    `path` arguments may be relative ("/reminders/") or full URLs.
+    Requests are retried only when safe: idempotent methods by default,
+    or when the caller passes retry=True.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        timeouts: Optional[Dict[str, Timeout]] = None,
+        default_timeout: Timeout = DEFAULT_TIMEOUT,
+        retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        pool_size: int = 4,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)  # sent with every request (e.g. X-User-Id)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: random sleep in [0, base * 2^attempt], capped."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        endpoint: Optional[str] = None,
+        retry: Optional[bool] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            endpoint: key into `timeouts` (e.g. "stt", "poll", "health").
+            retry: override whether this call may be retried.
+
+        Raises requests.exceptions.RequestException once retries are used up.
+        """
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint, self.default_timeout))
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if retry else 1
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    return response
+            time.sleep(self.backoff(attempt))
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
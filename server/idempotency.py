@@ -0,0 +1,131 @@
+#bounded ttl store behind the Idempotency-Key header, so a retried create returns the
+#original response instead of inserting (and later firing) a duplicate reminder
+import hashlib, json, threading, time
+from collections import OrderedDict
+from metrics import metrics
+
+IDEMPOTENCY_TTL = 24 * 3600     #seconds a key is remembered
+IDEMPOTENCY_MAX_KEYS = 50_000   #oldest keys are evicted past this
+IN_FLIGHT_WAIT = 10.0           #how long a duplicate waits for the original request to finish
+MAX_KEY_LENGTH = 255
+
+class IdempotencyKeyReused(Exception):
+    """Same key, different request body."""
+
+class IdempotencyInProgress(Exception):
+    """The original request with this key is still running."""
+
+def fingerprint(payload):
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+class IdempotencyStore:
+    """Remembers the response for each key for `ttl` seconds, at most `max_keys` keys.
+
+    Every key gets the same ttl, so insertion order is expiry order and expired keys are
+    dropped from the front of an OrderedDict in O(expired). Like reminder_cache this is
+    per-process: with several workers a retry routed to another worker isn't deduped.
+    """
+
+    def __init__(self, ttl=IDEMPOTENCY_TTL, max_keys=IDEMPOTENCY_MAX_KEYS, in_flight_wait=IN_FLIGHT_WAIT):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.in_flight_wait = in_flight_wait
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   #key -> (fingerprint, value, expires_at)
+        self._in_flight = {}            #key -> Event set when the first request finishes
+        self.requests = 0
+        self.replays = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _purge(self, now):
+        while self._entries:
+            key, (_, _, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key, fp, now):
+        entry = self._entries.get(key)
+        if entry is None or entry[2] <= now:
+            return None
+        if entry[0] != fp:
+            raise IdempotencyKeyReused(key)
+        return entry
+
+    def _record(self, replayed):
+        self.requests += 1
+        self.replays += replayed
+        metrics.inc("idempotency_requests_total")
+        if replayed:
+            metrics.inc("idempotency_replays_total")
+        metrics.set_gauge("idempotency_hit_rate", self.replays / self.requests)
+        metrics.set_gauge("idempotency_keys", len(self._entries))
+
+    def get(self, key, fp):
+        """Stored value for key (counted as a request), or None."""
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            entry = self._lookup(key, fp, now)
+            self._record(entry is not None)
+            return entry[1] if entry is not None else None
+
+    def peek(self, key, fp):
+        """Stored value for key, or None, without counting towards the request/hit-rate metrics."""
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            entry = self._lookup(key, fp, now)
+            return entry[1] if entry is not None else None
+
+    def put(self, key, fp, value):
+        with self._lock:
+            now = time.monotonic()
+            self._entries[key] = (fp, value, now + self.ttl)
+            self._entries.move_to_end(key)
+            self._purge(now)
+
+    def run(self, key, fp, fn):
+        """Return (value, replayed): fn() the first time, the stored value after that.
+
+        A duplicate that arrives while the first call is still running waits for it
+        instead of running fn again. Exceptions aren't stored, so a failed request can
+        be retried with the same key.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._purge(now)
+                entry = self._lookup(key, fp, now)
+                if entry is not None:
+                    self._record(True)
+                    return entry[1], True
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self._in_flight[key] = threading.Event()
+                    self._record(False)
+                    break
+            if not pending.wait(self.in_flight_wait):
+                raise IdempotencyInProgress(key)
+
+        try:
+            value = fn()
+        except BaseException:
+            with self._lock:
+                self._in_flight.pop(key).set()
+            raise
+        self.put(key, fp, value)
+        with self._lock:
+            self._in_flight.pop(key).set()
+        return value, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.requests = 0
+            self.replays = 0
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,74 @@
+#tiny in-process metrics registry, exposed as json on /metrics
+import threading, time
+from collections import deque
+
+SUMMARY_WINDOW = 1024 #recent observations kept per summary for the percentiles
+
+class Summary:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.recent = deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.recent.append(value)
+
+    def snapshot(self):
+        ordered = sorted(self.recent)
+        def pct(p):
+            if not ordered:
+                return None
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+        }
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.summaries = {}
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        with self._lock:
+            self.summaries.setdefault(name, Summary()).observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_seconds": time.time() - self.started_at,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "summaries": {name: s.snapshot() for name, s in self.summaries.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.summaries.clear()
+
+metrics = Metrics()
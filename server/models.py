@@ -1,21 +1,116 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, Float, Enum
+import clock
 from database import Base
+from reminder_status import ReminderStatus
+from tenancy import DEFAULT_USER
+
+#stored as the short value string (no native enum, no migration of existing rows) but
+#only ReminderStatus values get in or out
+StatusColumn = Enum(ReminderStatus, native_enum=False, length=12, validate_strings=True,
+                    values_callable=lambda statuses: [s.value for s in statuses])
 
 class Reminder(Base):
     __tablename__= "reminders"
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(64), default=DEFAULT_USER) #owner; every api read and write is scoped by it
     task = Column(Text)
     time_iso = Column(String)
     repeat = Column(String, nullable=True)
-    status = Column(String)
+    status = Column(StatusColumn)
     created_at = Column(String)
     updated_at = Column(String)
+    change_seq = Column(Integer, index=True) #bumped on every write, drives /reminders/changes
+    due_at = Column(Float) #utc epoch seconds, parsed once from time_iso at write time
+
+    #the scheduler's due scan across all users: status first, then the time range.
+    #per-user indexes lead on user_id so a user's reads only touch their own rows:
+    #listing in display order (time, then id), status filters, delta sync
+    __table_args__ = (
+        Index("ix_reminders_status_due", "status", "due_at"),
+        Index("ix_reminders_user_due", "user_id", "due_at", "id"),
+        Index("ix_reminders_user_status_due", "user_id", "status", "due_at"),
+        Index("ix_reminders_user_seq", "user_id", "change_seq"),
+    )
+
+class ReminderTombstone(Base):
+    #left behind by deletes so delta sync can tell clients to drop the row
+    __tablename__ = "reminder_tombstones"
+    reminder_id = Column(Integer, primary_key=True)
+    user_id = Column(String(64), default=DEFAULT_USER)
+    change_seq = Column(Integer, index=True)
+    deleted_at = Column(String)
+
+    __table_args__ = (
+        Index("ix_tombstones_user_seq", "user_id", "change_seq"),
+    )
+
+class ReminderTerm(Base):
+    #inverted index behind /reminders/search when sqlite fts5 isn't available (search_index.py);
+    #the primary key doubles as the per-user term index, prefix queries are a range on it
+    __tablename__ = "reminder_terms"
+    user_id = Column(String(64), primary_key=True)
+    term = Column(String(64), primary_key=True)
+    reminder_id = Column(Integer, primary_key=True)
+    tf = Column(Integer, default=1) #occurrences of the term in the task
+
+    __table_args__ = (
+        Index("ix_reminder_terms_reminder", "reminder_id"),
+    )
+
+class ChangeCounter(Base):
+    #single row holding the last handed-out change_seq
+    __tablename__ = "change_counter"
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
 
 class EventLog(Base):
     __tablename__ = "event_log"
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(64), default=DEFAULT_USER)
     event_type = Column(String)
     reminder_id = Column(Integer)
-    timestamp = Column(String, default=lambda: datetime.now().isoformat())
-    info = Column(String, nullable=True) #optional details go here
\ No newline at end of file
+    timestamp = Column(String, default=lambda: clock.now_iso())
+    info = Column(String, nullable=True) #optional details go here
+
+    #per-user history (by reminder, or the whole log in id order) + retention scans by age
+    __table_args__ = (
+        Index("ix_event_log_user_reminder", "user_id", "reminder_id", "id"),
+        Index("ix_event_log_user_id", "user_id", "id"),
+        Index("ix_event_log_timestamp", "timestamp"),
+    )
+
+
+class Delivery(Base):
+    #one row per (due event, channel): written by the dispatcher, updated after every attempt
+    __tablename__ = "deliveries"
+    id = Column(String, primary_key=True)
+    user_id = Column(String(64), default=DEFAULT_USER)
+    reminder_id = Column(Integer)
+    channel = Column(String)
+    status = Column(String) #pending -> sent (dropped: no one listening), or retry -> ... -> dead after max attempts
+    priority = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    payload = Column(Text) #the event as json, so pending deliveries survive a restart
+    last_error = Column(String, nullable=True)
+    created_at = Column(String)
+    updated_at = Column(String)
+
+    #delivery history per reminder + the restart scan for unfinished deliveries
+    __table_args__ = (
+        Index("ix_deliveries_reminder", "reminder_id", "channel"),
+        Index("ix_deliveries_user_created", "user_id", "created_at"),
+        Index("ix_deliveries_status", "status", "created_at"),
+    )
+
+class SchedulerLease(Base):
+    #one row per shard; a worker only fires reminders in shards it holds an unexpired lease on
+    __tablename__ = "scheduler_leases"
+    shard = Column(Integer, primary_key=True)
+    owner = Column(String, nullable=True)
+    expires_at = Column(Float, default=0) #epoch seconds
+
+class SchedulerWorker(Base):
+    #heartbeat per live scheduler process, used to work out each worker's fair share of shards
+    __tablename__ = "scheduler_workers"
+    worker_id = Column(String, primary_key=True)
+    heartbeat_at = Column(Float) #epoch seconds
@@ -0,0 +1,524 @@
+"""
+Offline-first local reminder store for the clients (voice client, Tk UI).
+
+A small SQLite file holds a replica of the user's reminders plus an
+outbox of mutations that haven't reached the server yet:
+
+- Writes (create / update / delete, and the ack / snooze / complete
+  lifecycle actions) go to the replica and the outbox in
+  one local transaction and return immediately, whether or not the
+  reminder API is up.
+- flush() sends the outbox in order once the server is reachable:
+  consecutive creates go out as one POST /reminders/bulk, everything
+  else one request each. Every entry carries an idempotency key
+  generated when it was queued, so a flush retried after a timeout can
+  be recognized by the server instead of creating duplicates.
+- pull() applies GET /reminders/changes to the replica. Rows with
+  unflushed local edits keep the local version until the outbox drains.
+
+Reads (list / get / find) only ever touch the local file.
+
+Rows have a local integer id (stable, what the UI shows) and, once the
+server has accepted them, a server_id (what the voice commands use).
+
+Network access goes through a `transport`:
+
+    send(method, path, json=None, params=None, headers=None) -> (status, body)
+
+which raises on connection errors. HttpTransport below is a stdlib one.
+"""
+
+import hashlib
+import http.client
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# ----------------------------------------
+# CONFIG
+# ----------------------------------------
+
+BATCH_SIZE = 100                                # creates per POST /reminders/bulk
+CREATE_FIELDS = ("task", "time_iso", "repeat", "timezone")
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}  # leave the entry queued and try later
+ACTIONS = {"ack": "acknowledged", "snooze": "snoozed", "complete": "completed"}  # POST /reminders/{id}/<action>
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id         INTEGER PRIMARY KEY,
+    server_id  INTEGER UNIQUE,
+    task       TEXT NOT NULL,
+    time_iso   TEXT NOT NULL,
+    repeat     TEXT,
+    status     TEXT NOT NULL DEFAULT 'scheduled',
+    due_at     REAL,
+    change_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_local_due ON reminders (due_at, id);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    op              TEXT NOT NULL,
+    local_id        INTEGER NOT NULL,
+    payload         TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    queued_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_local ON outbox (local_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+Transport = Callable[..., Tuple[int, object]]
+
+# HttpTransport takes a `json=` keyword like requests does, which shadows the module
+_dumps = json.dumps
+_loads = json.loads
+
+
+# ----------------------------------------
+# Transport
+# ----------------------------------------
+
+class HttpTransport:
+    """Keep-alive http.client transport; one connection, so use it from one thread."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0, user_id: Optional[str] = None):
+        parts = urlsplit(base_url)
+        self.user_id = user_id  # sent as X-User-Id; the server scopes everything by it
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def __call__(self, method, path, json=None, params=None, headers=None):
+        url = self.prefix + path + (f"?{urlencode(params)}" if params else "")
+        body = _dumps(json).encode() if json is not None else None
+        all_headers = {"Accept": "application/json", **(headers or {})}
+        if self.user_id:
+            all_headers["X-User-Id"] = self.user_id
+        if body is not None:
+            all_headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, url, body=body, headers=all_headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # stale keep-alive connection: reconnect once, then give up
+                conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+        try:
+            return response.status, _loads(data) if data else None
+        except ValueError:
+            return response.status, data.decode(errors="replace")
+
+
+# ----------------------------------------
+# Store
+# ----------------------------------------
+
+class OfflineStore:
+    """
+    Local replica + outbox. Thread-safe (one connection behind a lock),
+    so a background sync thread and the UI / command thread can share it.
+
+    Args:
+        path: SQLite file (":memory:" for a throwaway store).
+        on_reject: called with (op, row, status, body) when the server
+            permanently refuses a queued mutation (e.g. an unparseable time).
+    """
+
+    def __init__(self, path: str = "offline_reminders.db", batch_size: int = BATCH_SIZE,
+                 on_reject: Optional[Callable] = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.on_reject = on_reject
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        # WAL + synchronous=NORMAL: a local write is a page append, not an fsync
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+    # ---------- helpers ----------
+
+    def _tx(self):
+        """BEGIN IMMEDIATE ... COMMIT around a block (use with `with self._lock`)."""
+        return _Transaction(self.db)
+
+    def _row(self, local_id: int) -> Optional[dict]:
+        row = self.db.execute("SELECT * FROM reminders WHERE id = ?", (local_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _queue(self, op: str, local_id: int, payload: dict) -> None:
+        self.db.execute(
+            "INSERT INTO outbox (op, local_id, payload, idempotency_key, queued_at) VALUES (?, ?, ?, ?, ?)",
+            (op, local_id, _dumps(payload), uuid.uuid4().hex, time.time()),
+        )
+
+    def _pending(self, local_id: int, op: Optional[str] = None) -> List[sqlite3.Row]:
+        sql = "SELECT * FROM outbox WHERE local_id = ?"
+        args: tuple = (local_id,)
+        if op is not None:
+            sql += " AND op = ?"
+            args += (op,)
+        return self.db.execute(sql + " ORDER BY seq", args).fetchall()
+
+    @property
+    def sync_token(self) -> int:
+        with self._lock:
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'sync_token'").fetchone()
+            return int(row[0]) if row else 0
+
+    def _set_sync_token(self, token: int) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sync_token', ?)", (str(token),))
+
+    # ---------- local reads ----------
+
+    def get(self, local_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._row(local_id)
+
+    def by_server_id(self, server_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM reminders WHERE server_id = ?", (server_id,)).fetchone()
+            return dict(row) if row else None
+
+    def list(self, status: Optional[str] = None) -> List[dict]:
+        """All local reminders by due time; ones the server hasn't timed yet go last."""
+        sql = "SELECT * FROM reminders"
+        args: tuple = ()
+        if status is not None:
+            sql += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self.db.execute(sql + " ORDER BY due_at IS NULL, due_at, id", args).fetchall()
+        return [dict(r) for r in rows]
+
+    def find(self, text: str) -> Optional[dict]:
+        """First reminder (by due time) whose task contains `text`, case-insensitively."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT * FROM reminders WHERE instr(lower(task), ?) > 0 ORDER BY due_at IS NULL, due_at, id LIMIT 1",
+                (text.lower(),),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def search(self, text: str, limit: int = 10) -> List[dict]:
+        """Reminders whose task contains every word of `text` (offline stand-in for /reminders/search)."""
+        words = text.lower().split()
+        if not words:
+            return []
+        where = " AND ".join("instr(lower(task), ?) > 0" for _ in words)
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT * FROM reminders WHERE {where} ORDER BY due_at IS NULL, due_at, id LIMIT ?",
+                (*words, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending(self) -> int:
+        """Mutations waiting to be sent."""
+        with self._lock:
+            return self.db.execute("SELECT count(*) FROM outbox").fetchone()[0]
+
+    # ---------- local writes ----------
+
+    def create(self, task: str, time_iso: str, repeat: Optional[str] = None,
+               timezone: Optional[str] = None) -> dict:
+        with self._lock, self._tx():
+            cur = self.db.execute(
+                "INSERT INTO reminders (task, time_iso, repeat) VALUES (?, ?, ?)", (task, time_iso, repeat)
+            )
+            payload = {"task": task, "time_iso": time_iso, "repeat": repeat}
+            if timezone:
+                payload["timezone"] = timezone
+            self._queue("create", cur.lastrowid, payload)
+            return self._row(cur.lastrowid)
+
+    def update(self, local_id: int, fields: Dict) -> Optional[dict]:
+        """
+        Apply `fields` locally and queue them. Edits to a reminder whose
+        create hasn't been sent yet are folded into that create.
+        """
+        with self._lock, self._tx():
+            row = self._row(local_id)
+            if row is None:
+                return None
+            local = {k: v for k, v in fields.items() if k in ("task", "time_iso", "repeat", "status")}
+            if "time_iso" in local:
+                local["due_at"] = None  # unknown until the server has parsed it
+            if local:
+                sets = ", ".join(f"{k} = ?" for k in local)
+                self.db.execute(f"UPDATE reminders SET {sets} WHERE id = ?", (*local.values(), local_id))
+
+            rest = dict(fields)
+            pending_create = self._pending(local_id, "create")
+            if pending_create:
+                entry = pending_create[0]
+                payload = _loads(entry["payload"])
+                for k in CREATE_FIELDS:
+                    if k in rest:
+                        payload[k] = rest.pop(k)
+                self.db.execute("UPDATE outbox SET payload = ? WHERE seq = ?", (_dumps(payload), entry["seq"]))
+            if rest:
+                self._queue("update", local_id, rest)
+            return self._row(local_id)
+
+    def delete(self, local_id: int) -> bool:
+        with self._lock, self._tx():
+            row = self._row(local_id)
+            if row is None:
+                return False
+            never_sent = bool(self._pending(local_id, "create"))
+            # queued edits are moot once the reminder is gone
+            self.db.execute("DELETE FROM outbox WHERE local_id = ?", (local_id,))
+            self.db.execute("DELETE FROM reminders WHERE id = ?", (local_id,))
+            if not never_sent and row["server_id"] is not None:
+                self._queue("delete", local_id, {"server_id": row["server_id"]})
+            return True
+
+    def action(self, local_id: int, action: str, body: Optional[Dict] = None) -> Optional[dict]:
+        """
+        Queue a lifecycle action (see ACTIONS) and show its status locally
+        right away. The server decides the final state (a repeating
+        reminder comes back scheduled for its next occurrence).
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action {action!r}")
+        with self._lock, self._tx():
+            if self._row(local_id) is None:
+                return None
+            self.db.execute("UPDATE reminders SET status = ? WHERE id = ?", (ACTIONS[action], local_id))
+            self._queue("action", local_id, {"action": action, "body": body or {}})
+            return self._row(local_id)
+
+    # ---------- sync ----------
+
+    def flush(self, send: Transport) -> int:
+        """
+        Send queued mutations in order until the outbox is empty or the
+        server is unreachable / failing. Returns how many were applied.
+        Connection errors propagate, leaving the rest queued.
+        """
+        sent = 0
+        while True:
+            with self._lock:
+                entries = self.db.execute(
+                    "SELECT * FROM outbox ORDER BY seq LIMIT ?", (self.batch_size,)
+                ).fetchall()
+            if not entries:
+                return sent
+
+            creates = []
+            for entry in entries:
+                if entry["op"] != "create":
+                    break
+                creates.append(entry)
+
+            if creates:
+                done = self._send_creates(send, creates)
+            else:
+                done = self._send_one(send, entries[0])
+            if not done:
+                return sent
+            sent += done
+
+    def _attempt(self, entries) -> None:
+        with self._lock:
+            self.db.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE seq = ?",
+                                [(e["seq"],) for e in entries])
+
+    def _send_creates(self, send: Transport, entries) -> int:
+        items = []
+        for entry in entries:
+            item = _loads(entry["payload"])
+            item["client_id"] = entry["idempotency_key"]
+            items.append(item)
+        # same entries -> same key, so a retried batch is recognizable as a replay
+        batch_key = hashlib.sha256("".join(e["idempotency_key"] for e in entries).encode()).hexdigest()[:32]
+        self._attempt(entries)
+        status, body = send("POST", "/reminders/bulk", json={"items": items},
+                            headers={"Idempotency-Key": batch_key})
+        if status in RETRY_STATUSES:
+            return 0
+        if status >= 400:
+            # the whole batch was refused (e.g. validation): reject every item
+            for entry in entries:
+                self._reject(entry, status, body)
+            return len(entries)
+
+        by_key = {e["idempotency_key"]: e for e in entries}
+        with self._lock, self._tx():
+            for result in body["results"]:
+                entry = by_key[result["client_id"]]
+                if result.get("reminder") is None:
+                    self._reject(entry, 422, result.get("error"))
+                    continue
+                self._adopt(entry["local_id"], result["reminder"])
+                self.db.execute("DELETE FROM outbox WHERE seq = ?", (entry["seq"],))
+        return len(entries)
+
+    def _send_one(self, send: Transport, entry) -> int:
+        payload = _loads(entry["payload"])
+        row = self.get(entry["local_id"])
+        server_id = payload.pop("server_id", None) or (row or {}).get("server_id")
+        headers = {"Idempotency-Key": entry["idempotency_key"]}
+        self._attempt([entry])
+
+        if entry["op"] == "delete":
+            status, body = send("DELETE", f"/reminders/{server_id}", headers=headers)
+            if status in RETRY_STATUSES:
+                return 0
+            ok = status < 400 or status == 404  # already gone counts as done
+        elif entry["op"] == "action":
+            status, body = send("POST", f"/reminders/{server_id}/{payload['action']}",
+                                json=payload["body"], headers=headers)
+            if status in RETRY_STATUSES:
+                return 0
+            ok = status < 400
+        else:
+            status, body = send("PATCH", f"/reminders/{server_id}", json=payload, headers=headers)
+            if status in RETRY_STATUSES:
+                return 0
+            ok = status < 400
+
+        if not ok and row is not None and entry["op"] != "delete":
+            # e.g. a 409 for an ack the server no longer allows: undo the optimistic
+            # local state, the changes feed won't resend a row that didn't change
+            fresh_status, fresh = send("GET", f"/reminders/{server_id}")
+            if fresh_status == 200 and isinstance(fresh, dict):
+                with self._lock:
+                    self._adopt(entry["local_id"], fresh)
+        with self._lock, self._tx():
+            if not ok:
+                self._reject(entry, status, body)
+                return 1
+            if entry["op"] in ("update", "action") and row is not None and isinstance(body, dict):
+                self._adopt(entry["local_id"], body)
+            self.db.execute("DELETE FROM outbox WHERE seq = ?", (entry["seq"],))
+        return 1
+
+    def _adopt(self, local_id: int, server: dict) -> None:
+        """Take the server's view of a row we just wrote (normalized time, id, seq)."""
+        self.db.execute(
+            "UPDATE reminders SET server_id = ?, task = ?, time_iso = ?, repeat = ?, status = ?, "
+            "due_at = ?, change_seq = ? WHERE id = ?",
+            (server["id"], server["task"], server["time_iso"], server.get("repeat"),
+             server["status"], server.get("due_at"), server.get("change_seq"), local_id),
+        )
+
+    def _reject(self, entry, status: int, body) -> None:
+        """The server will never accept this entry: drop it (and the row, for a create)."""
+        with self._lock:
+            row = self._row(entry["local_id"])
+            self.db.execute("DELETE FROM outbox WHERE seq = ?", (entry["seq"],))
+            if entry["op"] == "create":
+                self.db.execute("DELETE FROM outbox WHERE local_id = ?", (entry["local_id"],))
+                self.db.execute("DELETE FROM reminders WHERE id = ?", (entry["local_id"],))
+        print("[OFFLINE STORE] rejected", entry["op"], row, status, body)
+        if self.on_reject:
+            self.on_reject(entry["op"], row, status, body)
+
+    def apply_changes(self, changes: dict) -> List[int]:
+        """
+        Apply one /reminders/changes page. Returns the local ids that
+        changed (deleted ones included). Rows with queued edits are left
+        alone; the server's version arrives again after they're flushed.
+        """
+        touched = []
+        with self._lock, self._tx():
+            # the server can reuse an id after a delete, so a tombstone only applies
+            # if it's newer than the row we hold: not when the page also carries
+            # that id as a live reminder, nor when our copy is newer than the page
+            live = {rem["id"] for rem in changes.get("upserts", [])}
+            token = changes.get("token")
+            for server_id in changes.get("tombstones", []):
+                if server_id in live:
+                    continue
+                existing = self.db.execute(
+                    "SELECT id, change_seq FROM reminders WHERE server_id = ?", (server_id,)
+                ).fetchone()
+                stale = token is not None and (existing["change_seq"] or 0) > token if existing else False
+                if existing is not None and not stale:
+                    self.db.execute("DELETE FROM outbox WHERE local_id = ?", (existing["id"],))
+                    self.db.execute("DELETE FROM reminders WHERE id = ?", (existing["id"],))
+                    touched.append(existing["id"])
+            for rem in changes.get("upserts", []):
+                existing = self.db.execute(
+                    "SELECT id FROM reminders WHERE server_id = ?", (rem["id"],)
+                ).fetchone()
+                if existing is None:
+                    cur = self.db.execute(
+                        "INSERT INTO reminders (server_id, task, time_iso, repeat, status, due_at, change_seq) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (rem["id"], rem["task"], rem["time_iso"], rem.get("repeat"), rem["status"],
+                         rem.get("due_at"), rem.get("change_seq")),
+                    )
+                    touched.append(cur.lastrowid)
+                elif not self._pending(existing["id"]):
+                    self._adopt(existing["id"], rem)
+                    touched.append(existing["id"])
+            if "token" in changes:
+                self._set_sync_token(changes["token"])
+        return touched
+
+    def pull(self, send: Transport, limit: int = 500) -> Tuple[List[int], List[dict]]:
+        """
+        Fetch and apply every change since the stored token.
+        Returns (local ids touched, the raw change pages).
+        """
+        touched, pages = [], []
+        while True:
+            status, body = send("GET", "/reminders/changes", params={"since": self.sync_token, "limit": limit})
+            if status != 200:
+                raise ConnectionError(f"GET /reminders/changes returned {status}: {body}")
+            touched += self.apply_changes(body)
+            pages.append(body)
+            if not body.get("has_more"):
+                return touched, pages
+
+    def sync(self, send: Transport) -> Tuple[List[int], List[dict]]:
+        """flush() then pull(): push local edits first so the pull reflects them."""
+        self.flush(send)
+        return self.pull(send)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+        self.depth = 0
+
+    def __enter__(self):
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.depth = 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.depth:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,73 @@
+#reminder lifecycle: the allowed status values and which transitions are legal
+import enum
+from datetime import datetime, timedelta, timezone
+
+class ReminderStatus(str, enum.Enum):
+    SCHEDULED = "scheduled"         #waiting for due_at
+    DUE = "due"                     #fired by the scheduler, not yet seen by the user
+    ACKNOWLEDGED = "acknowledged"   #a client announced it / the user saw it
+    SNOOZED = "snoozed"             #pushed back; fires again at the new due_at
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+S = ReminderStatus
+
+#statuses the scheduler's due scan looks at (one IN over the (status, due_at) index)
+ARMED = (S.SCHEDULED, S.SNOOZED)
+
+#target -> statuses it can be reached from. same-status writes are no-ops, so a retried
+#ack/complete doesn't turn into a conflict
+TRANSITIONS = {
+    S.SCHEDULED: {S.DUE, S.ACKNOWLEDGED, S.SNOOZED, S.COMPLETED, S.CANCELLED}, #reopen / re-arm
+    S.DUE: set(ARMED),
+    S.ACKNOWLEDGED: {S.DUE},
+    S.SNOOZED: {S.SCHEDULED, S.DUE, S.ACKNOWLEDGED, S.SNOOZED},
+    S.COMPLETED: {S.SCHEDULED, S.DUE, S.ACKNOWLEDGED, S.SNOOZED},
+    S.CANCELLED: {S.SCHEDULED, S.DUE, S.ACKNOWLEDGED, S.SNOOZED},
+}
+
+#older clients wrote these
+ALIASES = {"done": S.COMPLETED, "complete": S.COMPLETED, "canceled": S.CANCELLED, "ack": S.ACKNOWLEDGED}
+
+class InvalidTransition(Exception):
+    def __init__(self, current, target):
+        super().__init__(f"cannot go from {current} to {target}")
+        self.current = current
+        self.target = target
+
+def parse_status(value):
+    #raises ValueError for anything that isn't a status
+    if isinstance(value, ReminderStatus):
+        return value
+    value = str(value).strip().lower()
+    return ALIASES.get(value) or ReminderStatus(value)
+
+def allowed_from(target):
+    #statuses that may move to `target`, including target itself (idempotent no-op)
+    return {target} | TRANSITIONS[target]
+
+def check(current, target):
+    current, target = parse_status(current), parse_status(target)
+    if current not in allowed_from(target):
+        raise InvalidTransition(current.value, target.value)
+    return target
+
+REPEAT_DAYS = {"daily": 1, "weekly": 7}
+
+def next_occurrence(due_at, repeat, after):
+    """Next due_at (epoch seconds) strictly after `after` for a repeating reminder, else None.
+
+    Steps in server-local wall time so a 9:00 reminder stays at 9:00 across DST changes.
+    "weekdays" skips saturday and sunday.
+    """
+    if due_at is None or repeat not in ("daily", "weekly", "weekdays"):
+        return None
+    when = datetime.fromtimestamp(due_at, timezone.utc).astimezone().replace(tzinfo=None)
+    step = timedelta(days=REPEAT_DAYS.get(repeat, 1))
+    while True:
+        when += step
+        if repeat == "weekdays" and when.weekday() >= 5:
+            continue
+        ts = when.astimezone().timestamp()
+        if ts > after:
+            return ts
@@ -0,0 +1,52 @@
+import asyncio, json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database import get_db
+from dispatcher import dispatcher
+from models import Delivery
+from schemas import DeliveryRead
+from tenancy import current_user, rate_limited_user
+
+router = APIRouter(prefix="/dispatch")
+
+SSE_KEEPALIVE = 15 #seconds between comment lines so proxies don't drop an idle stream
+
+@router.get("/stream")
+async def stream(user=Depends(current_user)):
+    #server-sent events: one `data:` line per due reminder of this user, pushed by the dispatcher
+    channel = dispatcher.channels.get("sse")
+    if channel is None:
+        raise HTTPException(status_code=404, detail={"error": "SSE_DISABLED"})
+    subscription = channel.subscribe(user)
+
+    async def events():
+        #async so an idle stream just waits on the loop instead of holding a threadpool worker
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: due\ndata: {json.dumps(event)}\n\n"
+        finally:
+            channel.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@router.get("/deliveries", response_model=list[DeliveryRead])
+def deliveries(
+    reminder_id: int | None = None,
+    status: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user=Depends(rate_limited_user),
+    db=Depends(get_db),
+):
+    query = db.query(Delivery).filter(Delivery.user_id == user)
+    if reminder_id is not None:
+        query = query.filter(Delivery.reminder_id == reminder_id)
+    if status is not None:
+        query = query.filter(Delivery.status == status)
+    return query.order_by(Delivery.created_at.desc()).limit(limit).all()
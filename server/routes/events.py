@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from database import get_db
+import crud
+from schemas import EventPage
+from tenancy import rate_limited_user
+
+router = APIRouter(prefix="/events")
+
+@router.get("/", response_model=EventPage)
+def list_events(
+    reminder_id: int | None = None,
+    event_type: str | None = None,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    user=Depends(rate_limited_user),
+    db=Depends(get_db),
+):
+    items = crud.list_events(db, reminder_id=reminder_id, event_type=event_type, after_id=cursor, limit=limit,
+                             user_id=user)
+    #a full page means there may be more - hand back the last id as the next cursor
+    next_cursor = items[-1].id if len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
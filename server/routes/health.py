@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from database import get_db
+import scheduler
+from dispatcher import dispatcher
+from event_log import event_writer
+from metrics import metrics
+
+router = APIRouter()
+
+@router.get("/health")
+def health_check(db=Depends(get_db)):
+    try:
+        db.execute(text("SELECT 1"))
+        db_ok = True
+    except Exception:
+        db_ok = False
+    return {
+        "status": "ok" if db_ok else "degraded",
+        "service": "reminders",
+        "database": db_ok,
+        "scheduler": scheduler.is_running(),
+        "dispatcher": dispatcher.is_running(),
+    }
+
+@router.get("/metrics")
+def get_metrics():
+    metrics.set_gauge("event_log_pending", event_writer.pending())
+    return metrics.snapshot()
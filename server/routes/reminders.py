@@ -1,26 +1,214 @@
-from fastapi import APIRouter, Depends
-from database import SessionLocal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from database import get_db
 import crud
-from schemas import ReminderCreate, ReminderRead
+from cache import reminder_cache
+from metrics import metrics
+from idempotency import (
+    idempotency_store, fingerprint, IdempotencyKeyReused, IdempotencyInProgress, MAX_KEY_LENGTH
+)
+from timeparse import TimeParseError
+from reminder_status import InvalidTransition, ReminderStatus
+from tenancy import rate_limited_user
+from schemas import (
+    ReminderCreate, ReminderRead, ReminderUpdate, ReminderChanges, ReminderBulkCreate, ReminderBulkResponse,
+    ReminderSnooze, ReminderSearchPage
+)
 
 router = APIRouter(prefix="/reminders")
 
-def get_db():
-    db = SessionLocal()
+REQUIRED_FIELDS = ("task", "time_iso", "status") #can't be patched to null
+
+def etag_matches(request: Request, etag):
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    return header.strip() == "*" or etag in [t.strip() for t in header.split(",")]
+
+def invalid_time(e):
+    return HTTPException(status_code=422, detail={"error": "INVALID_TIME", "message": str(e)})
+
+def invalid_transition(e):
+    return HTTPException(status_code=409, detail={"error": "INVALID_TRANSITION", "from": e.current, "to": e.target})
+
+def invalid_status(e):
+    return HTTPException(status_code=422, detail={"error": "INVALID_STATUS", "message": str(e),
+                                                  "allowed": [s.value for s in ReminderStatus]})
+
+def idempotent(response: Response, key, scope, user, payload, fn):
+    #no key: plain request. with a key: the first response is stored and replayed for retries.
+    #keys are per user, so two users picking the same key never see each other's response
+    if key is None:
+        return fn()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail={"error": "INVALID_IDEMPOTENCY_KEY"})
     try:
-        yield db
-    finally:
-        db.close()
+        value, replayed = idempotency_store.run(f"{scope}:{user}:{key}", fingerprint(payload), fn)
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail={"error": "IDEMPOTENCY_KEY_REUSED",
+                                                     "message": "key was already used with a different body"})
+    except IdempotencyInProgress:
+        raise HTTPException(status_code=409, detail={"error": "REQUEST_IN_PROGRESS"})
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return value
 
 @router.post("/", response_model=ReminderRead)
-def create(rem: ReminderCreate, db=Depends(get_db)):
-    return crud.create_reminder(db, rem.task, rem.time_iso, rem.repeat)
+def create(rem: ReminderCreate, response: Response, idempotency_key: str | None = Header(None),
+           user=Depends(rate_limited_user), db=Depends(get_db)):
+    def run():
+        try:
+            reminder = crud.create_reminder(db, rem.task, rem.time_iso, rem.repeat, tz_name=rem.timezone, user_id=user)
+        except TimeParseError as e:
+            raise invalid_time(e)
+        return crud.reminder_to_dict(reminder)
+    return idempotent(response, idempotency_key, "create", user, rem.model_dump(), run)
+
+BULK_MAX = 500
+
+@router.post("/bulk", response_model=ReminderBulkResponse)
+def create_bulk(body: ReminderBulkCreate, response: Response, idempotency_key: str | None = Header(None),
+                user=Depends(rate_limited_user), db=Depends(get_db)):
+    #offline clients flush their queued creates here: one request and one commit per batch
+    if len(body.items) > BULK_MAX:
+        raise HTTPException(status_code=413, detail={"error": "BATCH_TOO_LARGE", "max": BULK_MAX})
+    return idempotent(response, idempotency_key, "bulk", user, body.model_dump(),
+                      lambda: create_items(body.items, user, db))
+
+def create_items(items, user, db):
+    #items are deduped on client_id too, so a batch that is resent with more items
+    #appended (new key) still doesn't create the ones that already went through
+    results = {}
+    new = []
+    for i, item in enumerate(items):
+        stored = None
+        if item.client_id is not None:
+            try:
+                #per-item keys aren't Idempotency-Key requests: keep them out of the hit rate
+                stored = idempotency_store.peek(f"bulk-item:{user}:{item.client_id}", fingerprint(item.model_dump()))
+            except IdempotencyKeyReused:
+                stored = {"client_id": item.client_id, "reminder": None,
+                          "error": {"error": "IDEMPOTENCY_KEY_REUSED", "message": "client_id reused"}}
+        if stored is not None:
+            metrics.inc("idempotency_bulk_item_replays_total")
+            results[i] = stored
+        else:
+            new.append((i, item))
+    created = crud.create_reminders_bulk(db, [item for _, item in new], user_id=user) if new else []
+    for (i, item), result in zip(new, created):
+        if item.client_id is not None and result["reminder"] is not None:
+            idempotency_store.put(f"bulk-item:{user}:{item.client_id}", fingerprint(item.model_dump()), result)
+        results[i] = result
+    return {"results": [results[i] for i in range(len(items))]}
+
+PAGE_LIMIT_MAX = 1000
 
 @router.get("/", response_model=list[ReminderRead])
-def list_all(db=Depends(get_db)):
-    return crud.list_reminders(db)
+def list_all(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    offset: int = Query(0, ge=0),
+    status: str | None = None,
+    user=Depends(rate_limited_user),
+    db=Depends(get_db),
+):
+    if limit is not None or offset or status is not None:
+        #paged: ordered by time then id, total row count in X-Total-Count
+        try:
+            total, items = crud.list_reminders_page(db, limit or PAGE_LIMIT_MAX, offset, status, user_id=user)
+        except ValueError as e:
+            raise invalid_status(e)
+        response.headers["X-Total-Count"] = str(total)
+        return items
+    #unchanged poll: answer from the cached etag without touching the db
+    cached_etag = reminder_cache.peek_etag(user)
+    if etag_matches(request, cached_etag):
+        return Response(status_code=304, headers={"ETag": cached_etag})
+    etag, reminders = crud.list_reminders_with_etag(db, user)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return reminders
+
+@router.get("/changes", response_model=ReminderChanges)
+def changes(since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=5000),
+            user=Depends(rate_limited_user), db=Depends(get_db)):
+    #delta sync: pass the returned token back as `since` next time (0 = full snapshot)
+    token, upserts, tombstones, has_more = crud.list_changes(db, since, limit, user_id=user)
+    return {"token": token, "upserts": upserts, "tombstones": tombstones, "has_more": has_more}
+
+SEARCH_LIMIT_MAX = 100
+
+@router.get("/search", response_model=ReminderSearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=SEARCH_LIMIT_MAX),
+    offset: int = Query(0, ge=0),
+    status: str | None = None,
+    user=Depends(rate_limited_user),
+    db=Depends(get_db),
+):
+    #ranked full-text search over task; the last word matches as a prefix ("mom bir" finds "mom's birthday")
+    try:
+        items, next_offset = crud.search_reminders(db, q, limit, offset, status, user_id=user)
+    except ValueError as e:
+        raise invalid_status(e)
+    return {"items": items, "next_offset": next_offset}
+
+@router.get("/{id}", response_model=ReminderRead)
+def get_one(id: int, user=Depends(rate_limited_user), db=Depends(get_db)):
+    reminder = crud.get_reminder(db, id, user_id=user)
+    if reminder is None:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return reminder
+
+@router.patch("/{id}", response_model=ReminderRead)
+def update(id: int, rem: ReminderUpdate, user=Depends(rate_limited_user), db=Depends(get_db)):
+    fields = rem.model_dump(exclude_unset=True)
+    #null clears repeat; the other columns can only be changed, never emptied
+    nulled = [name for name in REQUIRED_FIELDS if name in fields and fields[name] is None]
+    if nulled:
+        raise HTTPException(status_code=422, detail={"error": "NULL_FIELD", "fields": nulled})
+    tz_name = fields.pop("timezone", None)
+    try:
+        reminder = crud.update_reminder(db, id, tz_name=tz_name, user_id=user, **fields)
+    except TimeParseError as e:
+        raise invalid_time(e)
+    except InvalidTransition as e:
+        raise invalid_transition(e)
+    except ValueError as e:
+        raise invalid_status(e)
+    if reminder is None:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return reminder
+
+def transition(db, user, id, target, time_iso=None, tz_name=None):
+    try:
+        reminder = crud.transition(db, id, target, time_iso, tz_name, user_id=user)
+    except TimeParseError as e:
+        raise invalid_time(e)
+    except InvalidTransition as e:
+        raise invalid_transition(e)
+    if reminder is None:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return reminder
+
+#lifecycle actions. repeating one is a no-op (except snooze), so clients can retry them blindly
+@router.post("/{id}/ack", response_model=ReminderRead)
+def ack(id: int, user=Depends(rate_limited_user), db=Depends(get_db)):
+    return transition(db, user, id, ReminderStatus.ACKNOWLEDGED)
+
+@router.post("/{id}/snooze", response_model=ReminderRead)
+def snooze(id: int, body: ReminderSnooze | None = None, user=Depends(rate_limited_user), db=Depends(get_db)):
+    body = body or ReminderSnooze()
+    when = body.until or f"in {body.duration}"
+    return transition(db, user, id, ReminderStatus.SNOOZED, when, body.timezone)
+
+@router.post("/{id}/complete", response_model=ReminderRead)
+def complete(id: int, user=Depends(rate_limited_user), db=Depends(get_db)):
+    return transition(db, user, id, ReminderStatus.COMPLETED)
 
 @router.delete("/{id}")
-def delete(id: int, db=Depends(get_db)):
-    crud.delete_reminder(db, id)
-    return {"ok": True}
\ No newline at end of file
+def delete(id: int, user=Depends(rate_limited_user), db=Depends(get_db)):
+    crud.delete_reminder(db, id, user_id=user)
+    return {"ok": True}
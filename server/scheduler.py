@@ -1,21 +1,142 @@
-import threading, time
+import logging, os, socket, threading, time, uuid
 from database import SessionLocal
 import crud
-from datetime import datetime
+import event_log
+from dispatcher import dispatcher, event_for
+import shard_leases
+from cache import reminder_cache
+from metrics import metrics
+import clock
+
+logger = logging.getLogger("scheduler")
+
+#"single": every process scans every reminder (fine for one worker)
+#"sharded": reminders are split into NUM_SHARDS by id and each process only scans the
+#shards it holds a lease on - use this when running several uvicorn workers
+SCHEDULER_MODE = os.environ.get("SCHEDULER_MODE", "single")
+NUM_SHARDS = int(os.environ.get("SCHEDULER_SHARDS", 16))
+TICK_SECONDS = 60
+LEASE_SECONDS = 150 #must outlive a tick or live workers would lose their shards
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_stop = threading.Event()
+_thread = None
+
+def is_running():
+    return _thread is not None and _thread.is_alive()
+
+def fire_lag_seconds(reminder, fired_at):
+    #how late the due transition happened relative to the requested time
+    if reminder.due_at is None:
+        return None
+    return fired_at.timestamp() - reminder.due_at
+
+def run_tick(db, now=None, shards=None):
+    #one pass of the due scan; returns how many reminders this call fired.
+    #all times come from the installed clock, so this runs the same on virtual time
+    now = now or clock.now()
+    tick_start = time.perf_counter()
+    due_list = crud.get_due_reminders(db, now.timestamp(), shards=shards, num_shards=NUM_SHARDS)
+    db_seconds = time.perf_counter() - tick_start
+    metrics.set_gauge("scheduler_backlog", len(due_list))
+
+    fired = 0
+    for reminder in due_list:
+        call_start = time.perf_counter()
+        ok = crud.mark_due(db, reminder)
+        db_seconds += time.perf_counter() - call_start
+        if ok:
+            fired += 1
+            dispatcher.submit(event_for(reminder)) #non-blocking; delivery runs on its own threads
+            lag = fire_lag_seconds(reminder, clock.now())
+            if lag is not None:
+                metrics.observe("scheduler_fire_lag_seconds", lag)
+
+    metrics.inc("scheduler_ticks_total")
+    metrics.inc("scheduler_fired_total", fired)
+    metrics.observe("scheduler_processed_per_tick", fired)
+    metrics.observe("scheduler_tick_seconds", time.perf_counter() - tick_start)
+    metrics.observe("scheduler_db_seconds_per_tick", db_seconds)
+    metrics.set_gauge("scheduler_last_tick_at", clock.get_clock().time())
+    return fired
+
+def tick_once(db):
+    #what the scheduler thread does every TICK_SECONDS, lease handling included
+    if SCHEDULER_MODE == "sharded":
+        now_ts = clock.get_clock().time()
+        shard_leases.heartbeat(db, WORKER_ID, now_ts)
+        shards = shard_leases.acquire_shards(db, WORKER_ID, NUM_SHARDS, LEASE_SECONDS, now_ts)
+        metrics.set_gauge("scheduler_owned_shards", len(shards))
+        return run_tick(db, shards=shards) if shards else 0
+    return run_tick(db)
 
 def scheduler_loop():
-    while True:
+    while not _stop.is_set():
         try:
             db = SessionLocal()
-            now = datetime.now().isoformat()
-            due_list = crud.get_due_reminders(db, now)
-            for reminder in due_list:
-                crud.mark_due(db, reminder)
+            try:
+                tick_once(db)
+            finally:
+                db.close()
+            event_log.maybe_compact()
+            dispatcher.maybe_prune()
+        except Exception:
+            metrics.inc("scheduler_errors_total")
+            logger.exception("Scheduler error")
+        #wall clock: waits a minute (or until stopped); simulated clock: advances instantly
+        clock.get_clock().sleep(TICK_SECONDS, _stop)
+
+def simulate(until, tick_seconds=TICK_SECONDS, on_tick=None):
+    """Drive the scheduler through virtual time up to `until` on the installed SimulatedClock.
+
+    Runs each tick back to back with no sleeping, so days of schedule take seconds.
+    `on_tick(now, fired)` is called after every tick. Returns the number of ticks run.
+    """
+    sim = clock.get_clock()
+    if not isinstance(sim, clock.SimulatedClock):
+        raise RuntimeError("simulate() needs clock.set_clock(SimulatedClock(...)) first")
+    ticks = 0
+    while sim.now() < until:
+        sim.advance(tick_seconds)
+        db = SessionLocal()
+        try:
+            fired = tick_once(db)
+        finally:
             db.close()
-        except Exception as e:
-            print("Scheduler error:", e)
-        time.sleep(60)#run every min
+        ticks += 1
+        if on_tick is not None:
+            on_tick(sim.now(), fired)
+    return ticks
 
 def start_scheduler():
-    thread = threading.Thread(target=scheduler_loop, daemon=True)
-    thread.start()
\ No newline at end of file
+    global _thread
+    if _thread is not None:
+        return
+    if SCHEDULER_MODE == "sharded":
+        db = SessionLocal()
+        try:
+            shard_leases.ensure_shards(db, NUM_SHARDS)
+        finally:
+            db.close()
+        #other workers mark reminders due too, so don't serve this process's cache forever
+        if reminder_cache.ttl is None:
+            reminder_cache.ttl = TICK_SECONDS / 4
+    _stop.clear()
+    _thread = threading.Thread(target=scheduler_loop, daemon=True)
+    _thread.start()
+
+def stop_scheduler():
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout=5)
+    _thread = None
+    if SCHEDULER_MODE == "sharded":
+        #hand our shards back now rather than making the others wait out the lease
+        db = SessionLocal()
+        try:
+            shard_leases.release_shards(db, WORKER_ID)
+        finally:
+            db.close()
@@ -2,8 +2,27 @@ from pydantic import BaseModel
 
 class ReminderCreate(BaseModel):
     task: str
-    time_iso: str
+    time_iso: str #iso timestamp or a phrase like "6 pm" / "tomorrow at 9" / "in 20 minutes"
+    repeat: str | None = None
+    timezone: str | None = None #iana name used for naive/spoken times, server local if unset
+
+class ReminderBulkItem(ReminderCreate):
+    client_id: str | None = None #caller's id for this item, echoed back in the result
+
+class ReminderBulkCreate(BaseModel):
+    items: list[ReminderBulkItem]
+
+class ReminderUpdate(BaseModel):
+    task: str | None = None
+    time_iso: str | None = None
     repeat: str | None = None
+    status: str | None = None
+    timezone: str | None = None
+
+class ReminderSnooze(BaseModel):
+    duration: str = "10 minutes" #how long to push the reminder back
+    until: str | None = None #or an explicit time ("6 pm", iso), wins over duration
+    timezone: str | None = None
 
 class ReminderRead(BaseModel):
     id: int
@@ -11,6 +30,56 @@ class ReminderRead(BaseModel):
     time_iso: str
     repeat: str | None
     status: str
+    change_seq: int | None = None
+    due_at: float | None = None
+
+    class Config:
+        orm_mode = True
+
+class ReminderSearchHit(ReminderRead):
+    score: float #relevance, higher is better
+
+class ReminderSearchPage(BaseModel):
+    items: list[ReminderSearchHit]
+    next_offset: int | None #pass back as offset for the next page, None on the last one
+
+class ReminderBulkResult(BaseModel):
+    client_id: str | None
+    reminder: ReminderRead | None
+    error: dict | None
+
+class ReminderBulkResponse(BaseModel):
+    results: list[ReminderBulkResult]
+
+class ReminderChanges(BaseModel):
+    token: int
+    upserts: list[ReminderRead]
+    tombstones: list[int]
+    has_more: bool
+
+class EventRead(BaseModel):
+    id: int
+    event_type: str
+    reminder_id: int | None
+    timestamp: str
+    info: str | None
+
+    class Config:
+        orm_mode = True
+
+class EventPage(BaseModel):
+    items: list[EventRead]
+    next_cursor: int | None
+
+class DeliveryRead(BaseModel):
+    id: str
+    reminder_id: int
+    channel: str
+    status: str
+    attempts: int
+    last_error: str | None
+    created_at: str
+    updated_at: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
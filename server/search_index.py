@@ -0,0 +1,174 @@
+#full-text search over Reminder.task: an fts5 table kept in sync by triggers on sqlite,
+#an inverted index table (reminder_terms) kept in sync by crud on other databases
+import math, re, unicodedata
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import Reminder, ReminderTerm
+
+TOKEN = re.compile(r"(\w+)(\*?)")
+MAX_QUERY_TERMS = 8
+MAX_TERM_LENGTH = 64
+
+FTS_SCHEMA = [
+    #external content: the text lives in reminders, fts only holds the index. user_id is
+    #indexed too so a query only walks the caller's postings (weight 0 in bm25 below)
+    """CREATE VIRTUAL TABLE reminders_fts USING fts5(
+        task, user_id, content='reminders', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reminders_fts_ai AFTER INSERT ON reminders BEGIN
+        INSERT INTO reminders_fts(rowid, task, user_id) VALUES (new.id, new.task, new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reminders_fts_ad AFTER DELETE ON reminders BEGIN
+        INSERT INTO reminders_fts(reminders_fts, rowid, task, user_id) VALUES ('delete', old.id, old.task, old.user_id);
+    END""",
+    #status/due_at writes (the scheduler's) don't touch the index
+    """CREATE TRIGGER IF NOT EXISTS reminders_fts_au AFTER UPDATE OF task, user_id ON reminders BEGIN
+        INSERT INTO reminders_fts(reminders_fts, rowid, task, user_id) VALUES ('delete', old.id, old.task, old.user_id);
+        INSERT INTO reminders_fts(rowid, task, user_id) VALUES (new.id, new.task, new.user_id);
+    END""",
+]
+
+def _fold(term):
+    #lowercase without accents, like fts5's unicode61 remove_diacritics tokenizer
+    term = unicodedata.normalize("NFKD", term.lower())
+    return "".join(c for c in term if not unicodedata.combining(c))[:MAX_TERM_LENGTH]
+
+def tokenize(value):
+    return [_fold(t) for t, _ in TOKEN.findall(value or "")]
+
+def parse_query(q):
+    """[(term, prefix)]: `term*` is a prefix match, and so is the last term (search as you type)."""
+    found = TOKEN.findall(q or "")[:MAX_QUERY_TERMS]
+    return [(_fold(t), bool(star) or i == len(found) - 1) for i, (t, star) in enumerate(found)]
+
+def _fts_phrase(term, prefix):
+    return f'"{term}"*' if prefix else f'"{term}"'
+
+class SearchIndex:
+    """Ranked, prefix-capable search over each user's reminder tasks.
+
+    `setup()` picks the backend once at startup: "fts5" when the database is sqlite with
+    fts5 compiled in, else "terms". Writes go through `index()` / `remove()` from the crud
+    layer, which are no-ops in fts5 mode since the triggers already did the work.
+    """
+
+    def __init__(self):
+        self.mode = None
+
+    def setup(self, engine):
+        if engine.dialect.name == "sqlite" and self._setup_fts(engine):
+            self.mode = "fts5"
+        else:
+            self.mode = "terms"
+            self._backfill_terms(engine)
+        return self.mode
+
+    def _setup_fts(self, engine):
+        with engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reminders_fts'"
+            )).first() is not None
+            try:
+                for statement in (FTS_SCHEMA[1:] if exists else FTS_SCHEMA):
+                    conn.execute(text(statement))
+            except Exception as e:
+                if "fts5" not in str(e):
+                    raise
+                return False #sqlite built without fts5
+            if not exists:
+                conn.execute(text("INSERT INTO reminders_fts(reminders_fts) VALUES ('rebuild')"))
+        return True
+
+    def _backfill_terms(self, engine):
+        #first start on a database that already has reminders
+        with Session(engine) as db:
+            if db.query(ReminderTerm).first() is not None:
+                return
+            for reminder in db.query(Reminder).yield_per(1000):
+                self._index_terms(db, reminder)
+            db.commit()
+
+    #---- writes (inside the caller's transaction) ----
+
+    def index(self, db, reminder):
+        if self.mode == "terms":
+            db.query(ReminderTerm).filter(ReminderTerm.reminder_id == reminder.id).delete(synchronize_session=False)
+            self._index_terms(db, reminder)
+
+    def _index_terms(self, db, reminder):
+        counts = {}
+        for term in tokenize(reminder.task):
+            counts[term] = counts.get(term, 0) + 1
+        db.add_all(ReminderTerm(user_id=reminder.user_id, term=term, reminder_id=reminder.id, tf=tf)
+                   for term, tf in counts.items())
+
+    def remove(self, db, reminder_id):
+        if self.mode == "terms":
+            db.query(ReminderTerm).filter(ReminderTerm.reminder_id == reminder_id).delete(synchronize_session=False)
+
+    #---- queries ----
+
+    def search(self, db, user_id, q, limit, offset=0, status=None):
+        """[(reminder_id, score)] best first, at most limit + 1 so callers can tell there's more."""
+        terms = parse_query(q)
+        if not terms:
+            return []
+        if self.mode == "fts5":
+            return self._search_fts(db, user_id, terms, limit, offset, status)
+        return self._search_terms(db, user_id, terms, limit, offset, status)
+
+    def _search_fts(self, db, user_id, terms, limit, offset, status):
+        match = "task : (" + " AND ".join(_fts_phrase(t, p) for t, p in terms) + ")"
+        user_terms = tokenize(user_id)
+        if user_terms:
+            match = f'user_id : "{" ".join(user_terms)}" AND ' + match
+        sql = (
+            "SELECT r.id, bm25(reminders_fts, 1.0, 0.0) AS rank FROM reminders_fts "
+            "JOIN reminders r ON r.id = reminders_fts.rowid "
+            "WHERE reminders_fts MATCH :match AND r.user_id = :user_id"
+            + (" AND r.status = :status" if status is not None else "")
+            + " ORDER BY rank, r.id LIMIT :limit OFFSET :offset"
+        )
+        params = {"match": match, "user_id": user_id, "limit": limit + 1, "offset": offset}
+        if status is not None:
+            params["status"] = status.value
+        #bm25 is lower-is-better; flip it so scores read naturally
+        return [(row.id, -row.rank) for row in db.execute(text(sql), params)]
+
+    def _search_terms(self, db, user_id, terms, limit, offset, status):
+        #every term must match; score is tf * idf summed over terms, idf within the user's reminders
+        total = db.query(Reminder).filter(Reminder.user_id == user_id).count() or 1
+        scores = None
+        for term, prefix in terms:
+            query = db.query(ReminderTerm.reminder_id, ReminderTerm.term, ReminderTerm.tf).filter(
+                ReminderTerm.user_id == user_id
+            )
+            if prefix:
+                #a range instead of LIKE so it stays on the (user_id, term) index
+                query = query.filter(ReminderTerm.term >= term, ReminderTerm.term < term + "\uffff")
+            else:
+                query = query.filter(ReminderTerm.term == term)
+            postings = {}
+            for reminder_id, found, tf in query:
+                #a whole-word hit counts more than a longer word that merely starts with the term
+                postings[reminder_id] = postings.get(reminder_id, 0) + (tf if found == term else tf / 2)
+            if not postings:
+                return []
+            idf = math.log(1 + total / len(postings))
+            if scores is None:
+                scores = {rid: tf * idf for rid, tf in postings.items()}
+            else:
+                scores = {rid: score + postings[rid] * idf for rid, score in scores.items() if rid in postings}
+        if status is not None:
+            keep = set()
+            ids = list(scores)
+            for i in range(0, len(ids), 500):
+                keep.update(rid for rid, in db.query(Reminder.id).filter(
+                    Reminder.id.in_(ids[i:i + 500]), Reminder.status == status
+                ))
+            scores = {rid: score for rid, score in scores.items() if rid in keep}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[offset:offset + limit + 1]
+
+search_index = SearchIndex()
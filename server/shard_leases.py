@@ -0,0 +1,76 @@
+#db-backed shard leases so several scheduler processes can split the due scan between them
+import math
+from sqlalchemy import or_
+from models import SchedulerLease, SchedulerWorker
+
+def shard_of(reminder_id, num_shards):
+    return reminder_id % num_shards
+
+def ensure_shards(db, num_shards):
+    existing = {shard for (shard,) in db.query(SchedulerLease.shard).all()}
+    for shard in range(num_shards):
+        if shard not in existing:
+            db.add(SchedulerLease(shard=shard, owner=None, expires_at=0))
+    db.commit()
+
+def heartbeat(db, worker_id, now):
+    db.merge(SchedulerWorker(worker_id=worker_id, heartbeat_at=now))
+    db.commit()
+
+def acquire_shards(db, worker_id, num_shards, lease_seconds, now):
+    """Renew this worker's leases, rebalance to a fair share and return the shards it owns.
+
+    Taking a shard is a conditional UPDATE (only if free or expired), so two workers racing
+    for the same shard can't both win. A worker that dies simply stops renewing; once its
+    leases expire the survivors pick the shards up on their next tick.
+    """
+    expires = now + lease_seconds
+
+    db.query(SchedulerWorker).filter(
+        SchedulerWorker.heartbeat_at < now - lease_seconds
+    ).delete(synchronize_session=False)
+    live_workers = max(db.query(SchedulerWorker).count(), 1)
+    fair_share = math.ceil(num_shards / live_workers)
+
+    owned = [shard for (shard,) in db.query(SchedulerLease.shard).filter(
+        SchedulerLease.owner == worker_id,
+        SchedulerLease.expires_at >= now
+    ).order_by(SchedulerLease.shard).all()]
+
+    #hand back anything above our share so a newly started worker gets some
+    surplus, owned = owned[fair_share:], owned[:fair_share]
+    if surplus:
+        db.query(SchedulerLease).filter(
+            SchedulerLease.shard.in_(surplus),
+            SchedulerLease.owner == worker_id
+        ).update({SchedulerLease.owner: None, SchedulerLease.expires_at: 0}, synchronize_session=False)
+
+    if owned:
+        db.query(SchedulerLease).filter(
+            SchedulerLease.shard.in_(owned),
+            SchedulerLease.owner == worker_id
+        ).update({SchedulerLease.expires_at: expires}, synchronize_session=False)
+
+    if len(owned) < fair_share:
+        free = [shard for (shard,) in db.query(SchedulerLease.shard).filter(
+            or_(SchedulerLease.owner.is_(None), SchedulerLease.expires_at < now)
+        ).order_by(SchedulerLease.shard).all()]
+        for shard in free:
+            if len(owned) >= fair_share:
+                break
+            taken = db.query(SchedulerLease).filter(
+                SchedulerLease.shard == shard,
+                or_(SchedulerLease.owner.is_(None), SchedulerLease.expires_at < now)
+            ).update({SchedulerLease.owner: worker_id, SchedulerLease.expires_at: expires}, synchronize_session=False)
+            if taken:
+                owned.append(shard)
+
+    db.commit()
+    return sorted(owned)
+
+def release_shards(db, worker_id):
+    db.query(SchedulerLease).filter(SchedulerLease.owner == worker_id).update(
+        {SchedulerLease.owner: None, SchedulerLease.expires_at: 0}, synchronize_session=False
+    )
+    db.query(SchedulerWorker).filter(SchedulerWorker.worker_id == worker_id).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,179 @@
+"""
+Simulated-time scheduler replay.
+
+Seeds a throwaway SQLite database with a reminder set, installs a SimulatedClock and
+drives the real scheduler (scheduler.simulate -> tick_once -> run_tick) through days of
+virtual time with no sleeping. Reports, per simulated hour, how many reminders fired and
+what the scheduler cost in CPU and DB time:
+
+    python simulate.py --reminders 10000 --days 7 --output sim_results.json
+
+Repeating reminders are re-armed the way a client does it: after every tick each one
+that fired is acknowledged through crud.transition, which schedules its next occurrence.
+That client-side time is reported separately (ack_seconds), not as scheduler cost.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import clock
+import crud
+import database
+import scheduler
+from cache import reminder_cache
+from event_log import event_writer
+from metrics import metrics
+from models import Base, Reminder, ChangeCounter
+from reminder_status import ReminderStatus
+
+START = datetime(2030, 1, 7, 0, 0, 0)  # a Monday, so every first occurrence is a weekday
+REPEAT_MIX = [(None, 0.50), ("daily", 0.30), ("weekdays", 0.15), ("weekly", 0.05)]
+SEED_CHUNK = 10_000
+
+
+def seed(n, days, rng):
+    kinds = [k for k, _ in REPEAT_MIX]
+    weights = [w for _, w in REPEAT_MIX]
+    stamp = START.isoformat()
+    rows = []
+    seq = 0
+    db = database.SessionLocal()
+    try:
+        for i in range(n):
+            repeat = rng.choices(kinds, weights)[0]
+            first = START + timedelta(
+                days=rng.randrange(days) if repeat is None else 0,
+                minutes=rng.randrange(24 * 60),
+            )
+            seq += 1
+            rows.append({
+                "task": f"simulated reminder {i}",
+                "time_iso": first.isoformat(),
+                "due_at": first.timestamp(),
+                "repeat": repeat,
+                "status": "scheduled",
+                "created_at": stamp,
+                "updated_at": stamp,
+                "change_seq": seq,
+            })
+            if len(rows) >= SEED_CHUNK:
+                db.execute(insert(Reminder), rows)
+                rows = []
+        if rows:
+            db.execute(insert(Reminder), rows)
+        db.query(ChangeCounter).filter(ChangeCounter.id == 1).update({ChangeCounter.value: seq})
+        db.commit()
+    finally:
+        db.close()
+    reminder_cache.invalidate()
+    return seq
+
+
+def ack_repeating():
+    """Acknowledge every due repeating reminder, re-arming it; returns how many."""
+    db = database.SessionLocal()
+    try:
+        ids = [rid for rid, in db.query(Reminder.id).filter(
+            Reminder.status == ReminderStatus.DUE, Reminder.repeat.isnot(None)
+        )]
+        for rid in ids:
+            crud.transition(db, rid, ReminderStatus.ACKNOWLEDGED)
+    finally:
+        db.close()
+    return len(ids)
+
+
+def db_seconds_so_far():
+    summary = metrics.snapshot()["summaries"].get("scheduler_db_seconds_per_tick")
+    return summary["sum"] if summary else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reminders", type=int, default=10_000, help="reminders to seed")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--tick-seconds", type=int, default=scheduler.TICK_SECONDS)
+    parser.add_argument("--seed", type=int, default=545)
+    parser.add_argument("--output", default="sim_results.json")
+    args = parser.parse_args(argv)
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="reminder_sim_"), "sim.db")
+    engine = database.configure_database(f"sqlite:///{db_path}")
+    database.upgrade_schema(Base.metadata, bind=engine)
+    db = database.SessionLocal()
+    try:
+        crud.init_change_counter(db)
+    finally:
+        db.close()
+
+    rows = seed(args.reminders, args.days, random.Random(args.seed))
+    print(f"seeded {rows} reminders")
+
+    previous = clock.set_clock(clock.SimulatedClock(START))
+    metrics.reset()
+    hours = []
+    current = {"fired": 0, "ticks": 0, "rearmed": 0, "ack": 0.0}
+    marks = {"cpu": time.process_time(), "wall": time.perf_counter(), "db": 0.0}
+    next_hour = START + timedelta(hours=1)
+
+    def on_tick(now, fired):
+        nonlocal next_hour
+        current["fired"] += fired
+        current["ticks"] += 1
+        if fired:
+            ack_start = time.process_time()
+            current["rearmed"] += ack_repeating()
+            current["ack"] += time.process_time() - ack_start
+        if now >= next_hour:
+            cpu, wall, db_s = time.process_time(), time.perf_counter(), db_seconds_so_far()
+            hours.append({
+                "hour": next_hour.isoformat(),
+                "ticks": current["ticks"],
+                "fired": current["fired"],
+                "rearmed": current["rearmed"],
+                "cpu_seconds": round(cpu - marks["cpu"] - current["ack"], 6),
+                "ack_seconds": round(current["ack"], 6),
+                "db_seconds": round(db_s - marks["db"], 6),
+                "wall_seconds": round(wall - marks["wall"], 6),
+            })
+            marks.update(cpu=cpu, wall=wall, db=db_s)
+            current.update(fired=0, ticks=0, rearmed=0, ack=0.0)
+            next_hour += timedelta(hours=1)
+
+    wall_start = time.perf_counter()
+    try:
+        ticks = scheduler.simulate(START + timedelta(days=args.days), tick_seconds=args.tick_seconds, on_tick=on_tick)
+    finally:
+        clock.set_clock(previous)
+        event_writer.flush()
+    wall = time.perf_counter() - wall_start
+
+    fired = sum(h["fired"] for h in hours)
+    cpu = sum(h["cpu_seconds"] for h in hours)
+    db_time = sum(h["db_seconds"] for h in hours)
+    summary = {
+        "reminders": args.reminders,
+        "rearmed": sum(h["rearmed"] for h in hours),
+        "simulated_hours": len(hours),
+        "ticks": ticks,
+        "fired": fired,
+        "wall_seconds": round(wall, 3),
+        "cpu_per_sim_hour_ms": round(cpu / max(len(hours), 1) * 1000, 3),
+        "db_per_sim_hour_ms": round(db_time / max(len(hours), 1) * 1000, 3),
+        "peak_hour_cpu_ms": round(max((h["cpu_seconds"] for h in hours), default=0) * 1000, 3),
+    }
+    print(json.dumps(summary, indent=2))
+    with open(args.output, "w") as f:
+        json.dump({"summary": summary, "args": vars(args), "hours": hours}, f, indent=2)
+    print(f"wrote per-hour results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Tuple
@@ -9,6 +9,8 @@ import os
 import tempfile
 import whisper
 
+from tenancy import TenantRateLimiter, current_user
+
 # --------------------------------------------------
 # Config
 # --------------------------------------------------
@@ -16,6 +18,11 @@ import whisper
 MIN_AUDIO_BYTES = 8000        # minimum size (~0.08s for typical uncompressed wav)
 MAX_AUDIO_SECONDS = 60        # maximum allowed audio length (1 minute)
 
+# Per-user budget (X-User-Id): transcription is by far the most expensive call,
+# so one chatty client mustn't be able to queue up everybody else's
+STT_RATE_PER_USER = float(os.environ.get("STT_RATE_PER_USER", 0.5))   # requests/second
+STT_BURST_PER_USER = int(os.environ.get("STT_BURST_PER_USER", 5))
+
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -56,6 +63,9 @@ app.add_middleware(
 )
 
 
+stt_limiter = TenantRateLimiter("stt", STT_RATE_PER_USER, STT_BURST_PER_USER)
+
+
 # --------------------------------------------------
 # Core STT logic using local Whisper (no API, free)
 # --------------------------------------------------
@@ -104,7 +114,7 @@ def health_check():
 
 
 @app.post("/stt", response_model=STTResponse)
-async def stt(audio: UploadFile = File(...)):
+async def stt(audio: UploadFile = File(...), user: str = Depends(current_user)):
     """
     Accepts an uploaded audio file and returns a transcription.
 
@@ -119,10 +129,14 @@ async def stt(audio: UploadFile = File(...)):
         400 { "error": "INVALID_MEDIA_TYPE" }
         400 { "error": "AUDIO_TOO_SHORT" }
         400 { "error": "AUDIO_TOO_LONG" }
+        429 { "error": "RATE_LIMITED", "retry_after": seconds }
         500 { "error": "STT_FAILED" }
     """
-    logger.info("Received /stt request. Filename=%s, content_type=%s",
-                audio.filename, audio.content_type)
+    logger.info("Received /stt request. User=%s, filename=%s, content_type=%s",
+                user, audio.filename, audio.content_type)
+
+    # Checked before reading the upload so a throttled client costs next to nothing
+    stt_limiter.check(user)
 
     # Basic content-type check (accept any audio/*)
     if not audio.content_type or not audio.content_type.startswith("audio/"):
@@ -0,0 +1,77 @@
+#per-user scoping: which user a request acts for (X-User-Id) and per-user request budgets.
+#the header is trusted as-is, so in a shared deployment put this behind something that
+#authenticates the caller and sets it
+import os, re, threading, time
+from collections import OrderedDict
+from fastapi import Depends, Header, HTTPException
+from metrics import metrics
+
+DEFAULT_USER = "default" #requests without X-User-Id, and rows written before tenancy existed
+REQUIRE_USER_ID = os.environ.get("REQUIRE_USER_ID") == "1"
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_.@:-]{1,64}")
+
+API_RATE = float(os.environ.get("API_RATE_PER_USER", 20))    #requests/second per user, 0 = unlimited
+API_BURST = int(os.environ.get("API_BURST_PER_USER", 60))
+MAX_TRACKED_USERS = 10_000 #idle buckets past this are dropped (they'd be full anyway)
+
+def current_user(x_user_id: str | None = Header(None)):
+    if x_user_id is None:
+        if REQUIRE_USER_ID:
+            raise HTTPException(status_code=401, detail={"error": "USER_ID_REQUIRED"})
+        return DEFAULT_USER
+    if not USER_ID_PATTERN.fullmatch(x_user_id):
+        raise HTTPException(status_code=400, detail={"error": "INVALID_USER_ID"})
+    return x_user_id
+
+class TenantRateLimiter:
+    """Token bucket per user, so one busy user can't starve the rest.
+
+    Buckets live in an OrderedDict in last-used order; the least recently used ones are
+    dropped past `max_users`, which only forgets users that have been idle long enough
+    to have refilled. Per-process, like the caches. A rate of None (or 0) turns it off.
+    """
+
+    def __init__(self, name, rate, burst, max_users=MAX_TRACKED_USERS):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict() #user -> (tokens, updated)
+
+    def acquire(self, user_id, n=1):
+        """Take n tokens; returns 0 on success, else the seconds until they'd be available."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.pop(user_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= n:
+                tokens -= n
+            else:
+                wait = (n - tokens) / self.rate
+            self._buckets[user_id] = (tokens, now)
+            while len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        if wait:
+            metrics.inc(f"{self.name}_rate_limited_total")
+        return wait
+
+    def check(self, user_id):
+        wait = self.acquire(user_id)
+        if wait:
+            raise HTTPException(status_code=429, detail={"error": "RATE_LIMITED", "retry_after": round(wait, 3)},
+                                headers={"Retry-After": str(max(1, round(wait)))})
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+api_limiter = TenantRateLimiter("api", API_RATE, API_BURST)
+
+def rate_limited_user(user=Depends(current_user)):
+    #router dependency: resolves the user once per request (fastapi caches it) and charges them
+    api_limiter.check(user)
+    return user
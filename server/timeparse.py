@@ -0,0 +1,179 @@
+#server-side time normalization: ISO strings and spoken phrases -> one UTC timestamp at write time
+import os, re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import clock
+
+#None = the server's local zone; clients can override per request with `timezone`
+DEFAULT_TIMEZONE = os.environ.get("REMINDER_TIMEZONE") or None
+DEFAULT_HOUR = 9 #"tomorrow" / "monday" with no time of day
+DEFAULT_EVENING_HOUR = 20 #"tonight" with no time of day, and "today" once DEFAULT_HOUR has passed
+
+class TimeParseError(ValueError):
+    pass
+
+_WORD_NUMBERS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "fifteen": 15, "twenty": 20, "thirty": 30, "forty": 40, "forty five": 45, "fifty": 50,
+}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 604800}
+
+#compiled once at import; longest number words first so "forty five" beats "forty"
+_NUMBER_WORDS = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, _WORD_NUMBERS), key=len, reverse=True)) + r")\b"
+)
+_MERIDIEM_DOTS = re.compile(r"\b([ap])\.?\s?m\.?(?=\s|$)")
+_RELATIVE = re.compile(
+    r"^in\s+(?:(?P<half>half (?:an?|1))|(?P<n>\d+(?:\.\d+)?)(?P<and_half> and (?:a|1) half)?)\s*"
+    r"(?P<unit>second|sec|minute|min|hour|hr|day|week)s?$"
+)
+_CLOCK = re.compile(
+    r"^(?:(?P<day>today|tonight|tomorrow|day after tomorrow)|(?:next\s+|on\s+)?(?P<weekday>"
+    + "|".join(_WEEKDAYS) + r"))?"
+    r"\s*(?:at\s+)?"
+    r"(?:(?P<named>noon|midnight)|(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?)?"
+    r"\s*(?P<part>in the morning|in the afternoon|in the evening|at night)?$"
+)
+_UNIT_ALIASES = {"sec": "second", "min": "minute", "hr": "hour"}
+
+def resolve_timezone(name=None):
+    name = name or DEFAULT_TIMEZONE
+    if not name:
+        return None #local
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise TimeParseError(f"unknown timezone {name!r}")
+
+def _normalize(text):
+    t = text.lower().strip().rstrip(".")
+    t = _MERIDIEM_DOTS.sub(lambda m: f" {m.group(1)}m", t)
+    t = _NUMBER_WORDS.sub(lambda m: str(_WORD_NUMBERS[m.group(1)]), t)
+    return re.sub(r"\s+", " ", t).strip()
+
+@lru_cache(maxsize=4096)
+def _compile_phrase(text):
+    """Turn the phrase into a now-independent spec; cached since clients repeat phrases a lot."""
+    #ISO first - it's what the UI and scripts send
+    try:
+        return ("absolute", datetime.fromisoformat(text.strip().replace(" ", "T", 1)))
+    except ValueError:
+        pass
+
+    t = _normalize(text)
+    if not t:
+        raise TimeParseError("empty time")
+
+    m = _RELATIVE.match(t)
+    if m:
+        unit = _UNIT_ALIASES.get(m.group("unit"), m.group("unit"))
+        amount = 0.5 if m.group("half") else float(m.group("n")) + (0.5 if m.group("and_half") else 0)
+        return ("relative", amount * _UNIT_SECONDS[unit])
+
+    m = _CLOCK.match(t)
+    if m and any(m.group(g) for g in ("day", "weekday", "named", "hour")):
+        hour = m.group("hour")
+        minute = int(m.group("minute") or 0)
+        meridiem = m.group("meridiem")
+        part = m.group("part")
+        if m.group("named") == "noon":
+            hour, meridiem = 12, "pm"
+        elif m.group("named") == "midnight":
+            hour, meridiem = 12, "am"
+        if m.group("day") == "tonight" or part in ("in the afternoon", "in the evening", "at night"):
+            meridiem = meridiem or "pm"
+        elif part == "in the morning":
+            meridiem = meridiem or "am"
+        hour = int(hour) if hour is not None else None
+        if hour is not None and (hour > 23 or minute > 59 or (meridiem and not 1 <= hour <= 12)):
+            raise TimeParseError(f"invalid time of day in {text!r}")
+        return ("clock", m.group("day"), m.group("weekday"), hour, minute, meridiem)
+
+    raise TimeParseError(f"could not understand time {text!r}")
+
+def _to_24h(hour, meridiem):
+    if meridiem == "am":
+        return 0 if hour == 12 else hour
+    if meridiem == "pm":
+        return hour if hour == 12 else hour + 12
+    return hour
+
+def _candidate_hours(hour, meridiem):
+    #"7" could be 07:00 or 19:00; try them in that order
+    if meridiem is None and hour <= 12:
+        return [hour % 24] + ([hour + 12] if hour < 12 else [])
+    return [_to_24h(hour, meridiem)]
+
+def _later_today(now, day, hour, minute, meridiem):
+    #"today" / "tonight": the first matching time still ahead, never one that has passed
+    if hour is None:
+        candidates = [DEFAULT_EVENING_HOUR] if day == "tonight" else [DEFAULT_HOUR, DEFAULT_EVENING_HOUR]
+    else:
+        candidates = _candidate_hours(hour, meridiem)
+    today = now.replace(second=0, microsecond=0)
+    for h in candidates:
+        when = today.replace(hour=h, minute=minute)
+        if h == 0:
+            when += timedelta(days=1) #"tonight at midnight" is the one ending today
+        if when > now:
+            return when
+    raise TimeParseError(f"{day} at {today.replace(hour=candidates[-1], minute=minute):%H:%M} has already passed")
+
+def _resolve(spec, tz, now):
+    kind = spec[0]
+    if kind == "absolute":
+        when = spec[1]
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=tz) if tz else when.astimezone()
+        return when
+    if kind == "relative":
+        return now + timedelta(seconds=spec[1])
+
+    _, day, weekday, hour, minute, meridiem = spec
+    if day or weekday:
+        if day == "tomorrow":
+            offset = 1
+        elif day == "day after tomorrow":
+            offset = 2
+        elif weekday:
+            offset = (_WEEKDAYS.index(weekday) - now.weekday()) % 7 or 7
+        else:
+            return _later_today(now, day, hour, minute, meridiem)
+        base = (now + timedelta(days=offset)).replace(second=0, microsecond=0)
+        if hour is None:
+            return base.replace(hour=DEFAULT_HOUR, minute=0)
+        if meridiem is None and 1 <= hour <= 6:
+            meridiem = "pm" #"tomorrow at 3" means the afternoon
+        return base.replace(hour=_to_24h(hour, meridiem), minute=minute)
+
+    #bare time of day: the next time the clock shows it (tomorrow if already passed today)
+    today = now.replace(second=0, microsecond=0)
+    candidates = _candidate_hours(hour, meridiem)
+    for h in candidates:
+        when = today.replace(hour=h, minute=minute)
+        if when > now:
+            return when
+    return today.replace(hour=candidates[0], minute=minute) + timedelta(days=1)
+
+def parse_time(text, tz_name=None, now=None):
+    """Parse an ISO timestamp or spoken phrase ("6 pm", "tomorrow at 9", "in 20 minutes").
+
+    Phrases are resolved relative to `now` (the installed clock by default) in the given
+    timezone. Returns an aware datetime in UTC; raises TimeParseError if unparseable, or
+    for a "today" / "tonight" time that has already passed.
+    """
+    if not text or not text.strip():
+        raise TimeParseError("empty time")
+    tz = resolve_timezone(tz_name)
+    now = now or clock.now()
+    now = now.astimezone(tz) #naive = server local time, like the clock returns
+    return _resolve(_compile_phrase(text), tz, now).astimezone(timezone.utc)
+
+def normalize_time(text, tz_name=None, now=None):
+    #(canonical iso string, epoch seconds) as stored on Reminder
+    when = parse_time(text, tz_name, now)
+    return when.isoformat(), when.timestamp()
@@ -344,28 +344,37 @@ Features:
     "memo remind me to buy milk at 6 pm"
     "memo create meeting at 2025-01-01T09:00"
     "memo list reminders"
-- Call reminder API to create/list reminders
-- Poll reminders and announce those with status == "due"
+    "memo list reminders about mom"
+- Offline-first reminder store: commands work against a local SQLite
+  replica and are synced with the reminder API in the background
+- Announce reminders as they become due (and acknowledge them)
 - Spoken feedback and desktop notifications
 
 Requires (in requirements.txt):
     requests
+    numpy
     sounddevice
-    wavio
     pyttsx3
     plyer
+    soundfile (optional, for FLAC uploads)
 """
 
+import asyncio
 import os
+import re
 import threading
 import time
-import uuid
-from typing import Optional, Set
+from typing import List, Optional
 
 import requests
 import sounddevice as sd
-import wavio
-import pyttsx3
+
+from audio_capture import AudioClip, MicrophoneSource, capture_utterance, encode_audio, iter_utterances
+from audio_output import PRIORITY_CONFIRM, PRIORITY_INFO, AudioOutput
+from command_grammar import parse as parse_grammar
+from http_client import ServiceClient
+from offline_store import OfflineStore
+from wake_word import KeywordSpotter
 
 # macOS: plyer requires pyobjus (not available by default)
 # So we import safely: if it fails, notifications will be disabled
@@ -387,19 +396,52 @@ REMINDER_API = "http://127.0.0.1:8000"
 # STT service from Person 3 (stt_service.py)
 STT_API = "http://127.0.0.1:8001/stt"
 
+# Whose reminders these are: sent as X-User-Id to both services, which scope
+# reminders and rate limits by it
+USER_ID = os.environ.get("REMINDER_USER_ID", "default")
+
 # Toggle between mock and real STT
 # Set to True to test without the STT service running
 USE_MOCK_STT = False
 
+# Per-endpoint (connect, read) timeouts in seconds
+HTTP_TIMEOUTS = {
+    "stt": (3.05, 30),        # transcription can take a while
+    "reminders": (3.05, 5),
+    "poll": (3.05, 5),
+    "health": (1, 2),
+}
+
 # Audio settings
 SAMPLE_RATE = 16_000
 CHANNELS = 1
+UPLOAD_FORMAT = "wav"  # "flac" halves upload size if soundfile is installed
+
+# "vad": listen until you stop talking (voice activity detection)
+# "fixed": always record FIXED_RECORD_SECONDS
+CAPTURE_MODE = "vad"
+FIXED_RECORD_SECONDS = 4.0
+LISTEN_TIMEOUT = 8.0  # give up if nothing is said within this many seconds
 
 # Safe word required to activate commands
 SAFE_WORD = "memo"
 
-# Keep track of which "due" reminders have already been announced
-announced_due_ids: Set[int] = set()
+# Local wake word templates (record with `python wake_word.py record`).
+# When present, audio is only sent to STT if it starts with SAFE_WORD;
+# without them every utterance is transcribed and checked afterwards.
+WAKE_WORD_TEMPLATES = "wake_word_templates.npz"
+
+# Local replica + outbox of reminder changes (see offline_store.py)
+OFFLINE_DB = "offline_reminders.db"
+
+# Most recently announced reminder: what "snooze" / "done" without a number refer to
+last_due_id: Optional[int] = None
+
+# Default for "snooze" without a duration
+SNOOZE_DEFAULT = "10 minutes"
+
+# Results read out for "list reminders about ..."
+SEARCH_LIMIT = 10
 
 
 # ----------------------------------------
@@ -409,8 +451,8 @@ announced_due_ids: Set[int] = set()
 class STTClient:
     """Abstract base class for STT clients."""
 
-    def transcribe(self, filepath: str) -> str:
-        """Transcribe audio file and return text."""
+    def transcribe(self, clip: AudioClip) -> str:
+        """Transcribe an in-memory recording and return text."""
         raise NotImplementedError("Subclasses must implement transcribe()")
 
 
@@ -420,9 +462,9 @@ class MockSTTClient(STTClient):
     def __init__(self, fixed_response: str = "memo remind me to call mom at 6 pm"):
         self.fixed_response = fixed_response
 
-    def transcribe(self, filepath: str) -> str:
+    def transcribe(self, clip: AudioClip) -> str:
         """Always return the same fixed text."""
-        print(f"[MOCK STT] Pretending to transcribe {filepath}")
+        print(f"[MOCK STT] Pretending to transcribe {len(clip.data)} bytes of {clip.content_type}")
         print(f"[MOCK STT] Returning: {self.fixed_response!r}")
         return self.fixed_response
 
@@ -430,15 +472,20 @@ class MockSTTClient(STTClient):
 class ApiSTTClient(STTClient):
     """Real STT client that calls the /stt API service."""
 
-    def __init__(self, stt_url: str):
+    def __init__(self, stt_url: str, http: Optional[ServiceClient] = None):
         self.stt_url = stt_url
+        self.http = http or stt_http
 
-    def transcribe(self, filepath: str) -> str:
-        """Send audio file to STT service and return transcribed text."""
-        print(f"[API STT] Sending {filepath} → {self.stt_url}")
+    def transcribe(self, clip: AudioClip) -> str:
+        """Upload the in-memory recording to the STT service and return transcribed text."""
+        print(f"[API STT] Sending {len(clip.data)} bytes → {self.stt_url}")
         try:
-            with open(filepath, "rb") as f:
-                response = requests.post(self.stt_url, files={"audio": f})
+            response = self.http.post(
+                self.stt_url,
+                endpoint="stt",
+                retry=True,  # transcription has no side effects
+                files={"audio": (clip.filename, clip.data, clip.content_type)},
+            )
 
             if response.status_code != 200:
                 print(f"[API STT ERROR] {response.status_code} {response.text}")
@@ -460,80 +507,208 @@ class ApiSTTClient(STTClient):
 
 
 # ----------------------------------------
-# TTS (spoken feedback)
+# Async STT clients (for voice_runtime.py)
 # ----------------------------------------
 
-_tts_engine = pyttsx3.init()
+class AsyncSTTClient:
+    """Async counterpart of STTClient, used by the asyncio runtime."""
+
+    async def transcribe(self, clip: AudioClip) -> str:
+        """Transcribe an in-memory recording and return text."""
+        raise NotImplementedError("Subclasses must implement transcribe()")
+
+
+class AsyncMockSTTClient(AsyncSTTClient):
+    """Mock async STT client; `latency` simulates a slow service without blocking the loop."""
+
+    def __init__(self, fixed_response: str = "memo remind me to call mom at 6 pm", latency: float = 0.0):
+        self.fixed_response = fixed_response
+        self.latency = latency
+
+    async def transcribe(self, clip: AudioClip) -> str:
+        print(f"[MOCK STT] Pretending to transcribe {len(clip.data)} bytes of {clip.content_type}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        print(f"[MOCK STT] Returning: {self.fixed_response!r}")
+        return self.fixed_response
+
+
+class AsyncApiSTTClient(AsyncSTTClient):
+    """
+    Runs a blocking STTClient (normally ApiSTTClient) on a worker thread,
+    so the upload and its retries keep the pooled session but never
+    block the event loop.
+    """
+
+    def __init__(self, client: STTClient):
+        self.client = client
+
+    async def transcribe(self, clip: AudioClip) -> str:
+        return await asyncio.to_thread(self.client.transcribe, clip)
+
+
+# ----------------------------------------
+# Shared HTTP clients (pooled keep-alive sessions)
+# ----------------------------------------
+
+reminder_http = ServiceClient(REMINDER_API, timeouts=HTTP_TIMEOUTS, headers={"X-User-Id": USER_ID})
+stt_http = ServiceClient(timeouts=HTTP_TIMEOUTS, headers={"X-User-Id": USER_ID})
+
+
+# ----------------------------------------
+# Local reminder store (offline-first)
+# ----------------------------------------
+
+def reminder_transport(method: str, path: str, json=None, params=None, headers=None):
+    """
+    OfflineStore transport over the pooled reminder session.
+
+    Requests carrying an Idempotency-Key are retried like GETs: the server
+    replays the first response instead of creating a duplicate.
+    """
+    retry = True if headers and "Idempotency-Key" in headers else None
+    response = reminder_http.request(
+        method, path, endpoint="reminders", retry=retry, json=json, params=params, headers=headers
+    )
+    try:
+        return response.status_code, response.json() if response.content else None
+    except ValueError:
+        return response.status_code, response.text
+
+
+def _store_rejected(op: str, row: Optional[dict], status: int, body) -> None:
+    task = (row or {}).get("task", "")
+    speak(f"The server refused to save the reminder to {task}." if op == "create"
+          else f"The server refused a change to the reminder to {task}.")
 
 
-def speak(text: str) -> None:
-    """Speak text out loud using offline TTS."""
-    print(f"[TTS] {text}")
-    _tts_engine.say(text)
-    _tts_engine.runAndWait()
+store = OfflineStore(OFFLINE_DB, on_reject=_store_rejected)
+
+# Set after every local write so the sync thread pushes it right away
+sync_wakeup = threading.Event()
 
 
 # ----------------------------------------
 # Desktop notifications
 # ----------------------------------------
 
-def notify(title: str, msg: str):
-    """Attempt desktop notification; fallback gracefully on macOS."""
-    print(f"[NOTIFY] {title}: {msg}")
+def _desktop_notify(title: str, msg: str) -> None:
+    notification.notify(
+        title=title,
+        message=msg,
+        timeout=5
+    )
+
+
+# ----------------------------------------
+# TTS + notifications (background output worker)
+# ----------------------------------------
 
+# One worker thread owns the pyttsx3 engine; callers never block on speech.
+audio_out = AudioOutput(notifier=_desktop_notify if PLYER_AVAILABLE else None)
+
+
+def speak(text: str, priority: int = PRIORITY_CONFIRM) -> None:
+    """Queue text to be spoken out loud (offline TTS); returns immediately."""
+    audio_out.say(text, priority=priority)
+
+
+def notify(title: str, msg: str):
+    """Queue a desktop notification (console only if plyer isn't available)."""
     if not PLYER_AVAILABLE:
         print("[NOTIFY WARNING] Notifications disabled on this system.")
-        return
-
-    try:
-        notification.notify(
-            title=title,
-            message=msg,
-            timeout=5
-        )
-    except Exception:
-        print("[NOTIFY WARNING] Failed to send desktop notification.")
+    audio_out.notify(title, msg)
 
 
 # ----------------------------------------
 # Audio recording
 # ----------------------------------------
 
-def record_audio(duration: float = 4.0) -> str:
+def heard_wake_word(audio) -> bool:
+    """
+    Local wake word gate: True if `audio` starts with SAFE_WORD.
+
+    Always True when no templates are enrolled (the STT text is then
+    checked by check_safe_word instead).
     """
-    Record microphone input for `duration` seconds and
-    save it as a mono 16 kHz WAV file.
+    if wake_spotter is None:
+        return True
+    if wake_spotter.detect(audio):
+        return True
+    print(f"[WAKE] '{SAFE_WORD}' not heard; not sending to STT.")
+    return False
+
+
+def record_audio(duration: float = 4.0) -> Optional[AudioClip]:
+    """
+    Record microphone input for `duration` seconds and encode it
+    in memory as mono 16 kHz audio (WAV, or FLAC if configured).
 
     Returns:
-        Path to the saved WAV file.
+        AudioClip with the encoded bytes (nothing is written to disk),
+        or None if the wake word gate rejected the recording.
     """
     print(f"[AUDIO] Recording {duration} seconds...")
     audio = sd.rec(
         int(duration * SAMPLE_RATE),
         samplerate=SAMPLE_RATE,
         channels=CHANNELS,
+        dtype="int16",
     )
     sd.wait()
-    filename = f"audio_{uuid.uuid4().hex}.wav"
-    wavio.write(filename, audio, SAMPLE_RATE, sampwidth=2)
-    print(f"[AUDIO] Saved → {filename}")
-    return filename
+    if not heard_wake_word(audio):
+        return None
+    clip = encode_audio(audio, SAMPLE_RATE, UPLOAD_FORMAT)
+    print(f"[AUDIO] Encoded {len(clip.data)} bytes ({clip.content_type})")
+    return clip
+
+
+def record_utterance(timeout: float = LISTEN_TIMEOUT) -> Optional[AudioClip]:
+    """
+    Listen on the microphone and return just the spoken command.
+
+    Recording starts when speech is detected and stops after a short
+    pause, so short commands upload less audio and long ones aren't cut off.
+
+    Returns:
+        AudioClip, or None if nothing was said within `timeout` seconds
+        (or the wake word gate rejected it).
+    """
+    print("[AUDIO] Listening... (speak now)")
+    with MicrophoneSource(SAMPLE_RATE, CHANNELS) as source:
+        segment = capture_utterance(source, timeout=timeout)
+    if segment is None:
+        print("[AUDIO] No speech detected.")
+        return None
+    if not heard_wake_word(segment):
+        return None
+    clip = encode_audio(segment, SAMPLE_RATE, UPLOAD_FORMAT)
+    print(f"[AUDIO] Captured {len(segment) / SAMPLE_RATE:.1f}s, "
+          f"encoded {len(clip.data)} bytes ({clip.content_type})")
+    return clip
+
+
+def record_command() -> Optional[AudioClip]:
+    """Record one command using the configured CAPTURE_MODE."""
+    if CAPTURE_MODE == "fixed":
+        return record_audio(FIXED_RECORD_SECONDS)
+    return record_utterance()
 
 
 # ----------------------------------------
 # STT client wrapper
 # ----------------------------------------
 
-def send_to_stt(filepath: str) -> str:
+def send_to_stt(clip: AudioClip) -> str:
     """
-    Send an audio file to the STT service and return the transcribed text.
+    Send an in-memory recording to the STT service and return the transcribed text.
 
     Uses the global stt_client (either Mock or API implementation).
 
     Expected response from /stt:
         { "text": "...", "confidence": 0.xx }
     """
-    return stt_client.transcribe(filepath)
+    return stt_client.transcribe(clip)
 
 
 # ----------------------------------------
@@ -559,41 +734,40 @@ def parse_command(text: str):
     """
     Parse natural-language command text AFTER the safe word.
 
-    Supported forms:
+    Matching is done by the compiled grammar in command_grammar.py, e.g.:
 
       "remind me to BUY MILK at 6 pm"
+      "remind me at 6 to call mom"
+      "remind me to stretch every day at 8 am"
       "create meeting at 2025-01-01T09:00"
       "list reminders"
+      "list reminders about mom"
+      "delete reminder 3" / "cancel the reminder to call mom"
+      "snooze reminder 2 for 15 minutes" / "snooze"
+      "mark reminder 4 as done" / "done"
 
     Returns tuples:
       ("list",)
-      ("create", task, time_str)
+      ("search", text)
+      ("create", task, time_str, repeat)
+      ("delete", target_id, task)        one of the two is None
+      ("snooze", target_id, duration)    None = last announced / SNOOZE_DEFAULT
+      ("complete", target_id)            None = last announced
       ("unknown",)
     """
-    t = text.lower().strip()
-
-    # list reminders
-    if t.startswith("list"):
+    cmd = parse_grammar(text)
+    if cmd.intent == "list":
         return ("list",)
-
-    # "remind me to <task> at <time>"
-    if t.startswith("remind me to "):
-        try:
-            body = text[len("remind me to "):]
-            task, time_part = body.rsplit(" at ", 1)
-            return ("create", task.strip(), time_part.strip())
-        except Exception:
-            return ("unknown",)
-
-    # "create <task> at <time>"
-    if t.startswith("create "):
-        try:
-            body = text[len("create "):]
-            task, time_part = body.rsplit(" at ", 1)
-            return ("create", task.strip(), time_part.strip())
-        except Exception:
-            return ("unknown",)
-
+    if cmd.intent == "search":
+        return ("search", cmd.task)
+    if cmd.intent == "create":
+        return ("create", cmd.task, cmd.time, cmd.repeat)
+    if cmd.intent == "delete":
+        return ("delete", cmd.target_id, cmd.task)
+    if cmd.intent == "snooze":
+        return ("snooze", cmd.target_id, cmd.duration)
+    if cmd.intent == "complete":
+        return ("complete", cmd.target_id)
     return ("unknown",)
 
 
@@ -601,90 +775,220 @@ def parse_command(text: str):
 # Reminder API helpers
 # ----------------------------------------
 
-def create_reminder(task: str, time_iso: str) -> None:
+def create_reminder(task: str, time_iso: str, repeat: Optional[str] = None) -> None:
     """
-    Create a reminder via the backend API.
+    Save a reminder locally and queue it for the backend.
 
-    The backend is expected to accept JSON like:
-        { "task": "...", "time_iso": "...", "repeat": null }
+    Works offline: the outbox is flushed to POST /reminders/bulk by the
+    sync thread as soon as the reminder API is reachable.
     """
-    payload = {
-        "task": task,
-        "time_iso": time_iso,
-        "repeat": None,
-    }
-    url = f"{REMINDER_API}/reminders/"
-    print("[API] POST", url, "→", payload)
-    try:
-        response = requests.post(url, json=payload, timeout=5)
-        if response.status_code == 200:
-            speak(f"Reminder created for {task}")
-        else:
-            print("[API ERROR]", response.status_code, response.text)
-            speak("Failed to create the reminder.")
-    except requests.exceptions.RequestException as e:
-        print(f"[API ERROR] Could not connect to reminder service: {e}")
-        speak("Could not connect to reminder service.")
+    row = store.create(task, time_iso, repeat)
+    print("[STORE] queued create", row)
+    sync_wakeup.set()
+    speak(f"Reminder saved for {task}")
 
 
 def list_reminders() -> None:
-    """Call GET /reminders/ and speak that the list is printed."""
-    url = f"{REMINDER_API}/reminders/"
-    print("[API] GET", url)
+    """Print the local replica (no network round trip) and speak how many there are."""
+    rows = store.list()
+    for row in rows:
+        number = row["server_id"] if row["server_id"] is not None else "new"
+        print(f"  [{number}] {row['time_iso']}  {row['task']}  ({row['status']})")
+    pending = store.pending()
+    if pending:
+        print(f"[STORE] {pending} change(s) not synced yet")
+    speak(f"You have {len(rows)} reminders. Check the console.")
+
+
+def search_reminders(text: str) -> None:
+    """
+    Ranked server-side search (GET /reminders/search); falls back to the
+    local replica when the reminder API can't be reached.
+    """
+    text = re.sub(r"^(?:the|my|a|an)\s+", "", text.strip(), flags=re.IGNORECASE)
     try:
-        response = requests.get(url, timeout=5)
-        print("[API] Reminders:", response.status_code, response.text)
-        speak("Here are your reminders. Check the console.")
+        response = reminder_http.get(
+            "/reminders/search", endpoint="reminders", params={"q": text, "limit": SEARCH_LIMIT}
+        )
+        response.raise_for_status()
+        rows = response.json()["items"]
+        # ids in the results are server ids, which is what the voice commands use
+        for row in rows:
+            print(f"  [{row['id']}] {row['time_iso']}  {row['task']}  ({row['status']})")
     except requests.exceptions.RequestException as e:
-        print(f"[API ERROR] Could not connect to reminder service: {e}")
-        speak("Could not connect to reminder service.")
+        print("[SEARCH] reminder API unavailable, searching the local replica:", e)
+        rows = store.search(text, SEARCH_LIMIT)
+        for row in rows:
+            number = row["server_id"] if row["server_id"] is not None else "new"
+            print(f"  [{number}] {row['time_iso']}  {row['task']}  ({row['status']})")
+    if not rows:
+        speak(f"I didn't find any reminders about {text}.")
+    elif len(rows) == 1:
+        speak(f"One reminder: {rows[0]['task']}.")
+    else:
+        speak(f"I found {len(rows)} reminders about {text}. Check the console.")
+
+
+def find_reminder(task: str) -> Optional[dict]:
+    """Look up a reminder by (part of) its task text in the local replica."""
+    return store.find(task)
+
+
+def _target(reminder_id: Optional[int]) -> Optional[int]:
+    """Explicit id, or the reminder that was announced last."""
+    if reminder_id is not None:
+        return reminder_id
+    if last_due_id is None:
+        speak("Which reminder? Say its number.")
+    return last_due_id
+
+
+def delete_reminder(reminder_id: Optional[int], task: Optional[str] = None) -> None:
+    """Delete by number, or by task text if no number was given."""
+    if reminder_id is None and task:
+        row = find_reminder(task)
+        if row is None:
+            speak(f"I couldn't find a reminder to {task}.")
+            return
+    else:
+        row = store.by_server_id(reminder_id)
+        if row is None:
+            speak(f"I couldn't find reminder {reminder_id}.")
+            return
+    store.delete(row["id"])
+    print("[STORE] queued delete", row)
+    sync_wakeup.set()
+    speak(f"Deleted the reminder to {row['task']}.")
+
+
+def snooze_reminder(reminder_id: Optional[int], duration: Optional[str] = None) -> None:
+    """Push a reminder back by `duration` (SNOOZE_DEFAULT if not given) and re-arm it."""
+    reminder_id = _target(reminder_id)
+    if reminder_id is None:
+        return
+    duration = duration or SNOOZE_DEFAULT
+    reminder_action(reminder_id, "snooze", f"Snoozed for {duration}.", {"duration": duration})
+
+
+def complete_reminder(reminder_id: Optional[int]) -> None:
+    """Mark a reminder as done (a repeating one moves on to its next time)."""
+    reminder_id = _target(reminder_id)
+    if reminder_id is None:
+        return
+    reminder_action(reminder_id, "complete", "Marked as done.")
+
+
+def reminder_action(reminder_id: int, action: str, done_message: str, body: Optional[dict] = None) -> None:
+    """Queue POST /reminders/{id}/<action> (ack / snooze / complete) through the local store."""
+    row = store.by_server_id(reminder_id)
+    if row is None:
+        speak(f"I couldn't find reminder {reminder_id}.")
+        return
+    store.action(row["id"], action, body)
+    print("[STORE] queued", action, reminder_id, body or "")
+    sync_wakeup.set()
+    speak(done_message)
+
+
+def run_command(parsed) -> None:
+    """Execute a parse_command() tuple (blocking HTTP; speech is queued)."""
+    if parsed[0] == "list":
+        list_reminders()
+
+    elif parsed[0] == "search":
+        search_reminders(parsed[1])
+
+    elif parsed[0] == "create":
+        _, task, time_str, repeat = parsed
+        # Spoken times ("6 pm", "tomorrow at 9") are passed through as-is;
+        # the backend normalizes them to a UTC timestamp when saving.
+        create_reminder(task, time_str, repeat)
+
+    elif parsed[0] == "delete":
+        delete_reminder(parsed[1], parsed[2])
+
+    elif parsed[0] == "snooze":
+        snooze_reminder(parsed[1], parsed[2])
+
+    elif parsed[0] == "complete":
+        complete_reminder(parsed[1])
+
+    else:
+        speak("I don't understand that command yet.")
 
 
 # ----------------------------------------
 # Poller for due reminders
 # ----------------------------------------
 
+def newly_due(changes: dict) -> List[str]:
+    """
+    Return the tasks of reminders in one /reminders/changes page that
+    just became due, and queue an ack for each. The server moves acked
+    reminders out of "due", so each one is announced once, across
+    restarts and other clients too.
+    """
+    global last_due_id
+    due = []
+    for rem in changes.get("upserts", []):
+        if rem.get("status") != "due":
+            continue
+        row = store.by_server_id(rem["id"])
+        if row is not None:
+            store.action(row["id"], "ack")
+        last_due_id = rem["id"]
+        due.append(rem.get("task", ""))
+    if due:
+        sync_wakeup.set()
+    return due
+
+
+def sync_reminders() -> List[str]:
+    """
+    Push queued local changes, pull the server's changes into the local
+    replica and return the tasks of reminders that just became due.
+
+    Raises if the reminder API can't be reached (nothing is lost: the
+    outbox keeps the changes for the next attempt).
+    """
+    store.flush(reminder_transport)
+    _, pages = store.pull(reminder_transport)
+    due = []
+    for changes in pages:
+        due += newly_due(changes)
+    return due
+
+
 def poll_due_reminders() -> None:
     """
-    Periodically check /reminders/ and announce any reminders
-    with status == "due" that we haven't already announced.
+    Periodically sync the local store with the backend and announce any
+    reminders that became due (and acknowledge them).
+
+    Only reminders that changed since the last sync come back (the token
+    is kept in the local store), so each poll costs O(changes). A local
+    write wakes the loop early so it reaches the server right away.
     """
-    global announced_due_ids
-    url = f"{REMINDER_API}/reminders/"
-    print("[POLL] Watching /reminders/ for due reminders...")
+    print("[SYNC] Syncing local reminders with /reminders/changes...")
 
     consecutive_failures = 0
 
     while True:
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                consecutive_failures = 0  # Reset on success
-                reminders = response.json()
-                for rem in reminders:
-                    rid = rem.get("id")
-                    status = rem.get("status")
-                    task = rem.get("task", "")
-
-                    # Speak each due reminder only once
-                    if status == "due" and isinstance(rid, int) and rid not in announced_due_ids:
-                        announced_due_ids.add(rid)
-                        notify("Reminder due", task)
-                        speak(task)
-            else:
-                print("[POLL ERROR]", response.status_code, response.text)
-                consecutive_failures += 1
+            for task in sync_reminders():
+                audio_out.announce_due(task)  # bursts are coalesced
+            consecutive_failures = 0  # Reset on success
         except Exception as e:
-            print("[POLL EXCEPTION]", e)
+            print("[SYNC EXCEPTION]", e)
             consecutive_failures += 1
 
         # Exponential backoff on repeated failures (max 5 minutes)
         if consecutive_failures > 0:
             sleep_time = min(300, 30 * (2 ** min(consecutive_failures - 1, 3)))
-            print(f"[POLL] Sleeping {sleep_time}s due to errors...")
-            time.sleep(sleep_time)
+            print(f"[SYNC] Retrying in {sleep_time}s ({store.pending()} change(s) queued)...")
         else:
-            time.sleep(30)
+            sleep_time = 30
+        sync_wakeup.wait(sleep_time)
+        sync_wakeup.clear()
 
 
 def start_polling_thread() -> None:
@@ -704,7 +1008,7 @@ def check_services() -> bool:
     # Check STT service
     try:
         stt_health_url = STT_API.replace("/stt", "/health")
-        response = requests.get(stt_health_url, timeout=2)
+        response = stt_http.get(stt_health_url, endpoint="health", retry=False)
         if response.status_code == 200:
             print("[✓] STT service is running")
         else:
@@ -716,7 +1020,7 @@ def check_services() -> bool:
 
     # Check Reminder API
     try:
-        response = requests.get(f"{REMINDER_API}/health", timeout=2)
+        response = reminder_http.get("/health", endpoint="health", retry=False)
         if response.status_code == 200:
             print("[✓] Reminder API is running")
         else:
@@ -729,6 +1033,52 @@ def check_services() -> bool:
     return services_ok
 
 
+# ----------------------------------------
+# Command handling
+# ----------------------------------------
+
+def handle_clip(clip: AudioClip) -> None:
+    """Transcribe one recorded command and act on it."""
+    # 2. STT
+    text = send_to_stt(clip)
+
+    if not text:
+        return
+
+    speak(f"You said: {text}", priority=PRIORITY_INFO)
+
+    # 3. Safe word check
+    command_text = check_safe_word(text)
+    if command_text is None:
+        speak(f"Say '{SAFE_WORD}' to start a command.")
+        return
+
+    # 4. Parse natural language command and run it
+    run_command(parse_command(command_text))
+
+
+def listen_hands_free() -> None:
+    """
+    Keep the microphone open and act on every utterance that starts
+    with the wake word; everything else is dropped locally.
+
+    Ctrl+C returns to the prompt.
+    """
+    print(f"[AUDIO] Hands-free: say '{SAFE_WORD} ...' any time (Ctrl+C to stop)")
+    try:
+        with MicrophoneSource(SAMPLE_RATE, CHANNELS) as source:
+            for segment in iter_utterances(source):
+                if not heard_wake_word(segment):
+                    continue
+                try:
+                    handle_clip(encode_audio(segment, SAMPLE_RATE, UPLOAD_FORMAT))
+                except Exception as e:
+                    print("[HANDS-FREE ERROR]", e)
+                    speak("Something went wrong while handling your command.")
+    except KeyboardInterrupt:
+        print("\n[AUDIO] Hands-free stopped.")
+
+
 # ----------------------------------------
 # Main loop (CLI interface)
 # ----------------------------------------
@@ -746,50 +1096,35 @@ def main() -> None:
             print("\n⚠️  Some services are unavailable.")
             print("Set USE_MOCK_STT = True in the code to run in mock mode.\n")
 
+    audio_out.start()
     start_polling_thread()
 
     while True:
-        cmd = input("Press [r] to record, [q] to quit: ").strip().lower()
+        prompt = "Press [r] to record, [q] to quit: "
+        if wake_spotter is not None:
+            prompt = "Press [r] to record, [h] for hands-free, [q] to quit: "
+        cmd = input(prompt).strip().lower()
 
         if cmd == "q":
             speak("Goodbye.")
             break
+        if cmd == "h" and wake_spotter is not None:
+            listen_hands_free()
+            continue
         if cmd != "r":
             continue
 
-        audio_path = None
         try:
-            # 1. Record audio
-            audio_path = record_audio()
-
-            # 2. STT
-            text = send_to_stt(audio_path)
-
-            if not text:
-                continue
-
-            speak(f"You said: {text}")
-
-            # 3. Safe word check
-            command_text = check_safe_word(text)
-            if command_text is None:
-                speak(f"Say '{SAFE_WORD}' to start a command.")
+            # Drop stale confirmations and let the speaker finish, so the
+            # mic doesn't pick up our own voice
+            audio_out.cancel("feedback")
+            audio_out.wait_idle(timeout=5)
+
+            # 1. Record audio (kept in memory)
+            clip = record_command()
+            if clip is None:
                 continue
-
-            # 4. Parse natural language command
-            parsed = parse_command(command_text)
-
-            if parsed[0] == "list":
-                list_reminders()
-
-            elif parsed[0] == "create":
-                _, task, time_str = parsed
-                # Here we assume Person 4 or backend can interpret time_str as ISO
-                # For now, we pass it through directly.
-                create_reminder(task, time_str)
-
-            else:
-                speak("I don't understand that command yet.")
+            handle_clip(clip)
 
         except KeyboardInterrupt:
             print("\n[INFO] Interrupted by user")
@@ -798,14 +1133,9 @@ def main() -> None:
         except Exception as e:
             print("[MAIN LOOP ERROR]", e)
             speak("Something went wrong while handling your command.")
-        finally:
-            # Clean up audio file
-            if audio_path and os.path.exists(audio_path):
-                try:
-                    os.remove(audio_path)
-                    print(f"[CLEANUP] Removed {audio_path}")
-                except Exception as e:
-                    print(f"[CLEANUP WARNING] Could not remove {audio_path}: {e}")
+
+    audio_out.wait_idle(timeout=5)  # let "Goodbye." finish
+    audio_out.stop()
 
 
 # ----------------------------------------
@@ -819,6 +1149,12 @@ else:
     print("[CONFIG] Using REAL API STT client")
     stt_client = ApiSTTClient(STT_API)
 
+if os.path.exists(WAKE_WORD_TEMPLATES):
+    wake_spotter: Optional[KeywordSpotter] = KeywordSpotter.load(WAKE_WORD_TEMPLATES)
+    print(f"[CONFIG] Local wake word gate on ({len(wake_spotter.templates)} templates)")
+else:
+    wake_spotter = None
+
 # ----------------------------------------
 # Entry point
 # ----------------------------------------
@@ -0,0 +1,306 @@
+"""
+asyncio runtime for the voice client.
+
+Runs the same pipeline as voice_client.main(), but as concurrent tasks
+joined by bounded queues instead of one blocking loop plus a daemon thread:
+
+    capture ──clips──▶ stt ──commands──▶ command executor
+    due events (/dispatch/stream) ──▶ sync ──┐
+    command executor ────────────────────────┴──output──▶ output (TTS / notifications worker)
+
+Recording the next command overlaps with transcribing and executing the
+previous one; when a stage falls behind, the bounded queue makes the
+stage before it wait instead of piling up audio in memory.
+
+Blocking pieces (requests sessions) run via asyncio.to_thread so the
+event loop itself never blocks. The capture source (input() prompt,
+microphone) runs on its own daemon thread instead, feeding the clip
+queue: a thread parked in input() must not hold up shutdown on Ctrl+C.
+
+Run:
+    python voice_runtime.py              # push-to-talk, same keys as voice_client.py
+    python voice_runtime.py --hands-free # continuous listening (needs wake word templates)
+    python voice_runtime.py --mock       # mock STT, no STT service needed
+"""
+
+import argparse
+import asyncio
+import threading
+from typing import Iterator, Optional
+
+import voice_client as vc
+from audio_capture import AudioClip, MicrophoneSource, encode_audio, iter_utterances
+
+# ----------------------------------------
+# CONFIG
+# ----------------------------------------
+
+CLIP_QUEUE_SIZE = 2      # recordings waiting for STT
+COMMAND_QUEUE_SIZE = 4   # transcripts waiting to be executed
+OUTPUT_QUEUE_SIZE = 16   # announcements waiting for the output worker
+POLL_INTERVAL = 30       # seconds between syncs with the reminder API
+STREAM_POLL_INTERVAL = 300  # ...while /dispatch/stream is connected (just a catch-up)
+STREAM_READ_TIMEOUT = 45    # the server sends a keepalive every 15 s
+
+STOP = object()  # end-of-stream marker passed down the pipeline
+
+
+# ----------------------------------------
+# Capture sources (blocking iterators, run on a daemon thread)
+# ----------------------------------------
+
+def quiet_output() -> None:
+    """Drop stale confirmations and let the speaker finish, so the mic doesn't record our own voice."""
+    vc.audio_out.cancel("feedback")
+    vc.audio_out.wait_idle(timeout=5)
+
+
+def push_to_talk() -> Iterator[AudioClip]:
+    """[r] records one command (VAD or fixed, per CAPTURE_MODE), [q] stops."""
+    while True:
+        cmd = input("Press [r] to record, [q] to quit: ").strip().lower()
+        if cmd == "q":
+            return
+        if cmd != "r":
+            continue
+        quiet_output()
+        clip = vc.record_command()
+        if clip is not None:
+            yield clip
+
+
+def hands_free() -> Iterator[AudioClip]:
+    """Every utterance that passes the local wake word gate (Ctrl+C stops)."""
+    quiet_output()
+    with MicrophoneSource(vc.SAMPLE_RATE, vc.CHANNELS) as source:
+        for segment in iter_utterances(source):
+            if not vc.audio_out.wait_idle(0):
+                continue  # overlapped an announcement: likely our own voice
+            if vc.heard_wake_word(segment):
+                yield encode_audio(segment, vc.SAMPLE_RATE, vc.UPLOAD_FORMAT)
+
+
+# ----------------------------------------
+# Runtime
+# ----------------------------------------
+
+class VoiceRuntime:
+    """
+    Wires the pipeline stages together.
+
+    Args:
+        stt: an AsyncSTTClient (mock or API-backed).
+        source: blocking iterator of AudioClips (push_to_talk() by default).
+        poll: set False to skip due-reminder syncing (e.g. in tests).
+    """
+
+    def __init__(self, stt: vc.AsyncSTTClient, source: Optional[Iterator[AudioClip]] = None,
+                 poll: bool = True, poll_interval: float = POLL_INTERVAL):
+        self.stt = stt
+        self.source = source if source is not None else push_to_talk()
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self.clips: asyncio.Queue = asyncio.Queue(CLIP_QUEUE_SIZE)
+        self.commands: asyncio.Queue = asyncio.Queue(COMMAND_QUEUE_SIZE)
+        self.output: asyncio.Queue = asyncio.Queue(OUTPUT_QUEUE_SIZE)
+        self.due_wakeup = asyncio.Event()  # set on every event from /dispatch/stream
+        self.streaming = False             # stream thread is connected
+
+    # ---------- stages ----------
+
+    async def capture_task(self) -> None:
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+        threading.Thread(target=self._pump_source, args=(loop, finished), name="capture", daemon=True).start()
+        await finished
+
+    def _pump_source(self, loop: asyncio.AbstractEventLoop, finished: asyncio.Future) -> None:
+        """Capture thread: hand each clip to the loop, then STOP. Dies quietly once the loop is gone."""
+        def settle(error: Optional[BaseException] = None) -> None:
+            if not finished.done():
+                finished.set_exception(error) if error is not None else finished.set_result(None)
+
+        try:
+            for clip in self.source:
+                # .result() waits while STT is CLIP_QUEUE_SIZE behind
+                asyncio.run_coroutine_threadsafe(self.clips.put(clip), loop).result()
+            asyncio.run_coroutine_threadsafe(self.clips.put(STOP), loop).result()
+            loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            return  # event loop closed (Ctrl+C)
+        except BaseException as e:
+            try:
+                loop.call_soon_threadsafe(settle, e)
+            except RuntimeError:
+                pass
+
+    async def stt_task(self) -> None:
+        while True:
+            clip = await self.clips.get()
+            if clip is STOP:
+                await self.commands.put(STOP)
+                return
+            try:
+                text = await self.stt.transcribe(clip)
+            except Exception as e:
+                print("[STT TASK ERROR]", e)
+                await self.say("Something went wrong during transcription.")
+                continue
+            if text:
+                await self.commands.put(text)
+
+    async def command_task(self) -> None:
+        while True:
+            text = await self.commands.get()
+            if text is STOP:
+                return
+            try:
+                await self.execute(text)
+            except Exception as e:
+                print("[COMMAND TASK ERROR]", e)
+                await self.say("Something went wrong while handling your command.")
+
+    async def due_task(self) -> None:
+        """
+        Sync + announce (voice_client.poll_due_reminders), driven by the
+        server's due events on /dispatch/stream. The events only wake the
+        sync: it is still sync_reminders that pulls, acks and announces, so
+        a reminder is announced once however it was noticed. Without a
+        stream (server has SSE off, or it's down) this falls back to polling.
+        """
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        threading.Thread(target=self._follow_stream, args=(loop, stop), name="due-stream", daemon=True).start()
+        failures = 0
+        try:
+            while True:
+                self.due_wakeup.clear()
+                try:
+                    for task in await asyncio.to_thread(vc.sync_reminders):
+                        await self.output.put(("due", task))
+                    failures = 0
+                except Exception as e:
+                    print("[SYNC EXCEPTION]", e)
+                    failures += 1
+
+                if failures:
+                    delay = min(300, 30 * (2 ** min(failures - 1, 3)))
+                else:
+                    delay = STREAM_POLL_INTERVAL if self.streaming else self.poll_interval
+                # wait in short steps rather than blocking a thread on sync_wakeup,
+                # so cancelling this task at shutdown is immediate
+                deadline = loop.time() + delay
+                while not (vc.sync_wakeup.is_set() or self.due_wakeup.is_set()) and loop.time() < deadline:
+                    try:
+                        await asyncio.wait_for(self.due_wakeup.wait(), 0.5)
+                    except asyncio.TimeoutError:
+                        pass
+                vc.sync_wakeup.clear()
+        finally:
+            stop.set()
+
+    def _follow_stream(self, loop: asyncio.AbstractEventLoop, stop: threading.Event) -> None:
+        """Stream thread: wake due_task for every due event; reconnects with backoff."""
+        failures = 0
+        while not stop.is_set():
+            try:
+                response = vc.reminder_http.get("/dispatch/stream", retry=False, stream=True,
+                                                timeout=(3.05, STREAM_READ_TIMEOUT))
+                with response:
+                    if response.status_code == 404:
+                        print("[STREAM] /dispatch/stream is disabled on the server, polling instead")
+                        return
+                    response.raise_for_status()
+                    self.streaming = True
+                    failures = 0
+                    # catch up on anything that fired while we weren't connected
+                    loop.call_soon_threadsafe(self.due_wakeup.set)
+                    for line in response.iter_lines(decode_unicode=True):
+                        if stop.is_set():
+                            return
+                        if line and line.startswith("data:"):
+                            loop.call_soon_threadsafe(self.due_wakeup.set)
+            except RuntimeError:
+                return  # event loop closed
+            except Exception as e:
+                print("[STREAM EXCEPTION]", e)
+            finally:
+                self.streaming = False
+            failures += 1
+            stop.wait(min(300, 5 * (2 ** min(failures - 1, 6))))
+
+    async def output_task(self) -> None:
+        while True:
+            kind, text = await self.output.get()
+            try:
+                if kind == "due":
+                    vc.audio_out.announce_due(text)
+                else:
+                    vc.speak(text)
+            finally:
+                self.output.task_done()
+
+    # ---------- helpers ----------
+
+    async def say(self, text: str) -> None:
+        await self.output.put(("say", text))
+
+    async def execute(self, text: str) -> None:
+        """Same steps as voice_client.handle_clip, after transcription."""
+        vc.speak(f"You said: {text}", priority=vc.PRIORITY_INFO)
+        command_text = vc.check_safe_word(text)
+        if command_text is None:
+            await self.say(f"Say '{vc.SAFE_WORD}' to start a command.")
+            return
+
+        parsed = vc.parse_command(command_text)
+        if parsed[0] == "unknown":
+            await self.say("I don't understand that command yet.")
+        else:
+            await asyncio.to_thread(vc.run_command, parsed)
+
+    async def run(self) -> None:
+        """Run until the capture source ends; in-flight commands are finished first."""
+        background = [asyncio.create_task(self.output_task())]
+        if self.poll:
+            background.append(asyncio.create_task(self.due_task()))
+        try:
+            await asyncio.gather(self.capture_task(), self.stt_task(), self.command_task())
+            await self.output.join()
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands-free", action="store_true", help="listen continuously (needs wake word templates)")
+    parser.add_argument("--mock", action="store_true", help="use the mock STT client")
+    args = parser.parse_args(argv)
+
+    if args.hands_free and vc.wake_spotter is None:
+        raise SystemExit(f"--hands-free needs {vc.WAKE_WORD_TEMPLATES}; record it with `python wake_word.py record`")
+
+    if args.mock or vc.USE_MOCK_STT:
+        stt = vc.AsyncMockSTTClient("memo remind me to buy groceries at 5 pm")
+    else:
+        print("Checking services...")
+        if not vc.check_services():
+            print("\n⚠️  Some services are unavailable. Use --mock to run without STT.\n")
+        stt = vc.AsyncApiSTTClient(vc.stt_client)
+
+    print(f"Safe word: '{vc.SAFE_WORD}' (e.g. 'memo remind me to ...')\n")
+    vc.audio_out.start()
+    runtime = VoiceRuntime(stt, hands_free() if args.hands_free else push_to_talk())
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        print("\n[INFO] Interrupted by user")
+    vc.speak("Goodbye.")
+    vc.audio_out.wait_idle(timeout=5)
+    vc.audio_out.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+On-device wake word ("memo") spotter for the voice client.
+
+Keeps chatter off the STT service: each captured utterance is checked
+locally and only forwarded to /stt when it starts with the safe word.
+
+How it works:
+- MFCC features (NumPy only: pre-emphasis, Hamming window, mel
+  filterbank, DCT) with per-utterance mean/variance normalization
+- A few recorded examples of the safe word are kept as templates
+- The start of each utterance is matched against every template with
+  open-end DTW (the command that follows the safe word is ignored);
+  a match closer than `threshold` counts as a detection
+
+Enroll templates and evaluate from the command line:
+
+    python wake_word.py record --count 5 --out wake_word_templates.npz
+    python wake_word.py enroll --out wake_word_templates.npz memo1.wav memo2.wav ...
+    python wake_word.py evaluate --templates wake_word_templates.npz \\
+        --positives clips/memo --negatives clips/chatter
+
+`evaluate` reports false-accept / false-reject rates and the CPU cost
+per second of audio, optionally over a sweep of thresholds.
+"""
+
+import argparse
+import glob
+import os
+import time
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from audio_capture import decode_wav
+
+# ----------------------------------------
+# CONFIG
+# ----------------------------------------
+
+SAMPLE_RATE = 16_000
+N_MFCC = 13
+N_MELS = 26
+WIN_MS = 25
+HOP_MS = 10
+DEFAULT_THRESHOLD = 0.4     # mean per-frame distance; `calibrate` / `evaluate` tune it
+SILENCE_DB = 35.0           # frames this far below the loudest are trimmed
+MATCH_SPAN = (0.6, 1.6)     # utterance prefix lengths tried, relative to the template
+
+
+# ----------------------------------------
+# Features
+# ----------------------------------------
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    fbank = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fbank
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mels: int, n_mfcc: int) -> np.ndarray:
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    dct[0] /= np.sqrt(2.0)
+    return dct
+
+
+def cmvn(feats: np.ndarray) -> np.ndarray:
+    """Zero mean / unit variance per coefficient (removes volume and mic gain)."""
+    if len(feats) == 0:
+        return feats
+    return (feats - feats.mean(axis=0)) / (feats.std(axis=0) + 1e-8)
+
+
+def mfcc(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, trim: bool = True, normalize: bool = True) -> np.ndarray:
+    """
+    MFCC frames (T x N_MFCC) for a mono int16/float buffer.
+
+    Leading/trailing silence is trimmed, and with `normalize` the
+    coefficients are mean/variance normalized over the whole buffer.
+    """
+    x = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if np.abs(x).max(initial=0) > 1.0:  # int16 range
+        x = x / 32768.0
+    win = sample_rate * WIN_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    if len(x) < win:
+        return np.zeros((0, N_MFCC), dtype=np.float32)
+
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])
+    n_frames = 1 + (len(x) - win) // hop
+    idx = np.arange(win)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = x[idx] * np.hamming(win)
+
+    n_fft = 1 << (win - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    energy_db = 10 * np.log10(power.sum(axis=1) + 1e-10)
+
+    if trim:
+        voiced = np.flatnonzero(energy_db > energy_db.max() - SILENCE_DB)
+        if len(voiced):
+            power = power[voiced[0]:voiced[-1] + 1]
+
+    mel = np.log(power @ _mel_filterbank(sample_rate, n_fft, N_MELS).T + 1e-10)
+    feats = mel @ _dct_matrix(N_MELS, N_MFCC).T
+    if normalize:
+        feats = cmvn(feats)
+    return feats.astype(np.float32)
+
+
+# ----------------------------------------
+# Matching
+# ----------------------------------------
+
+def dtw_prefix_distance(template: np.ndarray, utterance: np.ndarray) -> float:
+    """
+    Open-end DTW: how well `template` aligns with some prefix of `utterance`.
+
+    Only prefixes between MATCH_SPAN x the template length are considered,
+    so "memo remind me to ..." matches on "memo" and ignores the rest.
+    `template` is expected normalized; the utterance prefix is normalized
+    here so the rest of the command doesn't skew it.
+    Returns the path cost divided by the path length (lower = closer).
+    """
+    n = len(template)
+    if n == 0 or len(utterance) == 0:
+        return float("inf")
+    lo = max(1, int(n * MATCH_SPAN[0]))
+    hi = min(len(utterance), int(np.ceil(n * MATCH_SPAN[1])))
+    if hi < lo:
+        return float("inf")
+    ref = cmvn(utterance[:hi])
+
+    # frame-to-frame Euclidean distances, all at once
+    cost = np.sqrt(np.maximum(
+        (template ** 2).sum(1)[:, None] + (ref ** 2).sum(1)[None, :] - 2 * template @ ref.T, 0
+    )) / np.sqrt(template.shape[1])
+
+    acc = np.full((n, hi), np.inf)
+    acc[0] = np.cumsum(cost[0])
+    for i in range(1, n):
+        row = acc[i]
+        prev = acc[i - 1]
+        row[0] = prev[0] + cost[i, 0]
+        diag_or_up = np.minimum(prev[1:], prev[:-1]) + cost[i, 1:]
+        # horizontal moves depend on the row itself, so finish with a short scan
+        row[1:] = diag_or_up
+        for j in range(1, hi):
+            left = row[j - 1] + cost[i, j]
+            if left < row[j]:
+                row[j] = left
+
+    ends = np.arange(lo - 1, hi)
+    return float(np.min(acc[n - 1, ends] / (n + ends + 1)))
+
+
+class KeywordSpotter:
+    """
+    Template-matching wake word detector.
+
+    Usage:
+        spotter = KeywordSpotter.load("wake_word_templates.npz")
+        if spotter.detect(segment):
+            send_to_stt(...)
+    """
+
+    def __init__(self, templates: Optional[List[np.ndarray]] = None, threshold: float = DEFAULT_THRESHOLD,
+                 sample_rate: int = SAMPLE_RATE):
+        self.templates = list(templates or [])
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    def enroll(self, audio: np.ndarray) -> None:
+        """Add one recorded example of the wake word (just the word, nothing else)."""
+        feats = mfcc(audio, self.sample_rate)
+        if len(feats) < 5:
+            raise ValueError("wake word example is too short")
+        self.templates.append(feats)
+
+    def score(self, audio: np.ndarray) -> float:
+        """Best (lowest) template distance for the start of `audio`."""
+        feats = mfcc(audio, self.sample_rate, normalize=False)
+        return min((dtw_prefix_distance(t, feats) for t in self.templates), default=float("inf"))
+
+    def detect(self, audio: np.ndarray) -> bool:
+        return self.score(audio) <= self.threshold
+
+    def calibrate(self, margin: float = 1.25) -> float:
+        """
+        Set the threshold from the enrolled examples: the worst distance
+        between any two templates, times `margin`. Needs two or more templates.
+        """
+        if len(self.templates) < 2:
+            return self.threshold
+        worst = max(
+            dtw_prefix_distance(a, b)
+            for i, a in enumerate(self.templates)
+            for j, b in enumerate(self.templates)
+            if i != j
+        )
+        self.threshold = worst * margin
+        return self.threshold
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            threshold=self.threshold,
+            sample_rate=self.sample_rate,
+            **{f"template_{i}": t for i, t in enumerate(self.templates)},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "KeywordSpotter":
+        with np.load(path) as data:
+            keys = sorted((k for k in data.files if k.startswith("template_")), key=lambda k: int(k.split("_")[1]))
+            return cls(
+                [data[k] for k in keys],
+                threshold=float(data["threshold"]),
+                sample_rate=int(data["sample_rate"]),
+            )
+
+
+# ----------------------------------------
+# Evaluation harness
+# ----------------------------------------
+
+def load_clips(paths: Iterable[str]):
+    """Yield (name, mono audio, sample rate) for WAV files and directories of WAVs."""
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "*.wav"))) if os.path.isdir(path) else [path]
+        for name in files:
+            with open(name, "rb") as f:
+                audio, sr = decode_wav(f.read())
+            yield name, audio[:, 0] if audio.ndim > 1 else audio, sr
+
+
+def evaluate(spotter: KeywordSpotter, positives, negatives, thresholds: Optional[List[float]] = None) -> dict:
+    """
+    Score labelled clips and report error rates and cost.
+
+    positives / negatives: lists of mono int16 arrays (with / without the wake word).
+    Returns FAR/FRR at the spotter's threshold (and any extra `thresholds`),
+    plus CPU seconds spent per second of audio.
+    """
+    scores = {"pos": [], "neg": []}
+    audio_seconds = 0.0
+    cpu_start = time.process_time()
+    for label, clips in (("pos", positives), ("neg", negatives)):
+        for audio in clips:
+            scores[label].append(spotter.score(audio))
+            audio_seconds += len(audio) / spotter.sample_rate
+    cpu = time.process_time() - cpu_start
+
+    def rates(threshold):
+        false_rejects = sum(s > threshold for s in scores["pos"])
+        false_accepts = sum(s <= threshold for s in scores["neg"])
+        return {
+            "threshold": round(threshold, 4),
+            "false_accept_rate": round(false_accepts / max(len(scores["neg"]), 1), 4),
+            "false_reject_rate": round(false_rejects / max(len(scores["pos"]), 1), 4),
+        }
+
+    return {
+        "positives": len(scores["pos"]),
+        "negatives": len(scores["neg"]),
+        "templates": len(spotter.templates),
+        "audio_seconds": round(audio_seconds, 2),
+        "cpu_seconds": round(cpu, 4),
+        "cpu_per_audio_second": round(cpu / audio_seconds, 5) if audio_seconds else None,
+        "at_threshold": rates(spotter.threshold),
+        "sweep": [rates(t) for t in (thresholds or [])],
+    }
+
+
+def _record_templates(count: int, sample_rate: int) -> List[np.ndarray]:
+    from audio_capture import MicrophoneSource, capture_utterance
+
+    examples = []
+    while len(examples) < count:
+        input(f"[{len(examples) + 1}/{count}] Press Enter, then say just the wake word...")
+        with MicrophoneSource(sample_rate) as source:
+            segment = capture_utterance(source, timeout=5)
+        if segment is None:
+            print("  nothing heard, try again")
+            continue
+        examples.append(segment)
+    return examples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="record templates from the microphone")
+    rec.add_argument("--count", type=int, default=5)
+    rec.add_argument("--out", default="wake_word_templates.npz")
+
+    enr = sub.add_parser("enroll", help="build templates from WAV files")
+    enr.add_argument("--out", default="wake_word_templates.npz")
+    enr.add_argument("wavs", nargs="+")
+
+    ev = sub.add_parser("evaluate", help="report FAR / FRR and CPU cost on labelled clips")
+    ev.add_argument("--templates", default="wake_word_templates.npz")
+    ev.add_argument("--positives", nargs="+", required=True, help="WAV files or directories that start with the wake word")
+    ev.add_argument("--negatives", nargs="+", required=True, help="WAV files or directories without it")
+    ev.add_argument("--thresholds", default="", help="comma separated thresholds to sweep")
+    args = parser.parse_args(argv)
+
+    if args.cmd in ("record", "enroll"):
+        spotter = KeywordSpotter()
+        if args.cmd == "record":
+            examples = _record_templates(args.count, SAMPLE_RATE)
+        else:
+            examples = []
+            for _, audio, sr in load_clips(args.wavs):
+                if sr != SAMPLE_RATE:
+                    raise SystemExit(f"expected {SAMPLE_RATE} Hz audio, got {sr}")
+                examples.append(audio)
+        for audio in examples:
+            spotter.enroll(audio)
+        print(f"enrolled {len(spotter.templates)} templates, threshold={spotter.calibrate():.3f}")
+        spotter.save(args.out)
+        print(f"wrote {args.out}")
+        return
+
+    import json
+
+    spotter = KeywordSpotter.load(args.templates)
+    positives = [audio for _, audio, _ in load_clips(args.positives)]
+    negatives = [audio for _, audio, _ in load_clips(args.negatives)]
+    thresholds = [float(t) for t in args.thresholds.split(",") if t]
+    print(json.dumps(evaluate(spotter, positives, negatives, thresholds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#server/ and the Tk client use flat imports, so put both directories on the path
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "server"), os.path.join(ROOT, "client", "sonal_ui")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+
+import database
+from cache import reminder_cache
+from event_log import event_writer
+from idempotency import idempotency_store
+from models import Base
+from search_index import search_index
+from tenancy import api_limiter
+import crud
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    #a throwaway sqlite file per test, set up like benchmark.fresh_database
+    engine = database.configure_database(f"sqlite:///{tmp_path / 'reminders.db'}")
+    database.upgrade_schema(Base.metadata, bind=engine)
+    session = database.SessionLocal()
+    crud.init_change_counter(session)
+    search_index.setup(engine)
+    reminder_cache.invalidate()
+    idempotency_store.clear()
+    monkeypatch.setattr(api_limiter, "rate", None)
+    try:
+        yield session
+    finally:
+        session.close()
+        event_writer.flush()
+        engine.dispose()
+
+@pytest.fixture
+def client(db):
+    #in-process api without the lifespan (no background threads), like benchmark.py
+    from fastapi.testclient import TestClient
+    from app import app
+    return TestClient(app)
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy") #voice client dependency, not in requirements.txt
+
+from audio_capture import ArraySource, SpeechSegmenter, capture_utterance, iter_utterances
+
+RATE = 16_000
+FRAME = RATE * 30 // 1000    # samples per 30 ms frame
+PRE_ROLL = RATE * 300 // 1000
+END_FRAMES = 700 // 30       # trailing silence that closes a segment
+
+rng = np.random.default_rng(0)
+
+def silence(frames):
+    #room noise around -60 dBFS
+    return rng.normal(0, 30, frames * FRAME).astype(np.int16)
+
+def speech(frames):
+    t = np.arange(frames * FRAME) / RATE
+    return (0.3 * 32767 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+def test_segment_spans_pre_roll_speech_and_hangover():
+    onset = 40 * FRAME
+    audio = np.concatenate([silence(40), speech(34), silence(50)])
+    segments = list(iter_utterances(ArraySource(audio, RATE)))
+    assert len(segments) == 1
+    #300 ms of pre-roll before the first voiced frame, ending 700 ms after the last one
+    assert np.array_equal(segments[0], audio[onset - PRE_ROLL:onset + (34 + END_FRAMES) * FRAME])
+
+def test_two_utterances_are_split_on_silence():
+    audio = np.concatenate([silence(20), speech(20), silence(40), speech(30), silence(40)])
+    segments = list(iter_utterances(ArraySource(audio, RATE)))
+    assert [len(s) for s in segments] == [PRE_ROLL + (n + END_FRAMES) * FRAME for n in (20, 30)]
+
+def test_short_blips_are_ignored():
+    audio = np.concatenate([silence(20), speech(5), silence(40)])  # 150 ms click
+    assert list(iter_utterances(ArraySource(audio, RATE))) == []
+
+def test_long_speech_is_cut_at_max_segment_length():
+    segmenter = SpeechSegmenter(RATE, max_segment_s=1.0)
+    audio = np.concatenate([silence(20), speech(100), silence(40)])  # 3 s without a pause
+    segments = list(iter_utterances(ArraySource(audio, RATE), segmenter))
+    assert len(segments) == 3
+    assert all(len(s) <= RATE + PRE_ROLL for s in segments)
+    assert sum(len(s) for s in segments) >= 90 * FRAME
+
+def test_capture_utterance_returns_the_first_segment():
+    audio = np.concatenate([silence(40), speech(34), silence(30), speech(34), silence(40)])
+    first = capture_utterance(ArraySource(audio, RATE))
+    assert np.array_equal(first, list(iter_utterances(ArraySource(audio, RATE)))[0])
+
+def test_capture_utterance_times_out_on_silence():
+    assert capture_utterance(ArraySource(silence(200), RATE), timeout=1.0) is None
+
+def test_speech_running_into_the_end_of_input_is_flushed():
+    audio = np.concatenate([silence(20), speech(30)])
+    segment = capture_utterance(ArraySource(audio, RATE))
+    assert len(segment) == PRE_ROLL + 30 * FRAME
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from command_grammar import UNKNOWN, Command, parse
+from timeparse import parse_time
+
+@pytest.mark.parametrize("text, expected", [
+    ("list reminders", Command("list")),
+    ("What are my reminders?", Command("list")),
+    ("list reminders about mom", Command("search", task="mom")),
+    ("find my reminders for the dentist", Command("search", task="the dentist")),
+
+    ("remind me to call mom at 6 pm", Command("create", task="call mom", time="at 6 pm")),
+    ("remind me at 6 to call mom", Command("create", task="call mom", time="at 6")),
+    ("remind me to buy milk tomorrow at 9", Command("create", task="buy milk", time="tomorrow at 9")),
+    ("remind me to check the oven in 20 minutes", Command("create", task="check the oven", time="in 20 minutes")),
+    ("remind me to call mom at 6 pm tonight", Command("create", task="call mom", time="tonight at 6 pm")),
+    ("remind me to call mom at 6 o'clock", Command("create", task="call mom", time="at 6")),
+    ("remind me to pay the bill on 2030-01-01T09:00",
+     Command("create", task="pay the bill", time="2030-01-01T09:00")),
+    ("remind me to stretch every day at 9", Command("create", task="stretch", time="at 9", repeat="daily")),
+    ("remind me to stretch every day", Command("create", task="stretch", time="9 am", repeat="daily")),
+    ("remind me to water the plants at 7 am every weekday",
+     Command("create", task="water the plants", time="at 7 am", repeat="weekdays")),
+    ("remind me to call mom every monday at 6 pm",
+     Command("create", task="call mom", time="monday at 6 pm", repeat="weekly")),
+    ("remind me to pay rent every monday", Command("create", task="pay rent", time="monday", repeat="weekly")),
+    ("remind me to pay rent each monday", Command("create", task="pay rent", time="monday", repeat="weekly")),
+    ("remind me to stretch each day", Command("create", task="stretch", time="9 am", repeat="daily")),
+    ("remind me to call everyone at 6", Command("create", task="call everyone", time="at 6")),
+    ("remind me to review each item tomorrow", Command("create", task="review each item", time="tomorrow")),
+    ("add a reminder to walk the dog at noon", Command("create", task="walk the dog", time="at noon")),
+    ("remind me to call mom on monday", Command("create", task="call mom", time="monday")),
+    ("remind me to call mom next monday", Command("create", task="call mom", time="next monday")),
+    ("remind me to call mom at 6 on monday", Command("create", task="call mom", time="monday at 6")),
+    ("remind me to call mom at noon on friday", Command("create", task="call mom", time="friday at noon")),
+    ("remind me to call mom at six tomorrow", Command("create", task="call mom", time="tomorrow at six")),
+    ("remind me on friday at 5 pm to call mom", Command("create", task="call mom", time="friday at 5 pm")),
+
+    ("delete reminder 3", Command("delete", target_id=3)),
+    ("delete reminder number three", Command("delete", target_id=3)),
+    ("cancel the reminder to call mom", Command("delete", task="call mom")),
+
+    ("snooze", Command("snooze")),
+    ("snooze reminder 2 for 15 minutes", Command("snooze", target_id=2, duration="15 minutes")),
+    ("remind me again in 10 minutes", Command("snooze", duration="10 minutes")),
+
+    ("mark reminder 4 as done", Command("complete", target_id=4)),
+    ("done", Command("complete")),
+])
+def test_parse(text, expected):
+    assert parse(text) == expected
+
+@pytest.mark.parametrize("text", ["", "hello there", "remind me", "delete"])
+def test_unknown(text):
+    assert parse(text) is UNKNOWN
+
+@pytest.mark.parametrize("text", [
+    "remind me to call mom on monday",
+    "remind me to call mom next monday",
+    "remind me to call mom at 6 on monday",
+    "remind me to call mom at noon on friday",
+    "remind me to call mom day after tomorrow",
+    "remind me on friday at 5 pm to call mom",
+    "remind me to call mom at six in the evening tomorrow",
+    "remind me to pay rent every monday",
+])
+def test_create_times_are_understood_by_the_server(text):
+    command = parse(text)
+    assert command.intent == "create"
+    parse_time(command.time, "UTC", now=datetime(2030, 1, 7, 8, 0, tzinfo=timezone.utc))
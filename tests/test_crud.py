@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import clock
+import crud
+from models import Reminder
+from reminder_status import InvalidTransition, ReminderStatus as S
+
+START = datetime(2030, 1, 7, 8, 0, 0)  # a Monday
+
+@pytest.fixture
+def sim_clock():
+    previous = clock.set_clock(clock.SimulatedClock(START))
+    try:
+        yield clock.get_clock()
+    finally:
+        clock.set_clock(previous)
+
+def fire(db, reminder_id):
+    assert crud.mark_due(db, db.get(Reminder, reminder_id))
+
+# ---------- transitions ----------
+
+def test_ack_one_off_reminder(db, sim_clock):
+    r = crud.create_reminder(db, "call mom", "9 am", None)
+    fire(db, r.id)
+    acked = crud.transition(db, r.id, "ack")
+    assert acked.status == S.ACKNOWLEDGED
+
+def test_ack_repeating_reminder_rearms_next_occurrence(db, sim_clock):
+    r = crud.create_reminder(db, "stretch", "9 am", "daily")
+    first_due = r.due_at
+    sim_clock.advance(3600)
+    fire(db, r.id)
+    rearmed = crud.transition(db, r.id, S.ACKNOWLEDGED)
+    assert rearmed.status == S.SCHEDULED
+    assert rearmed.due_at == pytest.approx(first_due + 86400, abs=3600)  # dst-safe
+    assert "REARMED" in [e.event_type for e in crud.list_events(db, r.id)]
+
+def test_weekdays_reminder_skips_the_weekend(db, sim_clock):
+    r = crud.create_reminder(db, "standup", "2030-01-11T09:00", "weekdays")  # a Friday
+    sim_clock.set(datetime(2030, 1, 11, 10, 0))
+    fire(db, r.id)
+    rearmed = crud.transition(db, r.id, "complete")
+    assert datetime.fromtimestamp(rearmed.due_at).weekday() == 0
+
+def test_snooze_rearms_at_new_time(db, sim_clock):
+    r = crud.create_reminder(db, "call mom", "9 am", None)
+    fire(db, r.id)
+    snoozed = crud.transition(db, r.id, S.SNOOZED, time_iso="in 10 minutes")
+    assert snoozed.status == S.SNOOZED
+    assert snoozed.due_at == pytest.approx(START.timestamp() + 600)
+
+def test_invalid_transition_is_rejected(db, sim_clock):
+    r = crud.create_reminder(db, "call mom", "9 am", None)
+    with pytest.raises(InvalidTransition):
+        crud.transition(db, r.id, "ack")  # scheduled -> acknowledged needs it to fire first
+    assert db.get(Reminder, r.id).status == S.SCHEDULED
+
+def test_repeated_ack_is_a_no_op(db, sim_clock):
+    r = crud.create_reminder(db, "call mom", "9 am", None)
+    fire(db, r.id)
+    first = crud.transition(db, r.id, "ack").change_seq
+    assert crud.transition(db, r.id, "ack").change_seq == first
+
+def test_transition_on_someone_elses_reminder(db, sim_clock):
+    r = crud.create_reminder(db, "call mom", "9 am", None, user_id="alice")
+    assert crud.transition(db, r.id, "complete", user_id="bob") is None
+
+# ---------- delta sync ----------
+
+def test_list_changes_returns_upserts_and_tombstones(db):
+    a = crud.create_reminder(db, "a", "2030-01-01T09:00", None)
+    b = crud.create_reminder(db, "b", "2030-01-01T10:00", None)
+    token, upserts, tombstones, has_more = crud.list_changes(db, 0)
+    assert [r["id"] for r in upserts] == [a.id, b.id]
+    assert tombstones == [] and not has_more
+
+    crud.update_reminder(db, a.id, task="a2")
+    crud.delete_reminder(db, b.id)
+    token2, upserts, tombstones, has_more = crud.list_changes(db, token)
+    assert [(r["id"], r["task"]) for r in upserts] == [(a.id, "a2")]
+    assert tombstones == [b.id]
+    assert token2 > token
+
+    assert crud.list_changes(db, token2)[1:3] == ([], [])
+
+def test_list_changes_pages_in_change_order(db):
+    ids = [crud.create_reminder(db, f"r{i}", "2030-01-01T09:00", None).id for i in range(5)]
+    crud.delete_reminder(db, ids[0])
+    seen, tombstones, token = [], [], 0
+    while True:
+        token, upserts, gone, has_more = crud.list_changes(db, token, limit=2)
+        seen += [r["id"] for r in upserts]
+        tombstones += gone
+        if not has_more:
+            break
+    assert seen == ids[1:]
+    assert tombstones == [ids[0]]
+
+def test_list_changes_is_per_user(db):
+    crud.create_reminder(db, "mine", "2030-01-01T09:00", None, user_id="alice")
+    theirs = crud.create_reminder(db, "theirs", "2030-01-01T09:00", None, user_id="bob")
+    crud.delete_reminder(db, theirs.id, user_id="bob")
+    _, upserts, tombstones, _ = crud.list_changes(db, 0, user_id="alice")
+    assert [r["task"] for r in upserts] == ["mine"]
+    assert tombstones == []
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import clock
+import database
+from dispatcher import RETRY_BASE, Channel, Dispatcher, SSEChannel
+from metrics import metrics
+from models import Delivery
+
+START = datetime(2030, 1, 7, 9, 0)
+
+class FlakyChannel(Channel):
+    """Fails the first `failures` sends (every send if None) and keeps what it got."""
+
+    name = "flaky"
+
+    def __init__(self, failures=None, **kwargs):
+        kwargs.setdefault("batch_wait", 0)
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.calls = 0
+        self.sent = []
+
+    def send_batch(self, events):
+        self.calls += 1
+        if self.failures is None or self.calls <= self.failures:
+            raise ConnectionError("target down")
+        self.sent += events
+
+@pytest.fixture
+def sim_clock():
+    previous = clock.set_clock(clock.SimulatedClock(START))
+    try:
+        yield clock.get_clock()
+    finally:
+        clock.set_clock(previous)
+
+def make_dispatcher(*channels):
+    #the fixture points database.SessionLocal at the test db after the module default was bound
+    d = Dispatcher(session_factory=lambda: database.SessionLocal())
+    for channel in channels:
+        d.add_channel(channel)
+    return d
+
+def event(reminder_id, user_id="default"):
+    return {"reminder_id": reminder_id, "user_id": user_id, "task": f"task {reminder_id}",
+            "fired_at": clock.get_clock().time(), "priority": 0}
+
+def submit(d, *events):
+    #what submit() + one intake pass do, without the threads
+    d._intake.extend(events)
+    d._take_in()
+
+def rows(db):
+    db.expire_all()
+    return {r.reminder_id: (r.status, r.attempts) for r in db.query(Delivery)}
+
+def test_failed_send_is_retried_after_backoff(db, sim_clock):
+    channel = FlakyChannel(failures=1)
+    d = make_dispatcher(channel)
+    submit(d, event(1))
+    assert d._send_next(channel) == 1
+    assert rows(db) == {1: ("retry", 1)}
+    assert channel.queue.empty()
+
+    sim_clock.advance(RETRY_BASE - 1)
+    d._release_delayed()
+    assert channel.queue.empty()  # not due yet
+
+    sim_clock.advance(1)
+    d._release_delayed()
+    assert d._send_next(channel) == 1
+    assert rows(db) == {1: ("sent", 2)}
+    assert [e["reminder_id"] for e in channel.sent] == [1]
+
+def test_delivery_is_dead_after_max_attempts(db, sim_clock):
+    channel = FlakyChannel(max_attempts=3)
+    d = make_dispatcher(channel)
+    submit(d, event(1))
+    for attempt in range(3):
+        assert d._send_next(channel) == 1
+        sim_clock.advance(RETRY_BASE * 2 ** attempt)
+        d._release_delayed()
+    assert rows(db) == {1: ("dead", 3)}
+    assert channel.queue.empty() and not d._delayed
+
+def test_retry_is_scheduled_when_recording_fails(db, sim_clock):
+    channel = FlakyChannel(failures=1)
+    d = make_dispatcher(channel)
+    submit(d, event(1))
+
+    def broken():
+        raise RuntimeError("database is locked")
+
+    d.session_factory = broken
+    d._send_next(channel)
+    assert len(d._delayed) == 1
+
+    d.session_factory = lambda: database.SessionLocal()
+    sim_clock.advance(RETRY_BASE)
+    d._release_delayed()
+    d._send_next(channel)
+    assert rows(db) == {1: ("sent", 2)}
+
+def test_recover_requeues_unfinished_deliveries(db, sim_clock):
+    first = make_dispatcher(FlakyChannel(failures=1))
+    submit(first, event(1), event(2))
+    first._send_next(first.channels["flaky"])  # both fail once: retry
+    submit(first, event(3))                    # recorded, never sent: pending
+    assert rows(db) == {1: ("retry", 1), 2: ("retry", 1), 3: ("pending", 0)}
+
+    #a new process: the same channel, nothing in memory
+    channel = FlakyChannel(failures=0)
+    d = make_dispatcher(channel)
+    assert d.recover() == 3
+    while not channel.queue.empty():
+        d._send_next(channel)
+    assert rows(db) == {1: ("sent", 2), 2: ("sent", 2), 3: ("sent", 1)}
+
+def test_sse_events_without_a_subscriber_are_dropped(db, sim_clock):
+    channel = SSEChannel(batch_wait=0)
+    d = make_dispatcher(channel)
+    dropped = metrics.snapshot()["counters"].get("dispatch_sse_dropped_total", 0)
+
+    async def run():
+        q = channel.subscribe(user_id="alice")
+        try:
+            submit(d, event(1, "alice"), event(2, "bob"))
+            d._send_next(channel)
+            await asyncio.sleep(0)  # let _offer run on this loop
+            return [q.get_nowait()["reminder_id"] for _ in range(q.qsize())]
+        finally:
+            channel.unsubscribe(q)
+
+    assert asyncio.run(run()) == [1]
+    assert rows(db) == {1: ("sent", 1), 2: ("dropped", 1)}
+    assert metrics.snapshot()["counters"]["dispatch_sse_dropped_total"] == dropped + 1
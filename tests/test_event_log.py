@@ -0,0 +1,119 @@
+import gzip, json, time
+from datetime import datetime, timedelta
+
+import pytest
+
+import clock
+import database
+from event_log import EventLogWriter, compact_events
+from models import EventLog
+
+START = datetime(2030, 1, 7, 9, 0)
+
+def writer(**kwargs):
+    #the fixture points database.SessionLocal at the test db after the module default was bound
+    return EventLogWriter(lambda: database.SessionLocal(), **kwargs)
+
+def stored(db):
+    return [(e.event_type, e.reminder_id) for e in db.query(EventLog).order_by(EventLog.id)]
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+# ---------- EventLogWriter ----------
+
+def test_flushes_inline_once_the_batch_is_full(db):
+    w = writer(batch_size=3)
+    w.append("CREATED", 1)
+    w.append("CREATED", 2)
+    assert stored(db) == [] and w.pending() == 2
+    w.append("DUE", 1)
+    assert stored(db) == [("CREATED", 1), ("CREATED", 2), ("DUE", 1)]
+    assert w.pending() == 0
+
+def test_background_thread_flushes_on_size(db):
+    w = writer(batch_size=3, flush_interval=60)
+    w.start()
+    try:
+        for i in range(3):
+            w.append("CREATED", i)
+        assert wait_for(lambda: len(stored(db)) == 3)
+    finally:
+        w.stop()
+
+def test_background_thread_flushes_on_interval(db):
+    w = writer(batch_size=1000, flush_interval=0.05)
+    w.start()
+    try:
+        w.append("CREATED", 1)
+        assert wait_for(lambda: stored(db) == [("CREATED", 1)])
+    finally:
+        w.stop()
+
+def test_stop_flushes_what_is_left(db):
+    w = writer(batch_size=1000, flush_interval=60)
+    w.start()
+    w.append("CREATED", 1)
+    w.append("DELETED", 1)
+    assert stored(db) == []
+    w.stop()
+    assert stored(db) == [("CREATED", 1), ("DELETED", 1)]
+
+def test_failed_flush_keeps_the_rows_up_to_max_buffer(db):
+    w = writer(batch_size=1000, max_buffer=3)
+
+    def broken():
+        raise RuntimeError("database is locked")
+
+    w.session_factory = broken
+    for i in range(5):
+        w.append("CREATED", i)
+    with pytest.raises(RuntimeError):
+        w.flush()
+    assert w.pending() == 3  # the oldest two were dropped
+
+    w.session_factory = lambda: database.SessionLocal()
+    w.flush()
+    assert stored(db) == [("CREATED", 2), ("CREATED", 3), ("CREATED", 4)]
+
+# ---------- compaction ----------
+
+@pytest.fixture
+def sim_clock():
+    previous = clock.set_clock(clock.SimulatedClock(START))
+    try:
+        yield clock.get_clock()
+    finally:
+        clock.set_clock(previous)
+
+def test_compaction_archives_old_events_but_keeps_the_newest_per_reminder(db, sim_clock, tmp_path):
+    w = writer(batch_size=1000)
+    for i in range(8):
+        w.append(f"E{i}", 1)
+        sim_clock.advance(3600)
+    w.append("CREATED", 2)
+    sim_clock.advance(40 * 86400)
+    w.append("CREATED", 3)  # recent
+    w.flush()
+
+    archived = compact_events(db, sim_clock.now() - timedelta(days=30), str(tmp_path), keep_per_reminder=3)
+
+    assert archived == 5
+    assert stored(db) == [("E5", 1), ("E6", 1), ("E7", 1), ("CREATED", 2), ("CREATED", 3)]
+    with gzip.open(tmp_path / "events-2030-01-07.jsonl.gz", "rt") as f:
+        assert [json.loads(line)["event_type"] for line in f] == ["E0", "E1", "E2", "E3", "E4"]
+
+def test_compaction_without_a_per_reminder_floor(db, sim_clock, tmp_path):
+    w = writer(batch_size=1000)
+    for i in range(4):
+        w.append(f"E{i}", 1)
+    sim_clock.advance(40 * 86400)
+    w.append("CREATED", 2)
+    w.flush()
+    assert compact_events(db, sim_clock.now() - timedelta(days=30), str(tmp_path), keep_per_reminder=0) == 4
+    assert stored(db) == [("CREATED", 2)]
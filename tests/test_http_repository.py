@@ -0,0 +1,36 @@
+import time
+from datetime import datetime
+
+from http_repository import HttpReminderRepository
+from repository import Reminder
+
+class FakeRoot:
+    """Just enough of Tk for UIWorker: after() callbacks are run by hand."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+    def drain(self, seconds):
+        #keep UIWorker's result loop going; other callbacks (the sync poll) are left queued
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            drains = [fn for fn in self.pending if fn.__name__ == "_drain"]
+            self.pending = [fn for fn in self.pending if fn.__name__ != "_drain"]
+            for fn in drains:
+                fn()
+            time.sleep(0.01)
+
+def test_paged_rows_are_cached_for_get_reminder():
+    root = FakeRoot()
+    # port 9 (discard): the background stats poll just fails
+    repo = HttpReminderRepository("http://127.0.0.1:9", root, paged=True, timeout=0.2, poll_ms=10 ** 9)
+    rows = [Reminder(1, "call mom", datetime(2030, 1, 1, 9)), Reminder(2, "buy milk", datetime(2030, 1, 1, 10))]
+    loaded = []
+    repo.submit_page(lambda: (2, rows), loaded.append)
+    root.drain(0.3)
+    assert loaded == [(2, rows)]
+    assert repo.get_reminder(2) is rows[1]
+    assert repo.get_reminder(3) is None
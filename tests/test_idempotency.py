@@ -0,0 +1,72 @@
+import pytest
+
+import idempotency
+from idempotency import IdempotencyInProgress, IdempotencyKeyReused, IdempotencyStore
+
+@pytest.fixture
+def now(monkeypatch):
+    #drive the store's monotonic clock by hand
+    t = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: t[0])
+    return t
+
+def test_run_replays_the_first_result():
+    store = IdempotencyStore()
+    calls = []
+    value, replayed = store.run("k", "fp", lambda: calls.append(1) or {"id": 1})
+    assert (value, replayed) == ({"id": 1}, False)
+    assert store.run("k", "fp", lambda: calls.append(1) or {"id": 2}) == ({"id": 1}, True)
+    assert len(calls) == 1
+    assert (store.requests, store.replays) == (2, 1)
+
+def test_same_key_different_body_is_rejected():
+    store = IdempotencyStore()
+    store.run("k", "fp1", lambda: 1)
+    with pytest.raises(IdempotencyKeyReused):
+        store.run("k", "fp2", lambda: 2)
+
+def test_keys_expire_after_ttl(now):
+    store = IdempotencyStore(ttl=60)
+    store.put("k", "fp", "first")
+    now[0] += 59
+    assert store.get("k", "fp") == "first"
+    now[0] += 2
+    assert store.get("k", "fp") is None
+    assert len(store) == 0
+
+def test_oldest_keys_are_evicted_past_max_keys():
+    store = IdempotencyStore(max_keys=2)
+    for key in ("a", "b", "c"):
+        store.put(key, "fp", key)
+    assert store.peek("a", "fp") is None
+    assert store.peek("c", "fp") == "c"
+
+def test_failed_call_is_not_stored():
+    store = IdempotencyStore()
+    with pytest.raises(RuntimeError):
+        store.run("k", "fp", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert store.run("k", "fp", lambda: "retried") == ("retried", False)
+
+def test_duplicate_waits_for_in_flight_request():
+    store = IdempotencyStore(in_flight_wait=0.01)
+    store._in_flight["k"] = idempotency.threading.Event()
+    with pytest.raises(IdempotencyInProgress):
+        store.run("k", "fp", lambda: 1)
+
+def test_peek_is_not_counted():
+    store = IdempotencyStore()
+    store.put("k", "fp", 1)
+    assert store.peek("k", "fp") == 1
+    assert store.requests == 0
+
+def test_create_replays_over_http(client):
+    body = {"task": "call mom", "time_iso": "in 5 minutes"}
+    first = client.post("/reminders/", json=body, headers={"Idempotency-Key": "abc"})
+    again = client.post("/reminders/", json=body, headers={"Idempotency-Key": "abc"})
+    assert first.status_code == again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert len(client.get("/reminders/").json()) == 1
+
+    other = client.post("/reminders/", json={**body, "task": "x"}, headers={"Idempotency-Key": "abc"})
+    assert other.status_code == 422
@@ -0,0 +1,115 @@
+import pytest
+
+import crud
+from offline_store import OfflineStore
+
+@pytest.fixture
+def store(tmp_path):
+    s = OfflineStore(str(tmp_path / "offline.db"))
+    yield s
+    s.close()
+
+@pytest.fixture
+def send(client):
+    #the store's transport interface over the in-process api
+    def send(method, path, json=None, params=None, headers=None):
+        r = client.request(method, path, json=json, params=params, headers=headers)
+        return r.status_code, r.json() if r.content else None
+    return send
+
+def down(*args, **kwargs):
+    raise ConnectionError("server unreachable")
+
+def server_tasks(db):
+    return sorted(r["task"] for r in crud.list_reminders(db))
+
+def test_writes_queue_while_offline_and_flush_later(store, send, db):
+    a = store.create("call mom", "2030-01-01T09:00")
+    b = store.create("buy milk", "in 20 minutes")
+    store.update(b["id"], {"task": "buy oat milk"})  # folded into the queued create
+    assert store.pending() == 2
+    with pytest.raises(ConnectionError):
+        store.flush(down)
+    assert store.pending() == 2
+
+    assert store.flush(send) == 2
+    assert store.pending() == 0
+    assert server_tasks(db) == ["buy oat milk", "call mom"]
+    synced = store.get(a["id"])
+    assert synced["server_id"] is not None
+    assert synced["time_iso"].startswith("2030-01-01T") and synced["due_at"] is not None
+
+def test_update_and_delete_are_sent_in_order(store, send, db):
+    a = store.create("call mom", "2030-01-01T09:00")
+    b = store.create("buy milk", "2030-01-01T10:00")
+    store.flush(send)
+    store.update(a["id"], {"task": "call dad"})
+    store.delete(b["id"])
+    assert store.flush(send) == 2
+    assert server_tasks(db) == ["call dad"]
+
+def test_a_retried_flush_does_not_duplicate(store, send, db):
+    store.create("call mom", "2030-01-01T09:00")
+
+    def lost_response(*args, **kwargs):
+        send(*args, **kwargs)  # the server got it...
+        raise ConnectionError("timed out")  # ...but the client never heard back
+
+    with pytest.raises(ConnectionError):
+        store.flush(lost_response)
+    assert store.flush(send) == 1
+    assert server_tasks(db) == ["call mom"]
+
+def test_rejected_create_is_dropped(store, send, db):
+    rejected = []
+    store.on_reject = lambda op, row, status, body: rejected.append((op, row["task"], status))
+    store.create("call mom", "whenever")
+    store.flush(send)
+    assert rejected == [("create", "call mom", 422)]
+    assert store.list() == [] and store.pending() == 0
+
+def test_pull_applies_server_changes(store, send, db):
+    r1 = crud.create_reminder(db, "from the server", "2030-01-01T09:00", None).id
+    r2 = crud.create_reminder(db, "deleted later", "2030-01-01T10:00", None).id
+    store.pull(send)
+    assert [r["task"] for r in store.list()] == ["from the server", "deleted later"]
+    token = store.sync_token
+
+    crud.update_reminder(db, r1, task="renamed")
+    crud.delete_reminder(db, r2)
+    touched, _ = store.pull(send)
+    assert len(touched) == 2
+    assert [r["task"] for r in store.list()] == ["renamed"]
+    assert store.sync_token > token
+
+def test_apply_changes_keeps_rows_with_pending_edits(store):
+    store.apply_changes({"token": 2, "upserts": [
+        {"id": 7, "task": "server copy", "time_iso": "2030-01-01T09:00:00+00:00", "status": "scheduled", "change_seq": 2},
+    ], "tombstones": []})
+    local = store.by_server_id(7)
+    store.update(local["id"], {"task": "local edit"})
+    store.apply_changes({"token": 3, "upserts": [
+        {"id": 7, "task": "newer server copy", "time_iso": "2030-01-01T09:00:00+00:00", "status": "scheduled", "change_seq": 3},
+    ], "tombstones": []})
+    assert store.get(local["id"])["task"] == "local edit"
+    assert store.sync_token == 3
+
+def test_apply_changes_ignores_stale_tombstones(store):
+    row = {"id": 7, "task": "reused id", "time_iso": "2030-01-01T09:00:00+00:00", "status": "scheduled", "change_seq": 9}
+    store.apply_changes({"token": 9, "upserts": [row], "tombstones": []})
+    #a tombstone for the id's previous life, replayed from an older page
+    store.apply_changes({"token": 5, "upserts": [], "tombstones": [7]})
+    assert store.by_server_id(7)["task"] == "reused id"
+    #a page carrying the id both ways keeps the live row
+    store.apply_changes({"token": 12, "upserts": [{**row, "change_seq": 12}], "tombstones": [7]})
+    assert store.by_server_id(7) is not None
+    store.apply_changes({"token": 13, "upserts": [], "tombstones": [7]})
+    assert store.by_server_id(7) is None
+
+def test_rejected_action_adopts_the_server_state(store, send, db):
+    local = store.create("call mom", "2030-01-01T09:00")
+    store.flush(send)
+    store.action(local["id"], "ack")  # still scheduled on the server: 409
+    assert store.get(local["id"])["status"] == "acknowledged"
+    store.flush(send)
+    assert store.get(local["id"])["status"] == "scheduled"
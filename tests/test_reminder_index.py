@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from reminder_index import ReminderIndex
+from repository import Reminder
+
+T0 = datetime(2030, 1, 7, 9, 0)
+
+def rem(id, hours, status="scheduled", task=None):
+    return Reminder(id, task or f"task {id}", T0 + timedelta(hours=hours), status=status)
+
+def ids(index, status=None):
+    return [r.id for r in index.iter(status)]
+
+def test_iterates_in_time_then_id_order():
+    index = ReminderIndex([rem(3, 2), rem(1, 5), rem(2, 2), rem(4, -1)])
+    assert ids(index) == [4, 2, 3, 1]
+    assert len(index) == 4 and 2 in index
+
+def test_upsert_moves_a_rescheduled_reminder():
+    index = ReminderIndex([rem(1, 1), rem(2, 2), rem(3, 3)])
+    index.upsert(rem(1, 10))
+    assert ids(index) == [2, 3, 1]
+    index.upsert(rem(4, 0))
+    assert ids(index) == [4, 2, 3, 1]
+
+def test_objects_edited_in_place_are_reindexed():
+    r = rem(1, 1)
+    index = ReminderIndex([r, rem(2, 2)])
+    r.time = T0 + timedelta(hours=5)
+    index.upsert(r)
+    assert ids(index) == [2, 1]
+
+def test_status_views_and_stats_follow_updates():
+    index = ReminderIndex([rem(1, 1), rem(2, 2, "completed"), rem(3, 3)])
+    assert ids(index, "scheduled") == [1, 3]
+    assert (index.stats.total, index.stats.scheduled, index.stats.completed) == (3, 2, 1)
+
+    index.upsert(rem(3, 3, "completed"))
+    assert ids(index, "scheduled") == [1]
+    assert ids(index, "completed") == [2, 3]
+    assert (index.stats.scheduled, index.stats.completed) == (1, 2)
+
+    index.remove(2)
+    assert ids(index, "completed") == [3]
+    assert index.stats.total == 2
+
+def test_replace_all_only_touches_what_changed():
+    index = ReminderIndex([rem(1, 1), rem(2, 2), rem(3, 3)])
+    index.replace_all([rem(3, 0), rem(2, 2), rem(5, 4)])
+    assert ids(index) == [3, 2, 5]
+    assert index.get(1) is None
+
+def test_position_is_the_row_number():
+    index = ReminderIndex([rem(1, 1), rem(2, 2, "completed"), rem(3, 3)])
+    assert index.position(index.get(3)) == 2
+    assert index.position(index.get(3), "scheduled") == 1
@@ -0,0 +1,91 @@
+import pytest
+
+import crud
+from cache import reminder_cache
+from models import Reminder
+from tenancy import DEFAULT_USER
+
+def create(client, task="call mom", time_iso="2030-01-01T09:00", **extra):
+    r = client.post("/reminders/", json={"task": task, "time_iso": time_iso, **extra})
+    assert r.status_code == 200
+    return r.json()
+
+# ---------- PATCH ----------
+
+@pytest.mark.parametrize("field", ["task", "time_iso", "status"])
+def test_patch_rejects_null_for_required_fields(client, field):
+    r = create(client)
+    response = client.patch(f"/reminders/{r['id']}", json={field: None})
+    assert response.status_code == 422
+    assert response.json()["detail"] == {"error": "NULL_FIELD", "fields": [field]}
+
+    #nothing was written, and the lists still serialize
+    assert client.get(f"/reminders/{r['id']}").json() == r
+    assert client.get("/reminders/").status_code == 200
+    assert client.get("/reminders/changes").status_code == 200
+
+def test_patch_null_repeat_clears_it(client):
+    r = create(client, repeat="daily")
+    response = client.patch(f"/reminders/{r['id']}", json={"repeat": None})
+    assert response.status_code == 200
+    assert response.json()["repeat"] is None
+
+# ---------- list ETag and the read-through cache ----------
+
+def test_unchanged_list_is_a_304(client):
+    create(client)
+    first = client.get("/reminders/")
+    etag = first.headers["ETag"]
+    again = client.get("/reminders/", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag and again.content == b""
+    assert client.get("/reminders/", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/reminders/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_cached_304_does_not_touch_the_database(client, monkeypatch):
+    create(client)
+    etag = client.get("/reminders/").headers["ETag"]
+
+    def no_db(*args, **kwargs):
+        raise AssertionError("list was reloaded")
+
+    monkeypatch.setattr(crud, "list_reminders_with_etag", no_db)
+    assert client.get("/reminders/", headers={"If-None-Match": etag}).status_code == 304
+
+@pytest.mark.parametrize("write", ["create", "update", "delete", "ack"])
+def test_writes_invalidate_the_cached_list(client, db, write):
+    r = create(client, time_iso="in 1 minute")
+    etag = client.get("/reminders/").headers["ETag"]
+    if write == "create":
+        create(client, task="buy milk")
+    elif write == "update":
+        client.patch(f"/reminders/{r['id']}", json={"task": "call dad"})
+    elif write == "delete":
+        client.delete(f"/reminders/{r['id']}")
+    else:
+        assert crud.mark_due(db, db.get(Reminder, r["id"]))  # the scheduler's write path
+        client.post(f"/reminders/{r['id']}/ack")
+
+    response = client.get("/reminders/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    db.expire_all()
+    rows = db.query(Reminder).order_by(Reminder.id)
+    assert [(x["id"], x["task"], x["status"]) for x in response.json()] == [(x.id, x.task, x.status) for x in rows]
+
+def test_writes_invalidate_the_cached_lookup(client):
+    r = create(client)
+    assert client.get(f"/reminders/{r['id']}").json()["task"] == "call mom"
+    assert reminder_cache._by_id[DEFAULT_USER][r["id"]][0]["task"] == "call mom"
+
+    client.patch(f"/reminders/{r['id']}", json={"task": "call dad"})
+    assert r["id"] not in reminder_cache._by_id.get(DEFAULT_USER, {})
+    assert client.get(f"/reminders/{r['id']}").json()["task"] == "call dad"
+
+    client.delete(f"/reminders/{r['id']}")
+    assert client.get(f"/reminders/{r['id']}").status_code == 404
+
+def test_lookups_are_cached_per_user(client):
+    r = create(client)
+    client.get(f"/reminders/{r['id']}")
+    assert client.get(f"/reminders/{r['id']}", headers={"X-User-Id": "bob"}).status_code == 404
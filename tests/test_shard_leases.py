@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+import clock
+import crud
+import database
+import shard_leases
+from scheduler import LEASE_SECONDS, NUM_SHARDS, TICK_SECONDS, run_tick
+
+START = datetime(2030, 1, 7, 9, 0)
+
+@pytest.fixture
+def sim_clock(db):
+    previous = clock.set_clock(clock.SimulatedClock(START))
+    shard_leases.ensure_shards(db, NUM_SHARDS)
+    try:
+        yield clock.get_clock()
+    finally:
+        clock.set_clock(previous)
+
+def acquire(db, worker_id):
+    #what tick_once does in sharded mode before scanning
+    now = clock.get_clock().time()
+    shard_leases.heartbeat(db, worker_id, now)
+    return shard_leases.acquire_shards(db, worker_id, NUM_SHARDS, LEASE_SECONDS, now)
+
+def test_workers_converge_on_a_fair_split(db, sim_clock):
+    assert acquire(db, "a") == list(range(NUM_SHARDS))  # alone: takes everything
+    assert acquire(db, "b") == []                       # nothing free yet
+    a = acquire(db, "a")                                # sees b, hands back its surplus
+    b = acquire(db, "b")
+    assert len(a) == len(b) == NUM_SHARDS // 2
+    assert sorted(a + b) == list(range(NUM_SHARDS))
+
+def test_renewal_keeps_the_leases(db, sim_clock):
+    first = acquire(db, "a")
+    for _ in range(5):
+        sim_clock.advance(TICK_SECONDS)
+        assert acquire(db, "a") == first
+    #a second worker arriving late still can't take leased shards, only what a hands back
+    assert acquire(db, "b") == []
+
+def test_expired_leases_are_taken_over(db, sim_clock):
+    acquire(db, "a")
+    acquire(db, "b")
+    a = acquire(db, "a")
+    b = acquire(db, "b")
+    #a dies: b keeps renewing but can't touch a's shards until the lease runs out
+    sim_clock.advance(LEASE_SECONDS - 1)
+    assert acquire(db, "b") == b
+    sim_clock.advance(2)
+    assert acquire(db, "b") == sorted(a + b)
+
+def test_released_shards_are_free_at_once(db, sim_clock):
+    acquire(db, "a")
+    acquire(db, "b")
+    acquire(db, "a")
+    shard_leases.release_shards(db, "a")
+    assert acquire(db, "b") == list(range(NUM_SHARDS))
+
+def test_two_schedulers_fire_each_reminder_once(db, sim_clock):
+    ids = [crud.create_reminder(db, f"r{i}", (START + timedelta(minutes=3 * i)).isoformat(), None).id
+           for i in range(60)]
+    sessions = {name: database.SessionLocal() for name in ("a", "b")}
+    fired = Counter()
+    try:
+        for tick in range(200):
+            sim_clock.advance(TICK_SECONDS)
+            #b crashes after an hour; a takes its shards over once their leases expire
+            workers = ("a", "b") if tick < 60 else ("a",)
+            for name in workers:
+                session = sessions[name]
+                shards = acquire(session, name)
+                if tick == 30:
+                    shards = list(range(NUM_SHARDS))  # a stale view: both scan everything once
+                fired[name] += run_tick(session, shards=shards)
+    finally:
+        for session in sessions.values():
+            session.close()
+
+    assert fired["a"] > 0 and fired["b"] > 0
+    assert sum(fired.values()) == len(ids)
+    due = Counter(e.reminder_id for e in crud.list_events(db, event_type="DUE", limit=1000))
+    assert due == Counter({rid: 1 for rid in ids})
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from timeparse import TimeParseError, parse_time
+
+NOW = datetime(2030, 1, 7, 8, 0, tzinfo=timezone.utc)  # monday 08:00
+
+def at(text):
+    return parse_time(text, "UTC", now=NOW)
+
+@pytest.mark.parametrize("text, expected", [
+    ("2030-01-01T09:00", datetime(2030, 1, 1, 9, 0)),
+    ("2030-01-01 09:00:30", datetime(2030, 1, 1, 9, 0, 30)),
+    ("6 pm", datetime(2030, 1, 7, 18, 0)),
+    ("6:30 p.m.", datetime(2030, 1, 7, 18, 30)),
+    ("7", datetime(2030, 1, 7, 19, 0)),          # 07:00 has passed, 19:00 hasn't
+    ("noon", datetime(2030, 1, 7, 12, 0)),
+    ("midnight", datetime(2030, 1, 8, 0, 0)),
+    ("tomorrow", datetime(2030, 1, 8, 9, 0)),
+    ("tomorrow at 3", datetime(2030, 1, 8, 15, 0)),
+    ("tonight at eight", datetime(2030, 1, 7, 20, 0)),
+    ("friday at 5 pm", datetime(2030, 1, 11, 17, 0)),
+    ("next monday", datetime(2030, 1, 14, 9, 0)),
+    ("on monday", datetime(2030, 1, 14, 9, 0)),
+    ("six in the evening", datetime(2030, 1, 7, 18, 0)),
+    ("in 20 minutes", datetime(2030, 1, 7, 8, 20)),
+    ("in half an hour", datetime(2030, 1, 7, 8, 30)),
+    ("in 1 and a half hours", datetime(2030, 1, 7, 9, 30)),
+    ("in two days", datetime(2030, 1, 9, 8, 0)),
+])
+def test_parse_time(text, expected):
+    assert at(text) == expected.replace(tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("text, hour, expected", [
+    ("today", 8, datetime(2030, 1, 7, 9, 0)),
+    ("today", 10, datetime(2030, 1, 7, 20, 0)),   # 09:00 has passed
+    ("tonight", 8, datetime(2030, 1, 7, 20, 0)),
+    ("tonight", 10, datetime(2030, 1, 7, 20, 0)),
+    ("today at 8", 10, datetime(2030, 1, 7, 20, 0)),
+    ("today at 3", 10, datetime(2030, 1, 7, 15, 0)),
+    ("tonight at 11", 21, datetime(2030, 1, 7, 23, 0)),
+    ("tonight at midnight", 21, datetime(2030, 1, 8, 0, 0)),
+])
+def test_same_day_phrases_stay_ahead_of_now(text, hour, expected):
+    now = NOW.replace(hour=hour)
+    assert parse_time(text, "UTC", now=now) == expected.replace(tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("text, hour", [
+    ("today at 9 am", 10),
+    ("tonight", 21),
+    ("tonight at 8", 21),
+    ("today", 21),
+])
+def test_same_day_phrases_in_the_past_raise(text, hour):
+    with pytest.raises(TimeParseError, match="already passed"):
+        parse_time(text, "UTC", now=NOW.replace(hour=hour))
+
+def test_named_timezone_is_converted_to_utc():
+    when = parse_time("tomorrow at 9 am", "America/New_York", now=NOW)
+    assert when == datetime(2030, 1, 8, 14, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("text", ["", "   ", "whenever", "25:00", "13 pm", "monday at on"])
+def test_unparseable_times_raise(text):
+    with pytest.raises(TimeParseError):
+        at(text)
+
+def test_unknown_timezone_raises():
+    with pytest.raises(TimeParseError):
+        parse_time("6 pm", "Mars/Olympus_Mons", now=NOW)
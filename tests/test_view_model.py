@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from repository import Reminder
+from view_model import ReminderTableModel, row_values
+
+T0 = datetime(2030, 1, 7, 9, 0)
+
+def rem(id, hours, status="scheduled", task=None):
+    return Reminder(id, task or f"task {id}", T0 + timedelta(hours=hours), status=status)
+
+class FakeTree:
+    """The ttk.Treeview item methods sync() uses, over a plain list."""
+
+    def __init__(self):
+        self.rows = []
+        self.values = {}
+
+    def delete(self, iid):
+        self.rows.remove(iid)
+        del self.values[iid]
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def detach(self, iid):
+        self.rows.remove(iid)
+
+    def move(self, iid, parent, index):
+        self.rows.insert(index, iid)
+
+    def insert(self, parent, index, iid, values):
+        self.rows.insert(index, iid)
+        self.values[iid] = values
+
+def test_first_diff_inserts_everything_in_time_order():
+    model = ReminderTableModel()
+    d = model.diff([rem(2, 2), rem(1, 1)])
+    assert [(i, iid) for i, iid, _ in d.inserts] == [(0, "1"), (1, "2")]
+    assert not (d.deletes or d.updates or d.moves)
+    assert (model.stats.total, model.stats.scheduled) == (2, 2)
+
+def test_unchanged_rows_produce_an_empty_diff():
+    model = ReminderTableModel()
+    model.diff([rem(1, 1), rem(2, 2)])
+    assert not model.diff([rem(1, 1), rem(2, 2)])
+
+def test_diff_updates_moves_inserts_and_deletes():
+    model, tree = ReminderTableModel(), FakeTree()
+    model.sync(tree, [rem(1, 1), rem(2, 2), rem(3, 3), rem(4, 4)])
+    after = [rem(1, 1, "completed"), rem(3, 3), rem(4, 0), rem(5, 5)]  # 2 gone, 4 moved, 5 new
+    d = model.sync(tree, after)
+
+    assert d.deletes == ["2"]
+    assert d.updates == [("4", row_values(after[2])), ("1", row_values(after[0]))]
+    assert d.moves == [(0, "4")]  # 1 and 3 keep their relative order and stay put
+    assert [(i, iid) for i, iid, _ in d.inserts] == [(3, "5")]
+    assert tree.rows == ["4", "1", "3", "5"] == model.order
+    assert tree.values == {str(r.id): row_values(r) for r in after}
+    assert (model.stats.total, model.stats.scheduled, model.stats.completed) == (4, 3, 1)
+
+def test_reversed_order_moves_all_but_one_row():
+    model, tree = ReminderTableModel(), FakeTree()
+    model.sync(tree, [rem(i, i) for i in range(5)])
+    d = model.sync(tree, [rem(i, -i) for i in range(5)])
+    assert len(d.moves) == 4
+    assert tree.rows == ["4", "3", "2", "1", "0"]